@@ -0,0 +1,122 @@
+"""Partition time-series tables by timestamp
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-14
+
+"""
+from datetime import date
+
+from alembic import op
+
+# revision identifiers
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+# Monthly partitions provisioned up front; app.database.maintain_partitions
+# keeps creating new months ahead of time once the app is running.
+PARTITION_START = date(2024, 1, 1)
+PARTITION_END = date(2027, 1, 1)
+
+# Secondary indexes per table as (name, columns, unique). Unique indexes on a
+# partitioned table must contain the partition key, hence trade_id + timestamp.
+PARTITIONED_INDEXES = {
+    'ohlcv': [
+        ('idx_symbol_timeframe_timestamp', ['symbol', 'timeframe', 'timestamp'], True),
+        ('idx_timestamp_symbol', ['timestamp', 'symbol'], False),
+        ('ix_ohlcv_symbol', ['symbol'], False),
+        ('ix_ohlcv_timestamp', ['timestamp'], False),
+    ],
+    'tickers': [
+        ('idx_symbol_timestamp', ['symbol', 'timestamp'], False),
+        ('ix_tickers_symbol', ['symbol'], False),
+        ('ix_tickers_timestamp', ['timestamp'], False),
+    ],
+    'order_books': [
+        ('idx_orderbook_symbol_timestamp', ['symbol', 'timestamp'], False),
+        ('ix_order_books_symbol', ['symbol'], False),
+        ('ix_order_books_timestamp', ['timestamp'], False),
+    ],
+    'trades': [
+        ('idx_trade_id', ['exchange', 'trade_id', 'timestamp'], True),
+        ('idx_trade_symbol_timestamp', ['symbol', 'timestamp'], False),
+        ('ix_trades_symbol', ['symbol'], False),
+        ('ix_trades_timestamp', ['timestamp'], False),
+    ],
+    'market_metrics': [
+        ('idx_metrics_symbol_timestamp', ['symbol', 'timestamp'], False),
+        ('ix_market_metrics_symbol', ['symbol'], False),
+        ('ix_market_metrics_timestamp', ['timestamp'], False),
+    ],
+    'onchain_metrics': [
+        ('idx_onchain_symbol_timestamp', ['symbol', 'timestamp'], False),
+        ('ix_onchain_metrics_symbol', ['symbol'], False),
+        ('ix_onchain_metrics_timestamp', ['timestamp'], False),
+    ],
+}
+
+# Index layout from 001, restored on downgrade.
+PLAIN_INDEXES = {
+    **PARTITIONED_INDEXES,
+    'trades': [
+        ('idx_trade_id', ['exchange', 'trade_id'], True),
+        *PARTITIONED_INDEXES['trades'][1:],
+    ],
+}
+
+
+def _months(start: date, end: date):
+    """Yield (lower, upper) bounds for each month in [start, end)."""
+    current = start
+    while current < end:
+        upper = date(current.year + current.month // 12, current.month % 12 + 1, 1)
+        yield current, upper
+        current = upper
+
+
+def _rebuild_table(table: str, partitioned: bool) -> None:
+    """
+    Recreate a table with or without RANGE partitioning, keeping its data.
+
+    The id sequence is detached from the old table and re-attached to the new
+    one so existing ids keep counting up from where they were.
+    """
+    legacy = f"{table}_legacy"
+
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE")
+    op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    op.execute(f"ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey")
+
+    if partitioned:
+        op.execute(
+            f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS, "
+            f"PRIMARY KEY (id, timestamp)) PARTITION BY RANGE (timestamp)"
+        )
+        for lower, upper in _months(PARTITION_START, PARTITION_END):
+            op.execute(
+                f"CREATE TABLE {table}_p{lower:%Y_%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+    else:
+        op.execute(f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS, PRIMARY KEY (id))")
+
+    op.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+    op.execute(f"DROP TABLE {legacy}")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+
+    indexes = PARTITIONED_INDEXES if partitioned else PLAIN_INDEXES
+    for name, columns, unique in indexes[table]:
+        op.create_index(name, table, columns, unique=unique)
+
+
+def upgrade() -> None:
+    for table in PARTITIONED_INDEXES:
+        _rebuild_table(table, partitioned=True)
+
+
+def downgrade() -> None:
+    for table in PARTITIONED_INDEXES:
+        _rebuild_table(table, partitioned=False)
@@ -0,0 +1,62 @@
+"""Replace single-column indexes with covering composites
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-14
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+# Single-column indexes that the (symbol, timestamp) composites make redundant.
+REDUNDANT_INDEXES = {
+    'ohlcv': ['ix_ohlcv_symbol', 'ix_ohlcv_timestamp'],
+    'tickers': ['ix_tickers_symbol', 'ix_tickers_timestamp'],
+    'order_books': ['ix_order_books_symbol', 'ix_order_books_timestamp'],
+    'trades': ['ix_trades_symbol', 'ix_trades_timestamp'],
+    'market_metrics': ['ix_market_metrics_symbol', 'ix_market_metrics_timestamp'],
+    'onchain_metrics': ['ix_onchain_metrics_symbol', 'ix_onchain_metrics_timestamp'],
+}
+
+# Composite indexes as (table, name, leading columns, unique, include).
+# All of them end in timestamp, DESC after upgrade.
+COMPOSITE_INDEXES = [
+    ('ohlcv', 'idx_symbol_timeframe_timestamp', ['symbol', 'timeframe'], True,
+     ['open', 'high', 'low', 'close', 'volume']),
+    ('tickers', 'idx_symbol_timestamp', ['symbol'], False,
+     ['last_price', 'bid_price', 'ask_price']),
+    ('order_books', 'idx_orderbook_symbol_timestamp', ['symbol'], False, []),
+    ('trades', 'idx_trade_symbol_timestamp', ['symbol'], False,
+     ['price', 'volume', 'side']),
+    ('market_metrics', 'idx_metrics_symbol_timestamp', ['symbol'], False, []),
+    ('onchain_metrics', 'idx_onchain_symbol_timestamp', ['symbol'], False, []),
+]
+
+
+def upgrade() -> None:
+    for table, name, columns, unique, include in COMPOSITE_INDEXES:
+        op.drop_index(name, table_name=table)
+        op.create_index(
+            name, table, [*columns, sa.text('timestamp DESC')],
+            unique=unique, postgresql_include=include,
+        )
+
+    for table, names in REDUNDANT_INDEXES.items():
+        for name in names:
+            op.drop_index(name, table_name=table)
+
+
+def downgrade() -> None:
+    for table, names in REDUNDANT_INDEXES.items():
+        for name in names:
+            op.create_index(name, table, [name.rsplit('_', 1)[1]], unique=False)
+
+    for table, name, columns, unique, include in COMPOSITE_INDEXES:
+        op.drop_index(name, table_name=table)
+        op.create_index(name, table, [*columns, 'timestamp'], unique=unique)
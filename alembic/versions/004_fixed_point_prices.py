@@ -0,0 +1,44 @@
+"""Store OHLC and trade prices as scaled int64
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-14
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+SCALE = 10 ** 8
+
+# Columns converted from double precision to BIGINT scaled by 1e8, renamed
+# with an _e8 suffix. Base-asset volumes stay double precision since they can
+# overflow int64 at this scale.
+FIXED_POINT_COLUMNS = {
+    'ohlcv': ['open', 'high', 'low', 'close'],
+    'trades': ['price', 'quote_volume'],
+}
+
+
+def upgrade() -> None:
+    for table, columns in FIXED_POINT_COLUMNS.items():
+        for column in columns:
+            op.alter_column(table, column, new_column_name=f'{column}_e8')
+            op.execute(
+                f"ALTER TABLE {table} ALTER COLUMN {column}_e8 TYPE BIGINT "
+                f"USING round({column}_e8::numeric * {SCALE})::bigint"
+            )
+
+
+def downgrade() -> None:
+    for table, columns in FIXED_POINT_COLUMNS.items():
+        for column in columns:
+            op.execute(
+                f"ALTER TABLE {table} ALTER COLUMN {column}_e8 TYPE DOUBLE PRECISION "
+                f"USING {column}_e8::double precision / {SCALE}"
+            )
+            op.alter_column(table, f'{column}_e8', new_column_name=column)
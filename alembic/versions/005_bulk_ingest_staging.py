@@ -0,0 +1,83 @@
+"""Add UNLOGGED staging tables for COPY-based ingest
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-14
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+STAGING_TABLES = ['ohlcv', 'trades']
+
+
+def upgrade() -> None:
+    for table in STAGING_TABLES:
+        op.execute(f"CREATE UNLOGGED TABLE {table}_staging (LIKE {table})")
+        op.execute(f"ALTER TABLE {table}_staging DROP COLUMN id")
+
+    op.execute("""
+    CREATE OR REPLACE FUNCTION flush_ohlcv_staging() RETURNS integer AS $$
+    DECLARE
+        merged integer;
+    BEGIN
+        WITH moved AS (
+            DELETE FROM ohlcv_staging RETURNING *
+        )
+        INSERT INTO ohlcv (
+            symbol, exchange, timeframe, timestamp, open_e8, high_e8, low_e8, close_e8,
+            volume, quote_volume, trades_count, created_at, updated_at
+        )
+        SELECT DISTINCT ON (symbol, timeframe, timestamp)
+            symbol, exchange, timeframe, timestamp, open_e8, high_e8, low_e8, close_e8,
+            volume, quote_volume, trades_count, created_at, created_at
+        FROM moved
+        ORDER BY symbol, timeframe, timestamp, created_at DESC
+        ON CONFLICT (symbol, timeframe, timestamp) DO UPDATE SET
+            open_e8 = EXCLUDED.open_e8,
+            high_e8 = EXCLUDED.high_e8,
+            low_e8 = EXCLUDED.low_e8,
+            close_e8 = EXCLUDED.close_e8,
+            volume = EXCLUDED.volume,
+            quote_volume = EXCLUDED.quote_volume,
+            trades_count = EXCLUDED.trades_count,
+            updated_at = EXCLUDED.updated_at;
+        GET DIAGNOSTICS merged = ROW_COUNT;
+        RETURN merged;
+    END;
+    $$ LANGUAGE plpgsql
+    """)
+
+    op.execute("""
+    CREATE OR REPLACE FUNCTION flush_trades_staging() RETURNS integer AS $$
+    DECLARE
+        merged integer;
+    BEGIN
+        WITH moved AS (
+            DELETE FROM trades_staging RETURNING *
+        )
+        INSERT INTO trades (
+            symbol, exchange, trade_id, timestamp, price_e8, volume, quote_volume_e8,
+            side, is_buyer_maker, created_at
+        )
+        SELECT
+            symbol, exchange, trade_id, timestamp, price_e8, volume, quote_volume_e8,
+            side, is_buyer_maker, created_at
+        FROM moved
+        ON CONFLICT (exchange, trade_id, timestamp) DO NOTHING;
+        GET DIAGNOSTICS merged = ROW_COUNT;
+        RETURN merged;
+    END;
+    $$ LANGUAGE plpgsql
+    """)
+
+
+def downgrade() -> None:
+    for table in STAGING_TABLES:
+        op.execute(f"DROP FUNCTION IF EXISTS flush_{table}_staging()")
+        op.execute(f"DROP TABLE IF EXISTS {table}_staging")
@@ -0,0 +1,24 @@
+"""Add symbols_mv materialized view
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-14
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE MATERIALIZED VIEW symbols_mv AS SELECT DISTINCT symbol FROM tickers")
+    # Required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute("CREATE UNIQUE INDEX idx_symbols_mv_symbol ON symbols_mv (symbol)")
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS symbols_mv")
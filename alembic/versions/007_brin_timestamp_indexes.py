@@ -0,0 +1,34 @@
+"""Add BRIN timestamp indexes on ohlcv and trades
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-14
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+BRIN_TABLES = ['ohlcv', 'trades']
+
+
+def upgrade() -> None:
+    # Timestamp-leading btree superseded by the BRIN index
+    op.drop_index('idx_timestamp_symbol', table_name='ohlcv')
+
+    for table in BRIN_TABLES:
+        op.create_index(
+            f'ix_{table}_timestamp_brin', table, ['timestamp'],
+            postgresql_using='brin', postgresql_with={'pages_per_range': 32},
+        )
+
+
+def downgrade() -> None:
+    for table in BRIN_TABLES:
+        op.drop_index(f'ix_{table}_timestamp_brin', table_name=table)
+
+    op.create_index('idx_timestamp_symbol', 'ohlcv', ['timestamp', 'symbol'])
@@ -0,0 +1,63 @@
+"""Store order book levels as double precision arrays
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-14
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+SIDES = {'bid': 'bids', 'ask': 'asks'}
+
+
+def upgrade() -> None:
+    for side, levels in SIDES.items():
+        for field in ('prices', 'volumes'):
+            op.add_column(
+                'order_books',
+                sa.Column(f'{side}_{field}', postgresql.ARRAY(postgresql.DOUBLE_PRECISION()), nullable=True)
+            )
+
+        # Split [[price, volume], ...] into parallel arrays, keeping level order
+        op.execute(f"""
+            UPDATE order_books SET
+                {side}_prices = ARRAY(
+                    SELECT (level->>0)::double precision
+                    FROM jsonb_array_elements({levels}) WITH ORDINALITY AS l(level, idx)
+                    ORDER BY idx
+                ),
+                {side}_volumes = ARRAY(
+                    SELECT (level->>1)::double precision
+                    FROM jsonb_array_elements({levels}) WITH ORDINALITY AS l(level, idx)
+                    ORDER BY idx
+                )
+        """)
+
+        for field in ('prices', 'volumes'):
+            op.alter_column('order_books', f'{side}_{field}', nullable=False)
+        op.drop_column('order_books', levels)
+
+
+def downgrade() -> None:
+    for side, levels in SIDES.items():
+        op.add_column('order_books', sa.Column(levels, postgresql.JSONB(), nullable=True))
+
+        op.execute(f"""
+            UPDATE order_books SET
+                {levels} = COALESCE((
+                    SELECT jsonb_agg(jsonb_build_array(price, volume) ORDER BY idx)
+                    FROM unnest({side}_prices, {side}_volumes) WITH ORDINALITY AS l(price, volume, idx)
+                ), '[]'::jsonb)
+        """)
+
+        op.alter_column('order_books', levels, nullable=False)
+        op.drop_column('order_books', f'{side}_prices')
+        op.drop_column('order_books', f'{side}_volumes')
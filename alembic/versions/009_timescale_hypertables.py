@@ -0,0 +1,154 @@
+"""Convert time-series tables to TimescaleDB hypertables when available
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-14
+
+"""
+from datetime import date
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+# Per table: chunk interval, compress_segmentby, compress_orderby. Every
+# column of a unique index must be a segmentby or orderby column, hence id
+# (primary key) and trade_id in the orderby lists.
+HYPERTABLES = {
+    'ohlcv': ('7 days', 'symbol, timeframe', 'timestamp DESC, id'),
+    'trades': ('1 day', 'symbol', 'timestamp DESC, id, exchange, trade_id'),
+    'tickers': ('1 day', 'symbol', 'timestamp DESC, id'),
+    'order_books': ('1 day', 'symbol', 'timestamp DESC, id'),
+    'market_metrics': ('30 days', 'symbol', 'timestamp DESC, id'),
+    'onchain_metrics': ('30 days', 'symbol', 'timestamp DESC, id'),
+}
+
+COMPRESS_AFTER = '7 days'
+RETENTION = {'trades': '90 days'}
+
+# Native partitions restored on downgrade, as in 002
+PARTITION_START = date(2024, 1, 1)
+PARTITION_END = date(2027, 1, 1)
+
+
+def _timescale_available() -> bool:
+    bind = op.get_bind()
+    return bind.execute(sa.text(
+        "SELECT 1 FROM pg_available_extensions WHERE name = 'timescaledb'"
+    )).scalar() is not None
+
+
+def _is_hypertable(table: str) -> bool:
+    bind = op.get_bind()
+    return bind.execute(sa.text(
+        "SELECT 1 FROM pg_extension WHERE extname = 'timescaledb'"
+    )).scalar() is not None and bind.execute(sa.text(
+        "SELECT 1 FROM timescaledb_information.hypertables WHERE hypertable_name = :t"
+    ), {'t': table}).scalar() is not None
+
+
+def _months(start: date, end: date):
+    """Yield (lower, upper) bounds for each month in [start, end)."""
+    current = start
+    while current < end:
+        upper = date(current.year + current.month // 12, current.month % 12 + 1, 1)
+        yield current, upper
+        current = upper
+
+
+def _rebuild_table(table: str, hypertable: bool) -> None:
+    """
+    Recreate a table as a hypertable or as a natively partitioned table.
+
+    Secondary index definitions are read from the catalog before the old
+    table is dropped and replayed on the new one.
+    """
+    bind = op.get_bind()
+    legacy = f"{table}_legacy"
+
+    indexes = bind.execute(sa.text(
+        "SELECT indexname, indexdef FROM pg_indexes "
+        "WHERE schemaname = current_schema() AND tablename = :t AND indexname <> :pkey"
+    ), {'t': table, 'pkey': f"{table}_pkey"}).all()
+
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE")
+    op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    op.execute(f"ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey")
+    for name, _ in indexes:
+        op.execute(f"DROP INDEX {name}")
+
+    if hypertable:
+        chunk_interval, segmentby, orderby = HYPERTABLES[table]
+        op.execute(
+            f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS, "
+            f"PRIMARY KEY (id, timestamp))"
+        )
+        op.execute(
+            f"SELECT create_hypertable('{table}', 'timestamp', "
+            f"chunk_time_interval => INTERVAL '{chunk_interval}')"
+        )
+    else:
+        op.execute(
+            f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS, "
+            f"PRIMARY KEY (id, timestamp)) PARTITION BY RANGE (timestamp)"
+        )
+        for lower, upper in _months(PARTITION_START, PARTITION_END):
+            op.execute(
+                f"CREATE TABLE {table}_p{lower:%Y_%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+    op.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+    op.execute(f"DROP TABLE {legacy}")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+
+    for _, indexdef in indexes:
+        if hypertable:
+            indexdef = indexdef.replace(' ON ONLY ', ' ON ')
+        op.execute(indexdef)
+
+    if hypertable:
+        op.execute(
+            f"ALTER TABLE {table} SET (timescaledb.compress, "
+            f"timescaledb.compress_segmentby = '{segmentby}', "
+            f"timescaledb.compress_orderby = '{orderby}')"
+        )
+        op.execute(f"SELECT add_compression_policy('{table}', INTERVAL '{COMPRESS_AFTER}')")
+        if table in RETENTION:
+            op.execute(f"SELECT add_retention_policy('{table}', INTERVAL '{RETENTION[table]}')")
+
+
+def _rebuild_all(hypertable: bool) -> None:
+    # symbols_mv depends on tickers and has to be recreated around it
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS symbols_mv")
+
+    for table in HYPERTABLES:
+        _rebuild_table(table, hypertable)
+
+    op.execute("CREATE MATERIALIZED VIEW symbols_mv AS SELECT DISTINCT symbol FROM tickers")
+    op.execute("CREATE UNIQUE INDEX idx_symbols_mv_symbol ON symbols_mv (symbol)")
+
+
+def upgrade() -> None:
+    if not _timescale_available():
+        logger.info("timescaledb extension not available, keeping native partitioning")
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS timescaledb")
+    _rebuild_all(hypertable=True)
+
+
+def downgrade() -> None:
+    if not _is_hypertable('ohlcv'):
+        return
+
+    _rebuild_all(hypertable=False)
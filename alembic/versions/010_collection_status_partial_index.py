@@ -0,0 +1,29 @@
+"""Add partial index for active and failed collection jobs
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-14
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_status_active',
+        'data_collection_status',
+        ['status', sa.text('started_at DESC')],
+        postgresql_include=['collector_name', 'symbol', 'error_message'],
+        postgresql_where=sa.text("status IN ('failed', 'running', 'pending')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_status_active', table_name='data_collection_status')
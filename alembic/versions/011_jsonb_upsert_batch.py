@@ -0,0 +1,36 @@
+"""Add jsonb batch upsert functions for OHLCV and trades
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-14
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+STAGING_TABLES = ['ohlcv', 'trades']
+
+
+def upgrade() -> None:
+    # Rows are keyed by staging column names and merged by the same
+    # flush_*_staging() used for COPY loads, so conflict handling is shared.
+    for table in STAGING_TABLES:
+        op.execute(f"""
+        CREATE OR REPLACE FUNCTION upsert_{table}_batch(rows jsonb) RETURNS integer AS $$
+        BEGIN
+            INSERT INTO {table}_staging
+            SELECT * FROM jsonb_populate_recordset(NULL::{table}_staging, rows);
+            RETURN flush_{table}_staging();
+        END;
+        $$ LANGUAGE plpgsql
+        """)
+
+
+def downgrade() -> None:
+    for table in STAGING_TABLES:
+        op.execute(f"DROP FUNCTION IF EXISTS upsert_{table}_batch(jsonb)")
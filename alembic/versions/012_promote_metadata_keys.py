@@ -0,0 +1,61 @@
+"""Promote hot metadata keys to typed columns and index the rest
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-14
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+# table: (JSONB column as named by the models, promoted keys)
+PROMOTED = {
+    'market_metrics': ('market_metadata', ['ath', 'atl']),
+    'onchain_metrics': ('chain_metadata', ['market_price_usd', 'miners_revenue_usd']),
+}
+
+
+def upgrade() -> None:
+    # 001 created the JSONB columns as "metadata"; the models have always
+    # used these names, so align the schema first.
+    for table, (column, keys) in PROMOTED.items():
+        op.alter_column(table, 'metadata', new_column_name=column)
+    op.alter_column('data_collection_status', 'metadata', new_column_name='collection_metadata')
+
+    for table, (column, keys) in PROMOTED.items():
+        for key in keys:
+            op.add_column(table, sa.Column(key, sa.Float(), nullable=True))
+            op.execute(
+                f"UPDATE {table} SET {key} = ({column}->>'{key}')::double precision "
+                f"WHERE {column} ? '{key}'"
+            )
+        removed = ' - '.join(f"'{key}'" for key in keys)
+        op.execute(f"UPDATE {table} SET {column} = {column} - {removed} WHERE {column} IS NOT NULL")
+
+        op.create_index(
+            f'idx_{table}_metadata_gin', table, [column],
+            postgresql_using='gin', postgresql_ops={column: 'jsonb_path_ops'},
+        )
+
+
+def downgrade() -> None:
+    for table, (column, keys) in PROMOTED.items():
+        op.drop_index(f'idx_{table}_metadata_gin', table_name=table)
+
+        pairs = ', '.join(f"'{key}', {key}" for key in keys)
+        op.execute(
+            f"UPDATE {table} SET {column} = COALESCE({column}, '{{}}'::jsonb) "
+            f"|| jsonb_strip_nulls(jsonb_build_object({pairs}))"
+        )
+        for key in keys:
+            op.drop_column(table, key)
+
+    for table, (column, keys) in PROMOTED.items():
+        op.alter_column(table, column, new_column_name='metadata')
+    op.alter_column('data_collection_status', 'collection_metadata', new_column_name='metadata')
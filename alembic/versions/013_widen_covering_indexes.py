@@ -0,0 +1,45 @@
+"""Widen covering indexes for the CSV export and trade summary queries
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-14
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+# (table, name, leading columns, unique, include before, include after).
+# The OHLCV CSV export reads quote_volume and trades_count, and the symbol
+# summary aggregates volume by is_buyer_maker; including them lets both run
+# as index-only scans.
+COVERING_INDEXES = [
+    ('ohlcv', 'idx_symbol_timeframe_timestamp', ['symbol', 'timeframe'], True,
+     ['open_e8', 'high_e8', 'low_e8', 'close_e8', 'volume'],
+     ['open_e8', 'high_e8', 'low_e8', 'close_e8', 'volume', 'quote_volume', 'trades_count']),
+    ('trades', 'idx_trade_symbol_timestamp', ['symbol'], False,
+     ['price_e8', 'volume', 'side'],
+     ['price_e8', 'volume', 'side', 'is_buyer_maker']),
+]
+
+
+def _rebuild(include_index: int) -> None:
+    for table, name, columns, unique, *includes in COVERING_INDEXES:
+        op.drop_index(name, table_name=table)
+        op.create_index(
+            name, table, [*columns, sa.text('timestamp DESC')],
+            unique=unique, postgresql_include=includes[include_index],
+        )
+
+
+def upgrade() -> None:
+    _rebuild(1)
+
+
+def downgrade() -> None:
+    _rebuild(0)
@@ -0,0 +1,44 @@
+"""Make the metrics (symbol, timestamp) indexes unique
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-14
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '014'
+down_revision = '013'
+branch_labels = None
+depends_on = None
+
+# (table, index). One snapshot per symbol and collection time, so collectors
+# can insert with ON CONFLICT DO NOTHING instead of failing the whole batch.
+# The index already led every symbol lookup; it just becomes unique.
+METRICS_INDEXES = [
+    ('market_metrics', 'idx_metrics_symbol_timestamp'),
+    ('onchain_metrics', 'idx_onchain_symbol_timestamp'),
+]
+
+
+def _rebuild(unique: bool) -> None:
+    for table, name in METRICS_INDEXES:
+        if unique:
+            # Keep the first row of any existing duplicates
+            op.execute(f"""
+                DELETE FROM {table} AS t
+                USING {table} AS d
+                WHERE t.symbol = d.symbol AND t.timestamp = d.timestamp AND t.id > d.id
+            """)
+        op.drop_index(name, table_name=table)
+        op.create_index(name, table, ['symbol', sa.text('timestamp DESC')], unique=unique)
+
+
+def upgrade() -> None:
+    _rebuild(True)
+
+
+def downgrade() -> None:
+    _rebuild(False)
@@ -0,0 +1,42 @@
+"""Default audit timestamps on the server
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-14
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '015'
+down_revision = '014'
+branch_labels = None
+depends_on = None
+
+# Naive UTC, matching what datetime.utcnow() produced client-side
+UTC_NOW = sa.text("timezone('utc', now())")
+
+# table: audit columns the models no longer fill in per row
+AUDIT_COLUMNS = {
+    'ohlcv': ['created_at', 'updated_at'],
+    'tickers': ['created_at'],
+    'order_books': ['created_at'],
+    'trades': ['created_at'],
+    'market_metrics': ['created_at', 'updated_at'],
+    'onchain_metrics': ['created_at'],
+}
+
+
+def upgrade() -> None:
+    # Set on the parent tables, so existing and future partitions inherit it.
+    # The staging tables keep no default; bulk loads send created_at.
+    for table, columns in AUDIT_COLUMNS.items():
+        for column in columns:
+            op.alter_column(table, column, server_default=UTC_NOW)
+
+
+def downgrade() -> None:
+    for table, columns in AUDIT_COLUMNS.items():
+        for column in columns:
+            op.alter_column(table, column, server_default=None)
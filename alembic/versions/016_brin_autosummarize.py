@@ -0,0 +1,38 @@
+"""Summarize new BRIN ranges as they fill
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-14
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = '016'
+down_revision = '015'
+branch_labels = None
+depends_on = None
+
+BRIN_TABLES = ['ohlcv', 'trades']
+
+
+def _rebuild(options: dict) -> None:
+    # Partitioned indexes do not take ALTER INDEX ... SET, so they are
+    # recreated; the options are copied to every partition's index
+    for table in BRIN_TABLES:
+        name = f'ix_{table}_timestamp_brin'
+        op.drop_index(name, table_name=table)
+        op.create_index(
+            name, table, ['timestamp'],
+            postgresql_using='brin', postgresql_with=options,
+        )
+
+
+def upgrade() -> None:
+    # Without autosummarize a filled page range stays unsummarized until the
+    # next VACUUM, so range scans read the newest (most queried) rows in full
+    _rebuild({'pages_per_range': 32, 'autosummarize': 'on'})
+
+
+def downgrade() -> None:
+    _rebuild({'pages_per_range': 32})
@@ -0,0 +1,62 @@
+"""Drop trades.side in favour of is_buyer_maker
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-14
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '017'
+down_revision = '016'
+branch_labels = None
+depends_on = None
+
+# side was never loaded by the COPY path, so it is NULL throughout; the
+# models now derive it from is_buyer_maker, the one-byte flag it duplicates
+FLUSH_TRADES_STAGING = """
+CREATE OR REPLACE FUNCTION flush_trades_staging() RETURNS integer AS $$
+DECLARE
+    merged integer;
+BEGIN
+    WITH moved AS (
+        DELETE FROM trades_staging RETURNING *
+    )
+    INSERT INTO trades (
+        symbol, exchange, trade_id, timestamp, price_e8, volume, quote_volume_e8,
+        {columns}
+    )
+    SELECT
+        symbol, exchange, trade_id, timestamp, price_e8, volume, quote_volume_e8,
+        {columns}
+    FROM moved
+    ON CONFLICT (exchange, trade_id, timestamp) DO NOTHING;
+    GET DIAGNOSTICS merged = ROW_COUNT;
+    RETURN merged;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def _rebuild_covering_index(include: list) -> None:
+    op.drop_index('idx_trade_symbol_timestamp', table_name='trades')
+    op.create_index(
+        'idx_trade_symbol_timestamp', 'trades', ['symbol', sa.text('timestamp DESC')],
+        postgresql_include=include,
+    )
+
+
+def upgrade() -> None:
+    op.execute(FLUSH_TRADES_STAGING.format(columns='is_buyer_maker, created_at'))
+    _rebuild_covering_index(['price_e8', 'volume', 'is_buyer_maker'])
+    for table in ('trades_staging', 'trades'):
+        op.drop_column(table, 'side')
+
+
+def downgrade() -> None:
+    for table in ('trades', 'trades_staging'):
+        op.add_column(table, sa.Column('side', sa.String(length=10), nullable=True))
+    _rebuild_covering_index(['price_e8', 'volume', 'side', 'is_buyer_maker'])
+    op.execute(FLUSH_TRADES_STAGING.format(columns='side, is_buyer_maker, created_at'))
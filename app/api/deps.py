@@ -1,6 +1,10 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Security, status
+from fastapi.security import APIKeyHeader
+import hashlib
+import hmac
+import secrets
 
 from app.database import get_db
 from app.cache.redis_cache import cache
@@ -20,24 +24,45 @@ async def get_cache():
     return cache
 
 
-def verify_api_key(api_key: str = None) -> bool:
+def _digest(api_key: str) -> bytes:
+    """Keyed hash of an API key; the raw keys are never kept in memory."""
+    return hmac.new(_KEY_HASH_SECRET, api_key.encode(), hashlib.sha256).digest()
+
+
+# Random per-process secret: digests only need to be comparable in-process
+_KEY_HASH_SECRET = secrets.token_bytes(32)
+_api_key_digests = frozenset(_digest(key) for key in settings.api_keys_list)
+
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+
+
+def verify_api_key(api_key: Optional[str] = Security(api_key_header)) -> bool:
     """
     Verify API key for authenticated endpoints.
     
+    Keys are checked with an O(1) set lookup of their HMAC digest, so
+    rejecting an unknown key needs no DB or Redis round trip. Lookup time
+    does not leak the key because the digest is keyed with a secret the
+    caller does not know.
+    
     Args:
-        api_key: API key from request
+        api_key: API key from the X-API-Key header
         
     Returns:
         Verification status
         
     Raises:
-        HTTPException: If API key is invalid
+        HTTPException: If API key is missing or invalid
     """
-    # In production, implement proper API key verification
-    # This is a placeholder
     if not api_key:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="API key required"
         )
-    return True
\ No newline at end of file
+    
+    if _digest(api_key) not in _api_key_digests:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key"
+        )
+    return True
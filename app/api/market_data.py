@@ -8,7 +8,7 @@ from app.api.deps import get_db_session, get_cache
 from app.models.market_data import OHLCV, Ticker, OrderBook, Trade, MarketMetrics
 from app.schemas.market_data import (
     OHLCVResponse, TickerResponse, OrderBookResponse,
-    TradeResponse, MarketMetricsResponse
+    TradeResponse, MarketMetricsResponse, OHLCVRow
 )
 from app.cache.redis_cache import RedisCache
 
@@ -44,8 +44,8 @@ async def get_ohlcv(
     if cached_data:
         return cached_data
     
-    # Build query
-    query = select(OHLCV).where(
+    # Build query; plain columns instead of entities, no ORM instances
+    query = select(*(getattr(OHLCV, key) for key in OHLCVRow.__annotations__)).where(
         and_(
             OHLCV.symbol == symbol,
             OHLCV.timeframe == timeframe
@@ -61,18 +61,15 @@ async def get_ohlcv(
     
     # Execute query
     result = await db.execute(query)
-    ohlcv_data = result.scalars().all()
+    ohlcv_data = [dict(row) for row in result.mappings().all()]
     
     if not ohlcv_data:
         raise HTTPException(status_code=404, detail=f"No OHLCV data found for {symbol}")
     
-    # Convert to response models
-    response = [OHLCVResponse.model_validate(item) for item in ohlcv_data]
-    
-    # Cache results
-    await cache.set(cache_key, [r.model_dump() for r in response], ttl=60)
+    # Rows already have the OHLCVRow shape: cache them as is
+    await cache.set(cache_key, ohlcv_data, ttl=60)
     
-    return response
+    return ohlcv_data
 
 
 @router.get("/ticker/{symbol}", response_model=TickerResponse)
@@ -133,27 +130,15 @@ async def get_all_tickers(
     if cached_data:
         return cached_data
     
-    # Get latest ticker for each symbol
-    # This query gets the most recent ticker for each unique symbol
-    subquery = (
-        select(
-            Ticker.symbol,
-            select(Ticker.id)
-            .where(Ticker.symbol == Ticker.symbol)
-            .order_by(desc(Ticker.timestamp))
-            .limit(1)
-            .correlate(Ticker)
-            .scalar_subquery()
-            .label("latest_id")
-        )
+    # Latest ticker per symbol in a single pass over the
+    # (symbol, timestamp DESC) index: SELECT DISTINCT ON (symbol) ...
+    query = (
+        select(Ticker)
         .distinct(Ticker.symbol)
-        .subquery()
+        .order_by(Ticker.symbol, desc(Ticker.timestamp))
+        .limit(limit)
     )
     
-    query = select(Ticker).where(Ticker.id.in_(
-        select(subquery.c.latest_id)
-    )).limit(limit)
-    
     result = await db.execute(query)
     tickers = result.scalars().all()
     
@@ -1,29 +1,381 @@
 # See artifact: crypto_api_market_data
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from pydantic import AliasChoices
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, desc
-from typing import List, Optional
-from datetime import datetime
+from sqlalchemy import select, and_, desc, bindparam, case, func, String
+from sqlalchemy.dialects.postgresql import ARRAY
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from datetime import datetime, timedelta, timezone
+import asyncio
+import hashlib
+import logging
+import orjson
 
 from app.api.deps import get_db_session, get_cache
-from app.models.market_data import OHLCV, Ticker, OrderBook, Trade, MarketMetrics
+from app.database import async_session_factory
+from app.models.market_data import OHLCV, Ticker, OrderBook, Trade, MarketMetrics, symbols_view
 from app.schemas.market_data import (
     OHLCVResponse, TickerResponse, OrderBookResponse,
-    TradeResponse, MarketMetricsResponse
+    TradeResponse, MarketMetricsResponse, OHLCVRow, TickerRow, TradeRow
 )
-from app.cache.redis_cache import RedisCache
+from app.cache.redis_cache import RedisCache, NULL_SENTINEL
+from app.cache.singleflight import Singleflight
+from app.config import get_settings
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+router = APIRouter(default_response_class=ORJSONResponse)
+settings = get_settings()
+
+# Candle length per timeframe, used to tell when an OHLCV range is final
+TIMEFRAME_SECONDS = {
+    "1m": 60, "5m": 300, "15m": 900, "1h": 3600, "4h": 14400, "1d": 86400,
+}
+IMMUTABLE_MAX_AGE = 86400
+CSV_EXPORT_BATCH_SIZE = 1000
+
+
+def _row_columns(model, row_type) -> list:
+    """
+    The model columns named by a row TypedDict, for selecting plain rows.
+    
+    Read-only endpoints select columns instead of entities, skipping ORM
+    instance hydration and identity-map bookkeeping. Rows stay keyed by
+    attribute name (e.g. OHLCV.open rather than open_e8) and column types
+    still convert values, so each row already has the response shape and
+    is encoded as dict(row) without building a response model.
+    """
+    return [getattr(model, key) for key in row_type.__annotations__]
+
+
+def _encode_rows(rows) -> bytes:
+    """Serialize row mappings as a JSON array."""
+    return orjson.dumps([dict(row) for row in rows])
+
+
+# Hot query shapes, built once at import and executed with bound parameters.
+# Identical SQL text lets SQLAlchemy's compiled cache and asyncpg's per-connection
+# prepared statement cache (see app.database) skip compiling and re-planning.
+OHLCV_BY_SYMBOL = select(*_row_columns(OHLCV, OHLCVRow)).where(
+    and_(
+        OHLCV.symbol == bindparam("symbol"),
+        OHLCV.timeframe == bindparam("timeframe")
+    )
+)
+LATEST_TICKER = (
+    select(*_row_columns(Ticker, TickerRow))
+    .where(Ticker.symbol == bindparam("symbol"))
+    .order_by(desc(Ticker.timestamp))
+    .limit(1)
+)
+# symbol = ANY(:symbols) binds the whole list as one array parameter, so the
+# SQL text stays the same however many symbols are requested (an expanding
+# IN list renders one statement per list length)
+LATEST_TICKERS = (
+    select(*_row_columns(Ticker, TickerRow))
+    .where(Ticker.symbol == func.any(bindparam("symbols", type_=ARRAY(String))))
+    .distinct(Ticker.symbol)
+    .order_by(Ticker.symbol, desc(Ticker.timestamp))
+)
+LATEST_ORDERBOOK = (
+    select(OrderBook)
+    .where(OrderBook.symbol == bindparam("symbol"))
+    .order_by(desc(OrderBook.timestamp))
+    .limit(1)
+)
+LATEST_MARKET_METRICS = (
+    select(MarketMetrics)
+    .where(MarketMetrics.symbol == bindparam("symbol"))
+    .order_by(desc(MarketMetrics.timestamp))
+    .limit(1)
+)
+
+
+async def warm_queries() -> None:
+    """
+    Compile and prepare the hot read queries before the first request.
+    
+    SQLAlchemy compiles each statement shape once and asyncpg prepares it
+    per connection, which made the first request to each endpoint 10-25 ms
+    slower than the rest. Running the shapes once at startup, for a symbol
+    that matches nothing, pays that up front; LIFO pooling keeps reusing
+    the connection they were prepared on. OHLCV and all-tickers queries
+    are built per request, but their cached form does not depend on the
+    limit or on a missing time range.
+    """
+    params = {"symbol": "", "timeframe": "", "symbols": []}
+    queries = [
+        OHLCV_BY_SYMBOL.order_by(desc(OHLCV.timestamp)).limit(1),
+        LATEST_TICKER,
+        LATEST_TICKERS,
+        select(*_row_columns(Ticker, TickerRow))
+        .distinct(Ticker.symbol)
+        .order_by(Ticker.symbol, desc(Ticker.timestamp))
+        .limit(1),
+        LATEST_ORDERBOOK,
+        LATEST_MARKET_METRICS,
+    ]
+    try:
+        async with async_session_factory() as session:
+            for query in queries:
+                await session.execute(query, params)
+    except Exception as e:
+        logger.error(f"Query warm-up failed: {e}")
+
+
+# Responses whose rows are not plain columns (order book levels zipped from
+# parallel arrays, aliased metadata) select the entity and read the response
+# fields off it. The entity is built from our own typed columns, so running
+# it through model_validate and dumping the model would only re-check it;
+# the dict encodes to the same JSON in about half the time.
+def _entity_fields(response_model) -> Dict[str, str]:
+    """
+    Map each response field to the entity attribute it is read from.
+    
+    Renamed columns (e.g. market_metadata, served as metadata) are taken
+    from the field's validation alias, whose first choice is the ORM name,
+    so the schema stays the one place the rename is declared.
+    """
+    fields = {}
+    for name, field in response_model.model_fields.items():
+        alias = field.validation_alias
+        if isinstance(alias, AliasChoices):
+            alias = alias.choices[0]
+        fields[name] = alias if isinstance(alias, str) else name
+    return fields
+
+
+ORDERBOOK_FIELDS = _entity_fields(OrderBookResponse)
+MARKET_METRICS_FIELDS = _entity_fields(MarketMetricsResponse)
+
+
+def _encode_entity(entity, fields: Dict[str, str]) -> bytes:
+    """Serialize the response fields of a stored entity."""
+    return orjson.dumps({name: getattr(entity, attribute) for name, attribute in fields.items()})
+
+
+# Background refreshes in flight; held so they are not garbage collected
+_refresh_tasks: Set[asyncio.Task] = set()
+_inflight = Singleflight()
+
+
+async def _fill(
+    cache: RedisCache,
+    cache_key: str,
+    load: Callable[[AsyncSession], Awaitable[Optional[bytes]]],
+    db: AsyncSession,
+    fresh_ttl: int,
+    stale_ttl: int
+) -> bytes:
+    """
+    Run a loader and store its body, or NULL_SENTINEL if it found nothing.
+    
+    Misses are remembered for CACHE_NEGATIVE_TTL so unknown symbols don't
+    hammer the DB.
+    """
+    body = await load(db)
+    if body is None:
+        ttl = settings.CACHE_NEGATIVE_TTL
+        await cache.set_bytes(cache_key, NULL_SENTINEL, ttl=ttl, fresh_ttl=ttl)
+        return NULL_SENTINEL
+    
+    await cache.set_bytes(cache_key, body, ttl=stale_ttl, fresh_ttl=fresh_ttl)
+    return body
+
+
+async def _refresh(
+    cache: RedisCache,
+    cache_key: str,
+    load: Callable[[AsyncSession], Awaitable[Optional[bytes]]],
+    fresh_ttl: int,
+    stale_ttl: int
+) -> None:
+    """Refresh a stale entry in the background; the caller holds the fill lock."""
+    try:
+        # The request's session is closed by the time this runs
+        async with async_session_factory() as session:
+            await _fill(cache, cache_key, load, session, fresh_ttl, stale_ttl)
+    except Exception as e:
+        logger.error(f"Background refresh failed for {cache_key}: {e}")
+    finally:
+        await cache.release_lock(cache_key)
+
+
+async def _cached_body(
+    cache: RedisCache,
+    cache_key: str,
+    load: Callable[[AsyncSession], Awaitable[Optional[bytes]]],
+    fresh_ttl: int,
+    stale_ttl: Optional[int] = None
+) -> bytes:
+    """
+    Get a JSON body from cache with stale-while-revalidate.
+    
+    Fresh hits are returned as is. Stale hits are also returned at once,
+    while the one worker that gets the fill lock reloads the entry in a
+    background task. On a miss only one caller per worker, and only the
+    lock holder across workers, queries the DB; the others wait for its
+    result, so an expiring key causes one query instead of one per
+    concurrent request.
+    
+    Args:
+        cache: Cache instance
+        cache_key: Cache key
+        load: Loads the serialized body using the given session, or None
+        fresh_ttl: Seconds before an entry is refreshed
+        stale_ttl: Seconds a stale entry may still be served
+        
+    Returns:
+        Serialized body, or NULL_SENTINEL if there is no data
+    """
+    stale_ttl = max(stale_ttl or settings.CACHE_STALE_TTL, fresh_ttl)
+    
+    body, fresh = await cache.get_bytes_swr(cache_key)
+    if body is not None:
+        if not fresh and await cache.acquire_lock(cache_key):
+            task = asyncio.create_task(_refresh(cache, cache_key, load, fresh_ttl, stale_ttl))
+            _refresh_tasks.add(task)
+            task.add_done_callback(_refresh_tasks.discard)
+        return body
+    
+    # Concurrent misses in this worker share one fill; across workers the
+    # Redis lock picks a single filler and the rest wait for its result.
+    # The fill outlives any one caller, so it opens its own session rather
+    # than borrowing one a disconnecting request would close under it.
+    async def fill_once() -> bytes:
+        async with async_session_factory() as session:
+            if await cache.acquire_lock(cache_key):
+                try:
+                    return await _fill(cache, cache_key, load, session, fresh_ttl, stale_ttl)
+                finally:
+                    await cache.release_lock(cache_key)
+            
+            body = await cache.wait_for_bytes(cache_key)
+            if body is not None:
+                return body
+            
+            # The lock holder is slow or gone: answer from the DB without caching
+            return await load(session) or NULL_SENTINEL
+    
+    return await _inflight.do(cache_key, fill_once)
+
+
+def _etag(data: bytes) -> str:
+    """Strong ETag for the given bytes."""
+    return '"' + hashlib.blake2b(data, digest_size=16).hexdigest() + '"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the client's If-None-Match covers etag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in tags or "*" in tags
+
+
+def _json_response(
+    request: Request,
+    body: bytes,
+    max_age: int,
+    etag: Optional[str] = None,
+    immutable: bool = False
+) -> Response:
+    """
+    Build a JSON response with Cache-Control and ETag headers.
+    
+    Args:
+        request: Incoming request (for If-None-Match)
+        body: Serialized JSON body
+        max_age: Cache-Control max-age in seconds
+        etag: Precomputed ETag, defaults to a hash of body
+        immutable: Mark the response as never changing
+        
+    Returns:
+        304 if the client already has this version, otherwise the body
+    """
+    etag = etag or _etag(body)
+    cache_control = f"public, max-age={max_age}"
+    if immutable:
+        cache_control += ", immutable"
+    headers = {"Cache-Control": cache_control, "ETag": etag}
+    
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _is_final_range(timeframe: str, end_time: Optional[datetime]) -> bool:
+    """Whether every candle up to end_time is closed and will not change."""
+    if end_time is None:
+        return False
+    if end_time.tzinfo:
+        end_time = end_time.astimezone(timezone.utc).replace(tzinfo=None)
+    settle = max(TIMEFRAME_SECONDS.get(timeframe, 86400), 3600)
+    return end_time < datetime.utcnow() - timedelta(seconds=settle)
+
+
+def _is_settled(body: bytes, timeframe: str) -> bool:
+    """Whether every candle in an encoded OHLCV body was stored after it closed."""
+    candle = timedelta(seconds=TIMEFRAME_SECONDS.get(timeframe, 86400))
+    return all(
+        datetime.fromisoformat(row["created_at"]) >= datetime.fromisoformat(row["timestamp"]) + candle
+        for row in orjson.loads(body)
+    )
+
+
+async def _latest_ticker_bodies(
+    symbols: List[str],
+    db: AsyncSession,
+    cache: RedisCache
+) -> Dict[str, bytes]:
+    """
+    Latest ticker JSON per symbol in two round trips.
+    
+    Cached tickers are fetched with a single MGET; misses and stale entries
+    are loaded with one DISTINCT ON query and written back in one pipeline.
+    Entries share the api:ticker:{symbol} keys of get_ticker.
+    
+    Args:
+        symbols: Trading symbols, without duplicates
+        db: Database session
+        cache: Cache instance
+        
+    Returns:
+        Mapping of symbol to serialized TickerRow (unknown symbols omitted)
+    """
+    cached = await cache.get_many_bytes_swr([f"api:ticker:{symbol}" for symbol in symbols])
+    bodies = {
+        symbol: body for symbol, (body, fresh) in zip(symbols, cached)
+        if body is not None and fresh
+    }
+    
+    missing = [symbol for symbol in symbols if symbol not in bodies]
+    if missing:
+        result = await db.execute(LATEST_TICKERS, {"symbols": missing})
+        
+        fresh = {
+            ticker["symbol"]: orjson.dumps(dict(ticker))
+            for ticker in result.mappings().all()
+        }
+        bodies.update(fresh)
+        await cache.set_many_bytes(
+            {f"api:ticker:{symbol}": body for symbol, body in fresh.items()},
+            ttl=settings.CACHE_STALE_TTL,
+            fresh_ttl=30
+        )
+    
+    return {symbol: body for symbol, body in bodies.items() if body != NULL_SENTINEL}
 
 
 @router.get("/ohlcv/{symbol}", response_model=List[OHLCVResponse])
 async def get_ohlcv(
     symbol: str,
+    request: Request,
     timeframe: str = Query("1h", description="Timeframe (1m, 5m, 15m, 1h, 4h, 1d)"),
     start_time: Optional[datetime] = None,
     end_time: Optional[datetime] = None,
     limit: int = Query(100, le=1000),
-    db: AsyncSession = Depends(get_db_session),
     cache: RedisCache = Depends(get_cache)
 ):
     """
@@ -39,19 +391,15 @@ async def get_ohlcv(
     Returns:
         List of OHLCV records
     """
-    # Try cache first
-    cache_key = f"ohlcv:{symbol}:{timeframe}:{limit}"
-    cached_data = await cache.get(cache_key)
-    if cached_data:
-        return cached_data
+    cache_key = f"api:ohlcv:{symbol}:{timeframe}:{start_time}:{end_time}:{limit}"
+    
+    # Closed historical ranges are cached long. The ETag hashes the body,
+    # so a range that was backfilled since a client fetched it revalidates
+    # to the new rows instead of confirming the old ones.
+    final = _is_final_range(timeframe, end_time)
     
     # Build query
-    query = select(OHLCV).where(
-        and_(
-            OHLCV.symbol == symbol,
-            OHLCV.timeframe == timeframe
-        )
-    )
+    query = OHLCV_BY_SYMBOL
     
     if start_time:
         query = query.where(OHLCV.timestamp >= start_time)
@@ -60,26 +408,27 @@ async def get_ohlcv(
     
     query = query.order_by(desc(OHLCV.timestamp)).limit(limit)
     
-    # Execute query
-    result = await db.execute(query)
-    ohlcv_data = result.scalars().all()
+    async def load(session: AsyncSession) -> Optional[bytes]:
+        result = await session.execute(query, {"symbol": symbol, "timeframe": timeframe})
+        ohlcv_data = result.mappings().all()
+        # Rows already have the OHLCVRow shape: serialize once
+        return _encode_rows(ohlcv_data) if ohlcv_data else None
     
-    if not ohlcv_data:
+    # Cached entries are the final JSON body
+    body = await _cached_body(cache, cache_key, load, fresh_ttl=IMMUTABLE_MAX_AGE if final else 60)
+    if body == NULL_SENTINEL:
         raise HTTPException(status_code=404, detail=f"No OHLCV data found for {symbol}")
     
-    # Convert to response models
-    response = [OHLCVResponse.model_validate(item) for item in ohlcv_data]
-    
-    # Cache results
-    await cache.set(cache_key, [r.model_dump() for r in response], ttl=60)
-    
-    return response
+    # Only ranges whose candles were all stored after they closed are
+    # served as immutable; others keep the short max-age
+    immutable = final and _is_settled(body, timeframe)
+    return _json_response(request, body, IMMUTABLE_MAX_AGE if immutable else 60, immutable=immutable)
 
 
 @router.get("/ticker/{symbol}", response_model=TickerResponse)
 async def get_ticker(
     symbol: str,
-    db: AsyncSession = Depends(get_db_session),
+    request: Request,
     cache: RedisCache = Depends(get_cache)
 ):
     """
@@ -91,32 +440,26 @@ async def get_ticker(
     Returns:
         Latest ticker data
     """
-    # Try cache first
-    cache_key = f"ticker:{symbol}"
-    cached_data = await cache.get(cache_key)
-    if cached_data:
-        return cached_data
+    # Try cache first. Namespaced so it does not collide with the
+    # collectors' ticker:{symbol} price snapshots.
+    cache_key = f"api:ticker:{symbol}"
     
-    # Query database
-    query = select(Ticker).where(Ticker.symbol == symbol).order_by(desc(Ticker.timestamp)).limit(1)
-    result = await db.execute(query)
-    ticker = result.scalar_one_or_none()
+    async def load(session: AsyncSession) -> Optional[bytes]:
+        result = await session.execute(LATEST_TICKER, {"symbol": symbol})
+        ticker = result.mappings().one_or_none()
+        return orjson.dumps(dict(ticker)) if ticker else None
     
-    if not ticker:
+    body = await _cached_body(cache, cache_key, load, fresh_ttl=30)
+    if body == NULL_SENTINEL:
         raise HTTPException(status_code=404, detail=f"No ticker data found for {symbol}")
     
-    response = TickerResponse.model_validate(ticker)
-    
-    # Cache result
-    await cache.set(cache_key, response.model_dump(), ttl=30)
-    
-    return response
+    return _json_response(request, body, max_age=30)
 
 
 @router.get("/tickers", response_model=List[TickerResponse])
 async def get_all_tickers(
+    request: Request,
     limit: int = Query(50, le=200),
-    db: AsyncSession = Depends(get_db_session),
     cache: RedisCache = Depends(get_cache)
 ):
     """
@@ -128,48 +471,56 @@ async def get_all_tickers(
     Returns:
         List of latest tickers
     """
-    # Try cache first
-    cache_key = f"tickers:all:{limit}"
-    cached_data = await cache.get(cache_key)
-    if cached_data:
-        return cached_data
-    
-    # Get latest ticker for each symbol
-    # This query gets the most recent ticker for each unique symbol
-    subquery = (
-        select(
-            Ticker.symbol,
-            select(Ticker.id)
-            .where(Ticker.symbol == Ticker.symbol)
-            .order_by(desc(Ticker.timestamp))
-            .limit(1)
-            .correlate(Ticker)
-            .scalar_subquery()
-            .label("latest_id")
-        )
+    cache_key = f"api:tickers:all:{limit}"
+    
+    # Latest ticker per symbol in a single pass over the
+    # (symbol, timestamp DESC) index: SELECT DISTINCT ON (symbol) ...
+    query = (
+        select(*_row_columns(Ticker, TickerRow))
         .distinct(Ticker.symbol)
-        .subquery()
+        .order_by(Ticker.symbol, desc(Ticker.timestamp))
+        .limit(limit)
     )
     
-    query = select(Ticker).where(Ticker.id.in_(
-        select(subquery.c.latest_id)
-    )).limit(limit)
+    async def load(session: AsyncSession) -> Optional[bytes]:
+        result = await session.execute(query)
+        return _encode_rows(result.mappings().all())
     
-    result = await db.execute(query)
-    tickers = result.scalars().all()
+    body = await _cached_body(cache, cache_key, load, fresh_ttl=30)
+    return _json_response(request, body, max_age=30)
+
+
+@router.get("/tickers/batch", response_model=List[TickerResponse])
+async def get_tickers_batch(
+    request: Request,
+    symbols: str = Query(..., description="Comma-separated symbols, e.g. BTCUSDT,ETHUSDT"),
+    db: AsyncSession = Depends(get_db_session),
+    cache: RedisCache = Depends(get_cache)
+):
+    """
+    Get latest tickers for several symbols in one request.
     
-    response = [TickerResponse.model_validate(t) for t in tickers]
+    Args:
+        symbols: Comma-separated trading symbols
+        
+    Returns:
+        Latest ticker per symbol, in request order (unknown symbols omitted)
+    """
+    requested = list(dict.fromkeys(s.strip() for s in symbols.split(",") if s.strip()))
+    if not requested:
+        raise HTTPException(status_code=400, detail="No symbols given")
     
-    # Cache results
-    await cache.set(cache_key, [r.model_dump() for r in response], ttl=30)
+    bodies = await _latest_ticker_bodies(requested, db, cache)
     
-    return response
+    # Cached entries are already JSON, so splice them without re-encoding
+    body = b"[" + b",".join(bodies[s] for s in requested if s in bodies) + b"]"
+    return _json_response(request, body, max_age=30)
 
 
 @router.get("/orderbook/{symbol}", response_model=OrderBookResponse)
 async def get_orderbook(
     symbol: str,
-    db: AsyncSession = Depends(get_db_session),
+    request: Request,
     cache: RedisCache = Depends(get_cache)
 ):
     """
@@ -181,26 +532,22 @@ async def get_orderbook(
     Returns:
         Latest order book
     """
-    # Try cache first
-    cache_key = f"orderbook:{symbol}"
-    cached_data = await cache.get(cache_key)
-    if cached_data:
-        return cached_data
-    
-    # Query database
-    query = select(OrderBook).where(OrderBook.symbol == symbol).order_by(desc(OrderBook.timestamp)).limit(1)
-    result = await db.execute(query)
-    orderbook = result.scalar_one_or_none()
-    
-    if not orderbook:
+    # Try cache first. Namespaced so it does not collide with the
+    # collectors' top-of-book orderbook:{symbol} snapshots.
+    cache_key = f"api:orderbook:{symbol}"
+    
+    async def load(session: AsyncSession) -> Optional[bytes]:
+        result = await session.execute(LATEST_ORDERBOOK, {"symbol": symbol})
+        orderbook = result.scalar_one_or_none()
+        if not orderbook:
+            return None
+        return _encode_entity(orderbook, ORDERBOOK_FIELDS)
+    
+    body = await _cached_body(cache, cache_key, load, fresh_ttl=30)
+    if body == NULL_SENTINEL:
         raise HTTPException(status_code=404, detail=f"No order book found for {symbol}")
     
-    response = OrderBookResponse.model_validate(orderbook)
-    
-    # Cache result
-    await cache.set(cache_key, response.model_dump(), ttl=15)
-    
-    return response
+    return _json_response(request, body, max_age=30)
 
 
 @router.get("/trades/{symbol}", response_model=List[TradeResponse])
@@ -208,12 +555,15 @@ async def get_trades(
     symbol: str,
     start_time: Optional[datetime] = None,
     end_time: Optional[datetime] = None,
-    limit: int = Query(100, le=1000),
-    db: AsyncSession = Depends(get_db_session)
+    limit: int = Query(100, le=1000)
 ):
     """
     Get recent trades for a symbol.
     
+    Rows are streamed from a server-side cursor and encoded one at a time,
+    so memory stays flat regardless of limit. The stream owns its session
+    because request dependencies are torn down before the body is sent.
+    
     Args:
         symbol: Trading symbol (e.g., BTCUSDT)
         start_time: Start timestamp (optional)
@@ -224,7 +574,7 @@ async def get_trades(
         List of trades
     """
     # Build query
-    query = select(Trade).where(Trade.symbol == symbol)
+    query = select(*_row_columns(Trade, TradeRow)).where(Trade.symbol == symbol)
     
     if start_time:
         query = query.where(Trade.timestamp >= start_time)
@@ -233,20 +583,34 @@ async def get_trades(
     
     query = query.order_by(desc(Trade.timestamp)).limit(limit)
     
-    # Execute query
-    result = await db.execute(query)
-    trades = result.scalars().all()
+    session = async_session_factory()
+    try:
+        result = (await session.stream(query)).mappings()
+        first = await result.fetchone()
+    except Exception:
+        await session.close()
+        raise
     
-    if not trades:
+    if first is None:
+        await session.close()
         raise HTTPException(status_code=404, detail=f"No trades found for {symbol}")
     
-    return [TradeResponse.model_validate(t) for t in trades]
+    async def encode_trades():
+        try:
+            yield b"[" + orjson.dumps(dict(first))
+            async for trade in result:
+                yield b"," + orjson.dumps(dict(trade))
+            yield b"]"
+        finally:
+            await session.close()
+    
+    return StreamingResponse(encode_trades(), media_type="application/json")
 
 
 @router.get("/market-metrics/{symbol}", response_model=MarketMetricsResponse)
 async def get_market_metrics(
     symbol: str,
-    db: AsyncSession = Depends(get_db_session),
+    request: Request,
     cache: RedisCache = Depends(get_cache)
 ):
     """
@@ -258,30 +622,27 @@ async def get_market_metrics(
     Returns:
         Latest market metrics
     """
-    # Try cache first
-    cache_key = f"market_metrics:{symbol}"
-    cached_data = await cache.get(cache_key)
-    if cached_data:
-        return cached_data
-    
-    # Query database
-    query = select(MarketMetrics).where(MarketMetrics.symbol == symbol).order_by(desc(MarketMetrics.timestamp)).limit(1)
-    result = await db.execute(query)
-    metrics = result.scalar_one_or_none()
-    
-    if not metrics:
+    # Try cache first. Namespaced so it does not collide with the
+    # CoinGecko collector's market_metrics:{symbol} snapshots.
+    cache_key = f"api:market_metrics:{symbol}"
+    
+    async def load(session: AsyncSession) -> Optional[bytes]:
+        result = await session.execute(LATEST_MARKET_METRICS, {"symbol": symbol})
+        metrics = result.scalar_one_or_none()
+        if not metrics:
+            return None
+        return _encode_entity(metrics, MARKET_METRICS_FIELDS)
+    
+    body = await _cached_body(cache, cache_key, load, fresh_ttl=300)
+    if body == NULL_SENTINEL:
         raise HTTPException(status_code=404, detail=f"No market metrics found for {symbol}")
     
-    response = MarketMetricsResponse.model_validate(metrics)
-    
-    # Cache result
-    await cache.set(cache_key, response.model_dump(), ttl=300)
-    
-    return response
+    return _json_response(request, body, max_age=300)
 
 
 @router.get("/symbols", response_model=List[str])
 async def get_available_symbols(
+    request: Request,
     db: AsyncSession = Depends(get_db_session),
     cache: RedisCache = Depends(get_cache)
 ):
@@ -292,28 +653,31 @@ async def get_available_symbols(
         List of symbols
     """
     # Try cache first
-    cache_key = "available_symbols"
-    cached_data = await cache.get(cache_key)
-    if cached_data:
-        return cached_data
+    cache_key = "api:symbols"
+    cached_body = await cache.get_bytes(cache_key)
+    if cached_body:
+        return _json_response(request, cached_body, max_age=settings.SYMBOLS_VIEW_REFRESH_SECONDS)
     
-    # Query distinct symbols from tickers table
-    query = select(Ticker.symbol).distinct()
+    # Read from the symbols_mv materialized view instead of scanning tickers
+    query = select(symbols_view.c.symbol).order_by(symbols_view.c.symbol)
     result = await db.execute(query)
     symbols = [row[0] for row in result.all()]
     
+    # The view is empty until its first refresh after tickers arrive
+    if not symbols:
+        query = select(Ticker.symbol).distinct().order_by(Ticker.symbol)
+        result = await db.execute(query)
+        symbols = [row[0] for row in result.all()]
+    
     if not symbols:
         return []
     
-    # Cache results
-    await cache.set(cache_key, symbols, ttl=3600)
+    # Cache until the next view refresh
+    body = orjson.dumps(symbols)
+    await cache.set_bytes(cache_key, body, ttl=settings.SYMBOLS_VIEW_REFRESH_SECONDS)
     
-    return symbols
-
-# Add these endpoints to the END of your app/api/v1/market_data.py file
+    return _json_response(request, body, max_age=settings.SYMBOLS_VIEW_REFRESH_SECONDS)
 
-from datetime import timedelta
-from fastapi.responses import StreamingResponse
 import csv
 from io import StringIO
 
@@ -393,21 +757,17 @@ async def get_recent_trades(
     }
 
 
-@router.get("/analytics/{symbol}/summary")
-async def get_symbol_summary(
-    symbol: str,
-    hours: int = Query(default=24, ge=1, le=168),
-    db: AsyncSession = Depends(get_db_session)
-):
+async def _symbol_summary(session: AsyncSession, symbol: str, hours: int) -> dict:
     """
-    Get comprehensive summary for a symbol.
+    Aggregate the latest ticker and recent trades for a symbol.
     
     Args:
+        session: Database session
         symbol: Trading symbol
-        hours: Hours to look back (default 24, max 168)
+        hours: Hours to look back
         
     Returns:
-        Comprehensive symbol summary
+        Symbol summary
     """
     cutoff_time = datetime.utcnow() - timedelta(hours=hours)
     
@@ -415,32 +775,33 @@ async def get_symbol_summary(
     ticker_query = select(Ticker).where(
         Ticker.symbol == symbol
     ).order_by(desc(Ticker.timestamp)).limit(1)
-    ticker_result = await db.execute(ticker_query)
+    ticker_result = await session.execute(ticker_query)
     ticker = ticker_result.scalar_one_or_none()
     
-    # Get trade volume
-    trades_query = select(Trade).where(
+    # Aggregate trades in SQL: one row back instead of every trade in the window.
+    # Taker buys are trades where the buyer was not the maker (NULL counts as buy).
+    trades_query = select(
+        func.count(),
+        func.coalesce(func.sum(Trade.volume), 0.0),
+        func.coalesce(
+            func.sum(case((Trade.is_buyer_maker.is_not(True), Trade.volume), else_=0.0)),
+            0.0
+        ),
+        func.max(Trade.price),
+        func.min(Trade.price),
+    ).where(
         and_(Trade.symbol == symbol, Trade.timestamp >= cutoff_time)
     )
-    trades_result = await db.execute(trades_query)
-    trades = trades_result.scalars().all()
-    
-    # Calculate metrics
-    total_volume = sum(float(t.volume) for t in trades if t.volume)
-    buy_volume = sum(float(t.volume) for t in trades if t.volume and not t.is_buyer_maker)
+    trades_result = await session.execute(trades_query)
+    trades_count, total_volume, buy_volume, price_high, price_low = trades_result.one()
     sell_volume = total_volume - buy_volume
     
-    # Get price range
-    prices = [float(t.price) for t in trades if t.price]
-    price_high = max(prices) if prices else None
-    price_low = min(prices) if prices else None
-    
     return {
         "symbol": symbol,
         "current_price": float(ticker.last_price) if ticker and ticker.last_price else None,
         "price_change_24h": float(ticker.price_change_percent_24h) if ticker and ticker.price_change_percent_24h else None,
         "volume_24h": float(ticker.volume_24h) if ticker and ticker.volume_24h else None,
-        f"trades_last_{hours}h": len(trades),
+        f"trades_last_{hours}h": trades_count,
         f"volume_last_{hours}h": total_volume,
         f"high_last_{hours}h": price_high,
         f"low_last_{hours}h": price_low,
@@ -450,16 +811,76 @@ async def get_symbol_summary(
     }
 
 
+async def refresh_symbol_summaries() -> None:
+    """
+    Precompute analytics summaries for the configured symbols.
+    
+    Run every SUMMARY_REFRESH_SECONDS from the app lifespan, so the
+    summary endpoint is normally a cache hit. Entries stay fresh for two
+    intervals, which lets one missed run pass without requests falling
+    through to the DB.
+    """
+    cache = await get_cache()
+    hours = settings.SUMMARY_PRECOMPUTE_HOURS
+    summaries = {}
+    async with async_session_factory() as session:
+        for symbol in settings.symbols_list:
+            summary = await _symbol_summary(session, symbol, hours)
+            summaries[f"api:analytics:{symbol}:{hours}h"] = orjson.dumps(summary)
+    
+    await cache.set_many_bytes(
+        summaries,
+        ttl=settings.CACHE_STALE_TTL,
+        fresh_ttl=settings.SUMMARY_REFRESH_SECONDS * 2
+    )
+
+
+@router.get("/analytics/{symbol}/summary")
+async def get_symbol_summary(
+    symbol: str,
+    request: Request,
+    hours: int = Query(default=24, ge=1, le=168),
+    cache: RedisCache = Depends(get_cache)
+):
+    """
+    Get comprehensive summary for a symbol.
+    
+    Summaries for the configured symbols are precomputed by
+    refresh_symbol_summaries; other symbols and windows are computed on
+    first request and cached the same way.
+    
+    Args:
+        symbol: Trading symbol
+        hours: Hours to look back (default 24, max 168)
+        
+    Returns:
+        Comprehensive symbol summary
+    """
+    cache_key = f"api:analytics:{symbol}:{hours}h"
+    
+    async def load(session: AsyncSession) -> Optional[bytes]:
+        return orjson.dumps(await _symbol_summary(session, symbol, hours))
+    
+    body = await _cached_body(
+        cache, cache_key, load, fresh_ttl=settings.SUMMARY_REFRESH_SECONDS * 2
+    )
+    return _json_response(request, body, max_age=settings.SUMMARY_REFRESH_SECONDS)
+
+
 @router.get("/export/{symbol}/csv")
 async def export_to_csv(
     symbol: str,
     timeframe: str = Query(default="1h", description="Timeframe"),
-    days: int = Query(default=7, ge=1, le=365),
-    db: AsyncSession = Depends(get_db_session)
+    days: int = Query(default=7, ge=1, le=365)
 ):
     """
     Export OHLCV data to CSV file.
     
+    Rows are streamed from a server-side cursor in batches of
+    CSV_EXPORT_BATCH_SIZE and written out per batch, so memory stays
+    bounded however many days are exported. Like get_trades, the stream
+    owns its session.
+    
     Args:
         symbol: Trading symbol
         timeframe: Candlestick timeframe
@@ -470,38 +891,39 @@ async def export_to_csv(
     """
     cutoff = datetime.utcnow() - timedelta(days=days)
     
-    query = select(OHLCV).where(
+    query = select(
+        OHLCV.timestamp, OHLCV.open, OHLCV.high, OHLCV.low, OHLCV.close,
+        OHLCV.volume, OHLCV.quote_volume, OHLCV.trades_count
+    ).where(
         and_(
             OHLCV.symbol == symbol,
             OHLCV.timeframe == timeframe,
             OHLCV.timestamp >= cutoff
         )
-    ).order_by(OHLCV.timestamp)
-    
-    result = await db.execute(query)
-    data = result.scalars().all()
-    
-    # Create CSV
-    output = StringIO()
-    writer = csv.writer(output)
-    writer.writerow(['timestamp', 'open', 'high', 'low', 'close', 'volume', 'quote_volume', 'trades_count'])
-    
-    for d in data:
-        writer.writerow([
-            d.timestamp.isoformat(),
-            float(d.open) if d.open else '',
-            float(d.high) if d.high else '',
-            float(d.low) if d.low else '',
-            float(d.close) if d.close else '',
-            float(d.volume) if d.volume else '',
-            float(d.quote_volume) if d.quote_volume else '',
-            d.trades_count if d.trades_count else ''
-        ])
-    
-    output.seek(0)
+    ).order_by(OHLCV.timestamp).execution_options(yield_per=CSV_EXPORT_BATCH_SIZE)
+    
+    async def generate_csv():
+        async with async_session_factory() as session:
+            output = StringIO()
+            writer = csv.writer(output)
+            writer.writerow(['timestamp', 'open', 'high', 'low', 'close', 'volume', 'quote_volume', 'trades_count'])
+            yield output.getvalue()
+            
+            result = await session.stream(query)
+            async for batch in result.partitions():
+                output.seek(0)
+                output.truncate()
+                writer.writerows(
+                    [
+                        row.timestamp.isoformat(),
+                        *(value if value else '' for value in row[1:])
+                    ]
+                    for row in batch
+                )
+                yield output.getvalue()
     
     return StreamingResponse(
-        iter([output.getvalue()]),
+        generate_csv(),
         media_type="text/csv",
         headers={
             "Content-Disposition": f"attachment; filename={symbol}_{timeframe}_{days}d.csv"
@@ -512,7 +934,8 @@ async def export_to_csv(
 @router.get("/compare")
 async def compare_symbols(
     symbols: str = Query(..., description="Comma-separated symbols (e.g., BTCUSDT,ETHUSDT)"),
-    db: AsyncSession = Depends(get_db_session)
+    db: AsyncSession = Depends(get_db_session),
+    cache: RedisCache = Depends(get_cache)
 ):
     """
     Compare multiple symbols side by side.
@@ -523,25 +946,21 @@ async def compare_symbols(
     Returns:
         Comparison data for symbols
     """
-    symbol_list = [s.strip().upper() for s in symbols.split(',')]
+    symbol_list = list(dict.fromkeys(s.strip().upper() for s in symbols.split(',') if s.strip()))
+    bodies = await _latest_ticker_bodies(symbol_list, db, cache)
     
     results = []
     for symbol in symbol_list:
-        query = select(Ticker).where(
-            Ticker.symbol == symbol
-        ).order_by(desc(Ticker.timestamp)).limit(1)
-        
-        result = await db.execute(query)
-        ticker = result.scalar_one_or_none()
-        
-        if ticker:
-            results.append({
-                "symbol": symbol,
-                "price": float(ticker.last_price) if ticker.last_price else None,
-                "change_24h": float(ticker.price_change_percent_24h) if ticker.price_change_percent_24h else None,
-                "volume_24h": float(ticker.volume_24h) if ticker.volume_24h else None,
-                "timestamp": ticker.timestamp.isoformat()
-            })
+        if symbol not in bodies:
+            continue
+        ticker = orjson.loads(bodies[symbol])
+        results.append({
+            "symbol": symbol,
+            "price": ticker["last_price"],
+            "change_24h": ticker["price_change_percent_24h"],
+            "volume_24h": ticker["volume_24h"],
+            "timestamp": ticker["timestamp"]
+        })
     
     return {
         "count": len(results),
@@ -1,81 +1,183 @@
 # See artifact: crypto_websocket
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from collections import defaultdict
 from typing import Set, Dict
 import asyncio
-import json
+import orjson
 import logging
 from datetime import datetime
 
-from app.api.deps import get_db_session
-from app.models.market_data import Ticker, OHLCV, OrderBook
 from app.cache.redis_cache import cache
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Sockets live for as long as the client stays connected, so handlers must
+# not hold a pooled DB session (no Depends(get_db_session)); all data comes
+# from Redis.
 router = APIRouter()
 
 
 class ConnectionManager:
-    """Manage WebSocket connections."""
+    """
+    Manage WebSocket connections.
+    
+    Each channel with at least one client has a single relay task
+    subscribed to the Redis channel pub:{channel}; collectors publish each
+    update once and the relay fans it out to every client on the channel.
+    
+    Every connection has a bounded outgoing queue drained by its own sender
+    task. Fan-out only enqueues, so a slow client never delays the others;
+    when a client falls WS_QUEUE_SIZE messages behind, its oldest pending
+    message is dropped.
+    """
     
     def __init__(self):
         self.active_connections: Dict[str, Set[WebSocket]] = {}
-        self.lock = asyncio.Lock()
+        self.relays: Dict[str, asyncio.Task] = {}
+        self.queues: Dict[WebSocket, asyncio.Queue] = {}
+        self.senders: Dict[WebSocket, asyncio.Task] = {}
+        # Per-channel locks so churn on one channel does not block others.
+        # Locks are kept after a channel empties: dropping one while a
+        # coroutine waits on it would let a second lock guard the same channel.
+        self.locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
     
     async def connect(self, websocket: WebSocket, channel: str):
         """Connect client to a channel."""
         await websocket.accept()
-        async with self.lock:
+        self.queues[websocket] = asyncio.Queue(maxsize=settings.WS_QUEUE_SIZE)
+        self.senders[websocket] = asyncio.create_task(self._sender(websocket))
+        async with self.locks[channel]:
             if channel not in self.active_connections:
                 self.active_connections[channel] = set()
+                self.relays[channel] = asyncio.create_task(self._relay(channel))
             self.active_connections[channel].add(websocket)
         logger.info(f"Client connected to channel: {channel}")
     
     async def disconnect(self, websocket: WebSocket, channel: str):
         """Disconnect client from a channel."""
-        async with self.lock:
+        async with self.locks[channel]:
             if channel in self.active_connections:
                 self.active_connections[channel].discard(websocket)
                 if not self.active_connections[channel]:
                     del self.active_connections[channel]
+                    relay = self.relays.pop(channel, None)
+                    if relay:
+                        relay.cancel()
+        
+        self.queues.pop(websocket, None)
+        sender = self.senders.pop(websocket, None)
+        if sender:
+            sender.cancel()
         logger.info(f"Client disconnected from channel: {channel}")
     
+    def send(self, websocket: WebSocket, payload: str):
+        """Queue an encoded text frame, dropping the oldest one if full."""
+        queue = self.queues.get(websocket)
+        if queue is None:
+            return
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(payload)
+    
+    async def _sender(self, websocket: WebSocket):
+        """Write queued frames to one client until it fails or disconnects."""
+        queue = self.queues[websocket]
+        while True:
+            payload = await queue.get()
+            try:
+                await asyncio.wait_for(websocket.send_text(payload), timeout=settings.WS_SEND_TIMEOUT)
+            except Exception as e:
+                logger.error(f"Error sending to client: {e!r}")
+                # Closing wakes the handler's receive so it can disconnect
+                try:
+                    await websocket.close()
+                except Exception:
+                    pass
+                return
+    
+    async def _relay(self, channel: str):
+        """Forward updates published for a channel to its clients."""
+        message_type = channel.split(":", 1)[0]
+        while True:
+            try:
+                async for data in cache.subscribe(f"pub:{channel}"):
+                    await self.broadcast(channel, {
+                        "type": message_type,
+                        "data": data,
+                        "timestamp": datetime.utcnow()
+                    })
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Pub/Sub relay error for channel {channel}: {e}")
+                await asyncio.sleep(1)
+    
     async def broadcast(self, channel: str, message: dict):
-        """Broadcast message to all clients in a channel."""
+        """Broadcast message to all clients in a channel, encoding it once."""
         if channel not in self.active_connections:
             return
         
+        payload = orjson.dumps(message).decode()
         # Create list to avoid modification during iteration
-        connections = list(self.active_connections[channel])
-        disconnected = []
-        
-        for connection in connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to client: {e}")
-                disconnected.append(connection)
-        
-        # Remove disconnected clients
-        if disconnected:
-            async with self.lock:
-                for conn in disconnected:
-                    self.active_connections[channel].discard(conn)
+        for connection in list(self.active_connections[channel]):
+            self.send(connection, payload)
     
     def get_connection_count(self, channel: str = None) -> int:
-        """Get number of active connections."""
+        """Get number of active connections (an unlocked snapshot)."""
         if channel:
             return len(self.active_connections.get(channel, set()))
-        return sum(len(conns) for conns in self.active_connections.values())
+        return sum(len(conns) for conns in list(self.active_connections.values()))
 
 
 manager = ConnectionManager()
 
 
+async def send_message(websocket: WebSocket, message: dict):
+    """Queue a JSON text frame encoded with orjson."""
+    manager.send(websocket, orjson.dumps(message).decode())
+
+
+async def serve_client(websocket: WebSocket):
+    """
+    Answer pings and send heartbeats until the client goes away.
+    
+    One asyncio.wait covers the pending receive, the connection's sender
+    task and the heartbeat timeout. The receive is not cancelled on every
+    heartbeat, and a sender that died (failed or timed-out send) ends the
+    loop instead of leaving the handler waiting on a dead socket.
+    
+    Raises:
+        WebSocketDisconnect: When the client disconnects
+    """
+    sender = manager.senders[websocket]
+    receive = asyncio.create_task(websocket.receive_text())
+    try:
+        while True:
+            done, _ = await asyncio.wait(
+                {receive, sender},
+                timeout=settings.WS_HEARTBEAT_INTERVAL,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            
+            if sender in done:
+                return
+            
+            if receive in done:
+                # Handle client messages (raises on disconnect)
+                if receive.result() == "ping":
+                    manager.send(websocket, "pong")
+                receive = asyncio.create_task(websocket.receive_text())
+            else:
+                await send_message(websocket, {
+                    "type": "heartbeat",
+                    "timestamp": datetime.utcnow()
+                })
+    finally:
+        receive.cancel()
+
+
 @router.websocket("/ws/ticker/{symbol}")
 async def websocket_ticker(websocket: WebSocket, symbol: str):
     """
@@ -92,47 +194,20 @@ async def websocket_ticker(websocket: WebSocket, symbol: str):
         # Send initial data
         ticker_data = await cache.get(f"ticker:{symbol}")
         if ticker_data:
-            await websocket.send_json({
+            await send_message(websocket, {
                 "type": "ticker",
                 "data": ticker_data,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": datetime.utcnow()
             })
         
-        # Keep connection alive and send updates
-        while True:
-            try:
-                # Wait for client messages (ping/pong)
-                data = await asyncio.wait_for(
-                    websocket.receive_text(),
-                    timeout=settings.WS_HEARTBEAT_INTERVAL
-                )
-                
-                # Handle client messages
-                if data == "ping":
-                    await websocket.send_text("pong")
-                
-            except asyncio.TimeoutError:
-                # Send heartbeat
-                await websocket.send_json({
-                    "type": "heartbeat",
-                    "timestamp": datetime.utcnow().isoformat()
-                })
-            
-            # Check for updates in cache
-            ticker_data = await cache.get(f"ticker:{symbol}")
-            if ticker_data:
-                await websocket.send_json({
-                    "type": "ticker",
-                    "data": ticker_data,
-                    "timestamp": datetime.utcnow().isoformat()
-                })
-            
-            await asyncio.sleep(1)
+        # Keep connection alive; updates are pushed by the channel relay
+        await serve_client(websocket)
             
     except WebSocketDisconnect:
-        await manager.disconnect(websocket, channel)
+        pass
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
+    finally:
         await manager.disconnect(websocket, channel)
 
 
@@ -154,44 +229,20 @@ async def websocket_ohlcv(websocket: WebSocket, symbol: str, timeframe: str):
         cache_key = f"ohlcv:{symbol}:{timeframe}:10"
         ohlcv_data = await cache.get(cache_key)
         if ohlcv_data:
-            await websocket.send_json({
+            await send_message(websocket, {
                 "type": "ohlcv",
                 "data": ohlcv_data,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": datetime.utcnow()
             })
         
-        # Keep connection alive
-        while True:
-            try:
-                data = await asyncio.wait_for(
-                    websocket.receive_text(),
-                    timeout=settings.WS_HEARTBEAT_INTERVAL
-                )
-                
-                if data == "ping":
-                    await websocket.send_text("pong")
-                    
-            except asyncio.TimeoutError:
-                await websocket.send_json({
-                    "type": "heartbeat",
-                    "timestamp": datetime.utcnow().isoformat()
-                })
-            
-            # Check for updates
-            ohlcv_data = await cache.get(cache_key)
-            if ohlcv_data:
-                await websocket.send_json({
-                    "type": "ohlcv",
-                    "data": ohlcv_data,
-                    "timestamp": datetime.utcnow().isoformat()
-                })
-            
-            await asyncio.sleep(5)
+        # Keep connection alive; updates are pushed by the channel relay
+        await serve_client(websocket)
             
     except WebSocketDisconnect:
-        await manager.disconnect(websocket, channel)
+        pass
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
+    finally:
         await manager.disconnect(websocket, channel)
 
 
@@ -211,44 +262,20 @@ async def websocket_orderbook(websocket: WebSocket, symbol: str):
         # Send initial data
         orderbook_data = await cache.get(f"orderbook:{symbol}")
         if orderbook_data:
-            await websocket.send_json({
+            await send_message(websocket, {
                 "type": "orderbook",
                 "data": orderbook_data,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": datetime.utcnow()
             })
         
-        # Keep connection alive
-        while True:
-            try:
-                data = await asyncio.wait_for(
-                    websocket.receive_text(),
-                    timeout=settings.WS_HEARTBEAT_INTERVAL
-                )
-                
-                if data == "ping":
-                    await websocket.send_text("pong")
-                    
-            except asyncio.TimeoutError:
-                await websocket.send_json({
-                    "type": "heartbeat",
-                    "timestamp": datetime.utcnow().isoformat()
-                })
-            
-            # Check for updates
-            orderbook_data = await cache.get(f"orderbook:{symbol}")
-            if orderbook_data:
-                await websocket.send_json({
-                    "type": "orderbook",
-                    "data": orderbook_data,
-                    "timestamp": datetime.utcnow().isoformat()
-                })
-            
-            await asyncio.sleep(2)
+        # Keep connection alive; updates are pushed by the channel relay
+        await serve_client(websocket)
             
     except WebSocketDisconnect:
-        await manager.disconnect(websocket, channel)
+        pass
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
+    finally:
         await manager.disconnect(websocket, channel)
 
 
@@ -0,0 +1,70 @@
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+
+class LocalCache:
+    """
+    Bounded in-process cache whose entries expire after a fixed TTL.
+    
+    Sits in front of Redis for hot keys, so repeated reads within the TTL
+    skip the round trip. Least recently used entries are evicted once
+    maxsize is reached. Values are returned as stored, not copied, so
+    callers must not mutate them.
+    """
+    
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Args:
+            maxsize: Maximum number of entries (0 disables the cache)
+            ttl: Seconds an entry is served for (0 disables the cache)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a value if present and not expired.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Cached value or None
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        
+        self._entries.move_to_end(key)
+        return value
+    
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a value for ttl seconds, evicting the oldest entries if full.
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def pop(self, key: str) -> None:
+        """Drop a key if present."""
+        self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
@@ -1,44 +1,215 @@
 # See artifact: crypto_redis_cache
 import redis.asyncio as redis
-import json
+from redis.commands.core import AsyncScript
+import asyncio
 import logging
-from typing import Optional, Any, Dict
-from datetime import timedelta
+import zlib
+import msgspec
+import orjson
+from typing import Optional, Any, AsyncIterator, Callable, Dict, List, Tuple, overload
 
 from app.config import get_settings
+from app.cache.local_cache import LocalCache
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Cached in place of a body when the underlying data does not exist
+NULL_SENTINEL = b"__NULL__"
+
+# Raw values at least this large are stored zlib-compressed behind a NUL
+# prefix byte, which no JSON document starts with
+COMPRESSED_PREFIX = b"\x00"
+
+# Same for values serialized by get/set. NUL is a valid msgpack value (the
+# integer 0), so these use 0xC1, which neither msgpack nor UTF-8 JSON ever
+# starts with
+ENCODED_COMPRESSED_PREFIX = b"\xc1"
+
+# Key prefixes whose keys are also tracked in an idx:{prefix} SET, so
+# flush_pattern("{prefix}:*") needs no keyspace SCAN
+INDEXED_PREFIXES = ("ticker", "orderbook")
+
+# SETEX for a whole batch as one server-side command:
+# KEYS = keys, ARGV = [ttl, fresh_ttl (0 for none), value1, value2, ...]
+MSETEX_SCRIPT = """
+local ttl = ARGV[1]
+local fresh_ttl = tonumber(ARGV[2])
+for i, key in ipairs(KEYS) do
+    redis.call('SETEX', key, ttl, ARGV[i + 2])
+    if fresh_ttl > 0 then
+        redis.call('SETEX', 'fresh:' .. key, fresh_ttl, '1')
+    end
+end
+return #KEYS
+"""
+
+# UNLINK every member of an index SET and then the SET itself:
+# KEYS = [index key]
+FLUSH_INDEX_SCRIPT = """
+local members = redis.call('SMEMBERS', KEYS[1])
+local deleted = 0
+for i = 1, #members, 1000 do
+    deleted = deleted + redis.call('UNLINK', unpack(members, i, math.min(i + 999, #members)))
+end
+redis.call('UNLINK', KEYS[1])
+return deleted
+"""
+
+
+def _index_key(key: str) -> Optional[str]:
+    """Index SET tracking a key, or None if its prefix is not indexed."""
+    prefix = key.split(":", 1)[0]
+    if prefix in INDEXED_PREFIXES and prefix != key:
+        return f"idx:{prefix}"
+    return None
+
+
+def _add_to_indexes(pipeline, keys: List[str]) -> None:
+    """Queue SADDs registering keys with their index SETs."""
+    indexes: Dict[str, List[str]] = {}
+    for key in keys:
+        index = _index_key(key)
+        if index:
+            indexes.setdefault(index, []).append(key)
+    for index, members in indexes.items():
+        pipeline.sadd(index, *members)
+
+
+def _compress(value: bytes, prefix: bytes = COMPRESSED_PREFIX) -> bytes:
+    """Compress a raw cache value if it is large enough to be worth it."""
+    if len(value) < settings.CACHE_COMPRESS_MIN_BYTES:
+        return value
+    return prefix + zlib.compress(value, settings.CACHE_COMPRESS_LEVEL)
+
+
+async def _compress_off_loop(value: bytes, prefix: bytes = COMPRESSED_PREFIX) -> bytes:
+    """
+    _compress, in a worker thread for values large enough to stall the loop.
+    
+    zlib releases the GIL while compressing, so large bodies compress in
+    parallel with request handling. Encoding stays on the loop: handing the
+    unencoded objects to another thread or process costs more than orjson.
+    """
+    if len(value) >= settings.CACHE_OFFLOAD_MIN_BYTES:
+        return await asyncio.to_thread(_compress, value, prefix)
+    return _compress(value, prefix)
+
+
+@overload
+def _decompress(value: bytes, prefix: bytes = COMPRESSED_PREFIX) -> bytes: ...
+
+
+@overload
+def _decompress(value: Optional[bytes], prefix: bytes = COMPRESSED_PREFIX) -> Optional[bytes]: ...
+
+
+def _decompress(value: Optional[bytes], prefix: bytes = COMPRESSED_PREFIX) -> Optional[bytes]:
+    """Undo _compress on a raw cache value; a missing value stays None."""
+    if value and value.startswith(prefix):
+        return zlib.decompress(value[1:])
+    return value
+
 
 class RedisCache:
-    """Redis cache manager for hot data."""
+    """
+    Redis cache manager for hot data.
+    
+    Values read with get/get_many are also kept in a short-lived
+    in-process LocalCache. Writes through this instance invalidate their
+    local copies at once; writes from other processes show up once the
+    local copy expires (CACHE_LOCAL_TTL).
+    """
     
-    def __init__(self):
+    def __init__(self, serializer: str = "msgpack"):
+        """
+        Args:
+            serializer: Value encoding for get/set and Pub/Sub messages,
+                "msgpack" or "json". Unknown types (e.g. Decimal) are
+                stored as strings either way.
+        """
         self.redis_client: Optional[redis.Redis] = None
+        self.pubsub_client: Optional[redis.Redis] = None
+        self._msetex: Optional[AsyncScript] = None
+        self._flush_index: Optional[AsyncScript] = None
         self.default_ttl = settings.REDIS_CACHE_TTL
+        self.local = LocalCache(settings.CACHE_LOCAL_MAXSIZE, settings.CACHE_LOCAL_TTL)
+        
+        if serializer == "msgpack":
+            self._dumps: Callable[[Any], bytes] = msgspec.msgpack.Encoder(enc_hook=str).encode
+            self._loads: Callable[[bytes], Any] = msgspec.msgpack.Decoder().decode
+        else:
+            self._dumps = lambda value: orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+            self._loads = orjson.loads
     
     async def connect(self) -> None:
         """Establish Redis connection."""
         try:
-            self.redis_client = await redis.from_url(
+            # Responses stay bytes: values are decoded per call by _loads,
+            # and pre-serialized payloads are returned as stored. A few
+            # connections saturate the single-threaded server; callers beyond
+            # that wait for a free one instead of failing.
+            pool = redis.BlockingConnectionPool.from_url(
                 settings.redis_url,
-                encoding="utf-8",
-                decode_responses=True,
-                max_connections=50,
+                max_connections=settings.REDIS_POOL_SIZE,
+                timeout=settings.REDIS_POOL_TIMEOUT,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                socket_keepalive=True,
+                health_check_interval=30,
+                retry_on_timeout=True,
             )
+            self.redis_client = redis.Redis.from_pool(pool)
             await self.redis_client.ping()
-            logger.info("Redis connected successfully")
+            
+            # Invoked by EVALSHA; reloaded automatically after NOSCRIPT
+            self._msetex = self.redis_client.register_script(MSETEX_SCRIPT)
+            self._flush_index = self.redis_client.register_script(FLUSH_INDEX_SCRIPT)
+            
+            # Each subscription holds a connection while it lasts and blocks
+            # reading, so Pub/Sub gets its own pool without a read timeout
+            self.pubsub_client = redis.from_url(
+                settings.redis_url,
+                socket_keepalive=True,
+                health_check_interval=30,
+            )
+            logger.info(f"Redis connected successfully (pool size {settings.REDIS_POOL_SIZE})")
         except Exception as e:
             logger.error(f"Redis connection failed: {e}")
             raise
     
     async def disconnect(self) -> None:
         """Close Redis connection."""
+        if self.pubsub_client:
+            await self.pubsub_client.close()
         if self.redis_client:
             await self.redis_client.close()
             logger.info("Redis disconnected")
     
+    @property
+    def client(self) -> redis.Redis:
+        """The connected Redis client; raises RuntimeError before connect()."""
+        if self.redis_client is None:
+            raise RuntimeError("Redis is not connected")
+        return self.redis_client
+    
+    async def _encode(self, value: Any) -> bytes:
+        """Serialize a value for get/set, compressing it if large."""
+        return await _compress_off_loop(self._dumps(value), ENCODED_COMPRESSED_PREFIX)
+    
+    def _decode(self, value: bytes) -> Any:
+        """Undo _encode."""
+        return self._loads(_decompress(value, ENCODED_COMPRESSED_PREFIX))
+    
+    async def _setex(self, key: str, ttl: int, value: bytes) -> None:
+        """SETEX one key, registering it with its index SET if it has one."""
+        if _index_key(key) is None:
+            await self.client.setex(key, ttl, value)
+            return
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.setex(key, ttl, value)
+        _add_to_indexes(pipeline, [key])
+        await pipeline.execute()
+    
     async def get(self, key: str) -> Optional[Any]:
         """
         Get value from cache.
@@ -49,10 +220,16 @@ class RedisCache:
         Returns:
             Cached value or None
         """
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        
         try:
-            value = await self.redis_client.get(key)
+            value = await self.client.get(key)
             if value:
-                return json.loads(value)
+                value = self._decode(value)
+                self.local.set(key, value)
+                return value
             return None
         except Exception as e:
             logger.error(f"Redis get error for key {key}: {e}")
@@ -77,17 +254,213 @@ class RedisCache:
         """
         try:
             ttl = ttl or self.default_ttl
-            serialized = json.dumps(value, default=str)
-            await self.redis_client.setex(
-                key,
-                timedelta(seconds=ttl),
-                serialized
-            )
+            serialized = await self._encode(value)
+            self.local.pop(key)
+            await self._setex(key, ttl, serialized)
             return True
         except Exception as e:
             logger.error(f"Redis set error for key {key}: {e}")
             return False
     
+    async def get_bytes(self, key: str) -> Optional[bytes]:
+        """
+        Get raw bytes from cache without deserializing.
+        
+        Values stored compressed by set_bytes/set_many_bytes are
+        decompressed transparently.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached bytes or None
+        """
+        try:
+            return _decompress(await self.client.get(key))
+        except Exception as e:
+            logger.error(f"Redis get_bytes error for key {key}: {e}")
+            return None
+    
+    async def get_bytes_swr(self, key: str) -> Tuple[Optional[bytes], bool]:
+        """
+        Get raw bytes along with whether they are still fresh.
+        
+        Values written with a fresh_ttl stay readable for their full ttl but
+        only count as fresh until a fresh:{key} marker expires, so callers can
+        serve a stale value while one of them refreshes it.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Tuple of (cached bytes or None, whether the value is fresh)
+        """
+        return (await self.get_many_bytes_swr([key]))[0]
+    
+    async def get_many_bytes_swr(self, keys: List[str]) -> List[Tuple[Optional[bytes], bool]]:
+        """
+        Get multiple raw values and their freshness in a single MGET.
+        
+        Args:
+            keys: List of cache keys
+            
+        Returns:
+            (cached bytes or None, whether fresh) for each key, in key order
+        """
+        try:
+            if not keys:
+                return []
+            values = await self.client.mget(keys + [f"fresh:{key}" for key in keys])
+            return [
+                (_decompress(value), fresh is not None)
+                for value, fresh in zip(values[:len(keys)], values[len(keys):])
+            ]
+        except Exception as e:
+            logger.error(f"Redis get_many_bytes_swr error: {e}")
+            return [(None, False)] * len(keys)
+    
+    async def set_bytes(
+        self,
+        key: str,
+        value: bytes,
+        ttl: Optional[int] = None,
+        fresh_ttl: Optional[int] = None
+    ) -> bool:
+        """
+        Set raw bytes in cache without serializing.
+        
+        Args:
+            key: Cache key
+            value: Pre-serialized value
+            ttl: Time to live in seconds
+            fresh_ttl: Seconds the value counts as fresh (see get_bytes_swr)
+            
+        Returns:
+            Success status
+        """
+        if fresh_ttl:
+            return await self.set_many_bytes({key: value}, ttl=ttl, fresh_ttl=fresh_ttl)
+        
+        try:
+            ttl = ttl or self.default_ttl
+            await self._setex(key, ttl, await _compress_off_loop(value))
+            return True
+        except Exception as e:
+            logger.error(f"Redis set_bytes error for key {key}: {e}")
+            return False
+    
+    async def get_many_bytes(self, keys: List[str]) -> List[Optional[bytes]]:
+        """
+        Get multiple raw values in a single MGET round trip.
+        
+        Args:
+            keys: List of cache keys
+            
+        Returns:
+            Cached bytes or None for each key, in key order
+        """
+        try:
+            if not keys:
+                return []
+            return [_decompress(value) for value in await self.client.mget(keys)]
+        except Exception as e:
+            logger.error(f"Redis get_many_bytes error: {e}")
+            return [None] * len(keys)
+    
+    async def set_many_bytes(
+        self,
+        mapping: Dict[str, bytes],
+        ttl: Optional[int] = None,
+        fresh_ttl: Optional[int] = None
+    ) -> bool:
+        """
+        Set multiple raw values atomically with one command.
+        
+        Args:
+            mapping: Dictionary of key to pre-serialized value
+            ttl: Time to live in seconds
+            fresh_ttl: Seconds the values count as fresh (see get_bytes_swr)
+            
+        Returns:
+            Success status
+        """
+        try:
+            if not mapping:
+                return True
+            if self._msetex is None:
+                raise RuntimeError("Redis is not connected")
+            values = [await _compress_off_loop(value) for value in mapping.values()]
+            pipeline = self.client.pipeline(transaction=False)
+            await self._msetex(
+                keys=list(mapping),
+                args=[ttl or self.default_ttl, fresh_ttl or 0, *values],
+                client=pipeline
+            )
+            _add_to_indexes(pipeline, list(mapping))
+            await pipeline.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Redis set_many_bytes error: {e}")
+            return False
+    
+    async def acquire_lock(self, key: str, ttl: Optional[int] = None) -> bool:
+        """
+        Try to become the single filler for a cache key.
+        
+        Args:
+            key: Cache key being filled
+            ttl: Lock expiry in seconds, in case the holder dies
+            
+        Returns:
+            True if the lock was acquired (or Redis is unavailable)
+        """
+        try:
+            ttl = ttl or settings.CACHE_LOCK_TTL
+            return bool(await self.client.set(f"lock:{key}", "1", nx=True, ex=ttl))
+        except Exception as e:
+            logger.error(f"Redis acquire_lock error for key {key}: {e}")
+            return True
+    
+    async def release_lock(self, key: str) -> None:
+        """
+        Release a cache-fill lock.
+        
+        Args:
+            key: Cache key that was being filled
+        """
+        try:
+            await self.client.delete(f"lock:{key}")
+        except Exception as e:
+            logger.error(f"Redis release_lock error for key {key}: {e}")
+    
+    async def wait_for_bytes(
+        self,
+        key: str,
+        timeout: Optional[float] = None,
+        interval: float = 0.05
+    ) -> Optional[bytes]:
+        """
+        Wait for another worker to fill a cache key.
+        
+        Args:
+            key: Cache key
+            timeout: Maximum wait in seconds
+            interval: Polling interval in seconds
+            
+        Returns:
+            Cached bytes, or None if the key was not filled in time
+        """
+        timeout = timeout or settings.CACHE_LOCK_TTL
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        
+        while loop.time() < deadline:
+            await asyncio.sleep(interval)
+            value = await self.get_bytes(key)
+            if value is not None:
+                return value
+        return None
+    
     async def delete(self, key: str) -> bool:
         """
         Delete key from cache.
@@ -98,8 +471,14 @@ class RedisCache:
         Returns:
             Success status
         """
+        self.local.pop(key)
         try:
-            await self.redis_client.delete(key)
+            pipeline = self.client.pipeline(transaction=False)
+            pipeline.delete(key)
+            index = _index_key(key)
+            if index:
+                pipeline.srem(index, key)
+            await pipeline.execute()
             return True
         except Exception as e:
             logger.error(f"Redis delete error for key {key}: {e}")
@@ -116,7 +495,7 @@ class RedisCache:
             Existence status
         """
         try:
-            return await self.redis_client.exists(key) > 0
+            return await self.client.exists(key) > 0
         except Exception as e:
             logger.error(f"Redis exists error for key {key}: {e}")
             return False
@@ -131,19 +510,28 @@ class RedisCache:
         Returns:
             Dictionary of key-value pairs
         """
+        result = {}
+        missing = []
+        for key in keys:
+            value = self.local.get(key)
+            if value is not None:
+                result[key] = value
+            else:
+                missing.append(key)
+        
         try:
-            if not keys:
-                return {}
+            if not missing:
+                return result
             
-            values = await self.redis_client.mget(keys)
-            result = {}
-            for key, value in zip(keys, values):
+            values = await self.client.mget(missing)
+            for key, value in zip(missing, values):
                 if value:
-                    result[key] = json.loads(value)
+                    result[key] = self._decode(value)
+                    self.local.set(key, result[key])
             return result
         except Exception as e:
             logger.error(f"Redis get_many error: {e}")
-            return {}
+            return result
     
     async def set_many(
         self,
@@ -151,7 +539,7 @@ class RedisCache:
         ttl: Optional[int] = None
     ) -> bool:
         """
-        Set multiple values in cache.
+        Set multiple values in cache atomically with one command.
         
         Args:
             mapping: Dictionary of key-value pairs
@@ -161,13 +549,20 @@ class RedisCache:
             Success status
         """
         try:
-            ttl = ttl or self.default_ttl
-            pipeline = self.redis_client.pipeline()
-            
-            for key, value in mapping.items():
-                serialized = json.dumps(value, default=str)
-                pipeline.setex(key, timedelta(seconds=ttl), serialized)
-            
+            if not mapping:
+                return True
+            for key in mapping:
+                self.local.pop(key)
+            if self._msetex is None:
+                raise RuntimeError("Redis is not connected")
+            values = [await self._encode(value) for value in mapping.values()]
+            pipeline = self.client.pipeline(transaction=False)
+            await self._msetex(
+                keys=list(mapping),
+                args=[ttl or self.default_ttl, 0, *values],
+                client=pipeline
+            )
+            _add_to_indexes(pipeline, list(mapping))
             await pipeline.execute()
             return True
         except Exception as e:
@@ -185,8 +580,9 @@ class RedisCache:
         Returns:
             New value or None
         """
+        self.local.pop(key)
         try:
-            return await self.redis_client.incrby(key, amount)
+            return await self.client.incrby(key, amount)
         except Exception as e:
             logger.error(f"Redis increment error for key {key}: {e}")
             return None
@@ -203,39 +599,77 @@ class RedisCache:
             Success status
         """
         try:
-            await self.redis_client.expire(key, ttl)
+            await self.client.expire(key, ttl)
             return True
         except Exception as e:
             logger.error(f"Redis expire error for key {key}: {e}")
             return False
     
+    async def expire_many(self, keys: List[str], ttl: int) -> bool:
+        """
+        Set the same expiration on multiple keys in one pipelined round trip.
+        
+        Args:
+            keys: List of cache keys
+            ttl: Time to live in seconds
+            
+        Returns:
+            Success status
+        """
+        try:
+            if not keys:
+                return True
+            pipeline = self.client.pipeline(transaction=False)
+            for key in keys:
+                pipeline.expire(key, ttl)
+            await pipeline.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Redis expire_many error: {e}")
+            return False
+    
     async def flush_pattern(self, pattern: str) -> int:
         """
         Delete all keys matching pattern.
         
+        "{prefix}:*" for a prefix in INDEXED_PREFIXES deletes the members of
+        its index SET in one script call; any other pattern is SCANned.
+        Index members whose keys already expired are dropped with the SET.
+        
         Args:
             pattern: Key pattern (e.g., "ticker:*")
             
         Returns:
             Number of keys deleted
         """
+        # Key patterns are not matched locally; local copies expire quickly
+        self.local.clear()
         try:
-            cursor = 0
+            if pattern.endswith(":*") and pattern[:-2] in INDEXED_PREFIXES:
+                if self._flush_index is None:
+                    raise RuntimeError("Redis is not connected")
+                deleted = await self._flush_index(keys=[f"idx:{pattern[:-2]}"])
+                logger.info(f"Flushed {deleted} keys matching pattern: {pattern}")
+                return deleted
+            
             deleted = 0
+            cursor, keys = await self.client.scan(cursor=0, match=pattern, count=1000)
             
-            while True:
-                cursor, keys = await self.redis_client.scan(
-                    cursor=cursor,
-                    match=pattern,
-                    count=100
-                )
-                
+            # Each round trip UNLINKs the previous batch (freed in the
+            # background, without blocking Redis) and scans the next one
+            while keys or cursor != 0:
+                pipeline = self.client.pipeline(transaction=False)
                 if keys:
-                    await self.redis_client.delete(*keys)
-                    deleted += len(keys)
+                    pipeline.unlink(*keys)
+                if cursor != 0:
+                    pipeline.scan(cursor=cursor, match=pattern, count=1000)
+                results = await pipeline.execute()
                 
+                if keys:
+                    deleted += results[0]
                 if cursor == 0:
                     break
+                cursor, keys = results[-1]
             
             logger.info(f"Flushed {deleted} keys matching pattern: {pattern}")
             return deleted
@@ -254,12 +688,78 @@ class RedisCache:
             TTL in seconds or None
         """
         try:
-            ttl = await self.redis_client.ttl(key)
+            ttl = await self.client.ttl(key)
             return ttl if ttl > 0 else None
         except Exception as e:
             logger.error(f"Redis get_ttl error for key {key}: {e}")
             return None
+    
+    async def publish(self, channel: str, value: Any) -> int:
+        """
+        Publish a message to a Pub/Sub channel.
+        
+        Args:
+            channel: Channel name (e.g., "pub:ticker:BTCUSDT")
+            value: Message to publish
+            
+        Returns:
+            Number of subscribers that received the message
+        """
+        try:
+            return await self.client.publish(channel, self._dumps(value))
+        except Exception as e:
+            logger.error(f"Redis publish error for channel {channel}: {e}")
+            return 0
+    
+    async def publish_many(self, messages: Dict[str, Any]) -> bool:
+        """
+        Publish one message per channel in a single pipelined round trip.
+        
+        Args:
+            messages: Dictionary of channel name to message
+            
+        Returns:
+            Success status
+        """
+        try:
+            if not messages:
+                return True
+            pipeline = self.client.pipeline(transaction=False)
+            
+            for channel, value in messages.items():
+                pipeline.publish(channel, self._dumps(value))
+            
+            await pipeline.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Redis publish_many error: {e}")
+            return False
+    
+    async def subscribe(self, channel: str) -> AsyncIterator[Any]:
+        """
+        Yield messages published to a channel until the caller stops.
+        
+        Each subscription holds one dedicated Redis connection. Errors
+        propagate so the caller can decide whether to resubscribe.
+        
+        Args:
+            channel: Channel name
+            
+        Yields:
+            Decoded messages
+        """
+        if self.pubsub_client is None:
+            raise RuntimeError("Redis is not connected")
+        pubsub = self.pubsub_client.pubsub()
+        try:
+            await pubsub.subscribe(channel)
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    yield self._loads(message["data"])
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.close()
 
 
 # Global cache instance
-cache = RedisCache()
\ No newline at end of file
+cache = RedisCache(settings.CACHE_SERIALIZER)
\ No newline at end of file
@@ -0,0 +1,39 @@
+import asyncio
+from typing import Any, Callable, Coroutine, Dict
+
+
+class Singleflight:
+    """
+    Coalesce concurrent calls for the same key within one process.
+    
+    The first caller for a key starts the work as a task; callers arriving
+    while it runs await the same task instead of starting their own.
+    """
+    
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+    
+    async def do(self, key: str, factory: Callable[[], Coroutine[Any, Any, Any]]) -> Any:
+        """
+        Run factory once for all concurrent callers of key.
+        
+        Args:
+            key: Deduplication key
+            factory: Coroutine function doing the work
+            
+        Returns:
+            The shared result (exceptions are shared too)
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        
+        # Shielded so one caller going away does not cancel the others' result
+        return await asyncio.shield(task)
+    
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        """Drop a finished task unless a newer one already took its key."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
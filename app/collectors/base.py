@@ -1,11 +1,15 @@
 from abc import ABC, abstractmethod
 import asyncio
+import functools
 import logging
+import random
 from datetime import datetime
-from typing import Optional, List
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Awaitable, Callable, Optional, List
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.config import get_settings
+from app.cache.singleflight import Singleflight
 from app.utils.rate_limiter import rate_limiter
 
 logger = logging.getLogger(__name__)
@@ -28,6 +32,8 @@ class BaseCollector(ABC):
         self.retry_count = 0
         self.max_retries = settings.MAX_RETRIES
         self.retry_delay = settings.RETRY_DELAY_SECONDS
+        self.request_semaphore = asyncio.Semaphore(settings.COLLECTOR_CONCURRENCY)
+        self.inflight = Singleflight()
         
         logger.info(f"Initialized {self.name} collector")
     
@@ -67,15 +73,19 @@ class BaseCollector(ABC):
     
     async def start_collection_loop(
         self,
-        db: AsyncSession,
+        session_factory: async_sessionmaker[AsyncSession],
         symbols: List[str],
         interval_seconds: Optional[int] = None
     ) -> None:
         """
         Start continuous data collection loop.
         
+        Each collection runs in its own session, so a connection is only
+        checked out of the pool while a batch is being collected and
+        written, not for the lifetime of the loop.
+        
         Args:
-            db: Database session
+            session_factory: Factory for database sessions
             symbols: List of trading symbols
             interval_seconds: Collection interval
         """
@@ -90,7 +100,8 @@ class BaseCollector(ABC):
         
         while self.is_running:
             try:
-                records = await self.collect(db, symbols)
+                async with session_factory() as db:
+                    records = await self.collect(db, symbols)
                 logger.info(f"{self.name} collected {records} records")
                 self.retry_count = 0
                 
@@ -109,18 +120,19 @@ class BaseCollector(ABC):
             await asyncio.sleep(interval)
     
     async def stop_collection_loop(self) -> None:
-        """Stop data collection loop."""
-        if not self.is_running:
+        """Stop data collection loop, cancelling its task even if not yet started."""
+        task, self.collection_task = self.collection_task, None
+        if not self.is_running and (task is None or task.done()):
             logger.warning(f"{self.name} collector not running")
             return
         
         logger.info(f"Stopping {self.name} collection loop")
         self.is_running = False
         
-        if self.collection_task:
-            self.collection_task.cancel()
+        if task and task is not asyncio.current_task():
+            task.cancel()
             try:
-                await self.collection_task
+                await task
             except asyncio.CancelledError:
                 pass
     
@@ -133,6 +145,125 @@ class BaseCollector(ABC):
         """
         await rate_limiter.acquire(limiter_name)
     
+    async def fetch(self, limiter_name: str, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Call an async API client method.
+        
+        Calls can be gathered freely: at most COLLECTOR_CONCURRENCY of them
+        run at once, and each one acquires the rate limit first.
+        
+        Args:
+            limiter_name: Rate limiter name
+            func: Client method to call
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+            
+        Returns:
+            The method's return value
+        """
+        async with self.request_semaphore:
+            await self.acquire_rate_limit(limiter_name)
+            return await func(*args, **kwargs)
+    
+    async def fetch_once(
+        self,
+        key: str,
+        limiter_name: str,
+        func: Callable[..., Awaitable[Any]],
+        *args,
+        **kwargs
+    ) -> Any:
+        """
+        fetch, shared with any concurrent call for the same key.
+        
+        Overlapping collections (e.g. an API-triggered run during a
+        scheduled one) then make one upstream request per key and spend one
+        rate limit token on it, rather than one each.
+        
+        Args:
+            key: Deduplication key identifying the request
+            limiter_name: Rate limiter name
+            func: Client method to call
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+            
+        Returns:
+            The method's return value
+        """
+        return await self.inflight.do(
+            key, functools.partial(self.fetch, limiter_name, func, *args, **kwargs)
+        )
+    
+    async def http_get(
+        self,
+        client: httpx.AsyncClient,
+        limiter_name: str,
+        path: str,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None
+    ) -> httpx.Response:
+        """
+        GET a URL, retrying transient failures and following rate-limit headers.
+        
+        The named limiter is synced with x-ratelimit-remaining after every
+        response. A 429 throttles the limiter for its Retry-After (or
+        2**attempt seconds when absent). Transport errors and 5xx responses
+        back off exponentially from RETRY_DELAY_SECONDS, plus up to one
+        more RETRY_DELAY_SECONDS of jitter so concurrent tasks do not retry
+        in lockstep. Every retry acquires the limiter again.
+        
+        Args:
+            client: HTTP client to send the request with
+            limiter_name: Rate limiter name
+            path: URL or path relative to the client's base URL
+            params: Query parameters
+            headers: Extra request headers
+            
+        Returns:
+            The first non-retryable response, or the last one after
+            MAX_RETRIES retries
+            
+        Raises:
+            httpx.TransportError: If the last attempt failed to connect or timed out
+        """
+        limiter = rate_limiter.get_limiter(limiter_name)
+        attempt = 0
+        while True:
+            try:
+                response = await client.get(path, params=params, headers=headers)
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.retry_delay * (2 ** attempt + random.random())
+                logger.warning(f"{self.name} request to {path} failed ({e!r}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+            else:
+                remaining = response.headers.get("x-ratelimit-remaining")
+                limiter.sync(remaining=int(remaining) if remaining and remaining.isdigit() else None)
+                
+                if attempt >= self.max_retries:
+                    return response
+                
+                if response.status_code == 429:
+                    try:
+                        delay = float(response.headers.get("retry-after"))
+                    except (TypeError, ValueError):
+                        delay = float(2 ** attempt)
+                    logger.warning(f"{self.name} rate limited on {path}, retrying in {delay:.1f}s")
+                    limiter.sync(retry_after=delay)
+                elif response.status_code >= 500:
+                    delay = self.retry_delay * (2 ** attempt + random.random())
+                    logger.warning(
+                        f"{self.name} request to {path} returned {response.status_code}, "
+                        f"retrying in {delay:.1f}s"
+                    )
+                    await asyncio.sleep(delay)
+                else:
+                    return response
+            
+            await limiter.acquire()
+            attempt += 1
+    
     def get_status(self) -> dict:
         """Get collector status."""
         return {
@@ -0,0 +1,122 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+import httpx
+import orjson
+
+logger = logging.getLogger(__name__)
+
+BINANCE_URL = "https://api.binance.com"
+BINANCE_TESTNET_URL = "https://testnet.binance.vision"
+
+# Largest page /api/v3/klines returns
+KLINES_PAGE_LIMIT = 1000
+
+
+class BinanceAPIError(Exception):
+    """Error response from the Binance REST API."""
+    
+    def __init__(self, status_code: int, code: Optional[int], message: str):
+        super().__init__(f"APIError(code={code}): {message}")
+        self.status_code = status_code
+        self.code = code
+        self.message = message
+
+
+class BinanceClient:
+    """
+    Async client for the public Binance market data endpoints.
+    
+    Method names and return values follow python-binance's Client, so rows
+    are parsed the same way. All requests share one keep-alive connection
+    pool, opened on first use and reopened after close().
+    """
+    
+    def __init__(self, api_key: Optional[str] = None, testnet: bool = False):
+        """
+        Initialize client.
+        
+        Args:
+            api_key: Optional API key, sent so request weight is attributed to it
+            testnet: Use the Binance spot testnet
+        """
+        self.base_url = BINANCE_TESTNET_URL if testnet else BINANCE_URL
+        self.headers = {"X-MBX-APIKEY": api_key} if api_key else {}
+        self._http: Optional[httpx.AsyncClient] = None
+    
+    async def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        GET a public endpoint and decode its JSON body.
+        
+        Args:
+            path: Endpoint path (e.g., "/api/v3/depth")
+            params: Query parameters
+        
+        Returns:
+            Decoded response body
+        
+        Raises:
+            BinanceAPIError: If Binance returns an error status
+        """
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                limits=httpx.Limits(
+                    max_connections=32,
+                    max_keepalive_connections=32,
+                    keepalive_expiry=60,
+                ),
+                timeout=10.0,
+            )
+        
+        response = await self._http.get(path, params=params)
+        if response.status_code >= 400:
+            try:
+                error = orjson.loads(response.content)
+                raise BinanceAPIError(response.status_code, error.get("code"), error.get("msg", ""))
+            except orjson.JSONDecodeError:
+                raise BinanceAPIError(response.status_code, None, response.text)
+        return orjson.loads(response.content)
+    
+    async def close(self) -> None:
+        """Close the connection pool."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+    
+    async def get_ticker(self) -> List[Dict[str, Any]]:
+        """Get 24h ticker statistics for all symbols."""
+        return await self._get("/api/v3/ticker/24hr")
+    
+    async def get_order_book(self, symbol: str, limit: int = 100) -> Dict[str, Any]:
+        """Get an order book snapshot."""
+        return await self._get("/api/v3/depth", {"symbol": symbol, "limit": limit})
+    
+    async def get_recent_trades(self, symbol: str, limit: int = 500) -> List[Dict[str, Any]]:
+        """Get the most recent trades."""
+        return await self._get("/api/v3/trades", {"symbol": symbol, "limit": limit})
+    
+    async def get_klines(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int = 500,
+        start_time: Optional[int] = None
+    ) -> List[list]:
+        """
+        Get klines (candlesticks), oldest first.
+        
+        Args:
+            symbol: Trading symbol
+            interval: Kline interval (e.g., "1m")
+            limit: Maximum number of klines
+            start_time: Open time of the first kline, in epoch milliseconds
+        
+        Returns:
+            Klines as returned by Binance
+        """
+        params = {"symbol": symbol, "interval": interval, "limit": limit}
+        if start_time is not None:
+            params["startTime"] = start_time
+        return await self._get("/api/v3/klines", params)
@@ -1,14 +1,16 @@
 import logging
 from datetime import datetime, timedelta
-from typing import List, Optional
-from binance.client import Client
-from binance.exceptions import BinanceAPIException
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 import asyncio
+import numpy as np
 
 from app.collectors.base import BaseCollector
-from app.models.market_data import OHLCV, Ticker, OrderBook, Trade
+from app.collectors.binance_client import BinanceClient, BinanceAPIError, KLINES_PAGE_LIMIT
+from app.collectors.binance_stream import BinanceStream
+from app.database import bulk_upsert, refresh_symbols_view
+from app.models.market_data import OHLCV, Ticker, OrderBook, Trade, E8_SCALE, to_e8
 from app.schemas.market_data import (
     OHLCVCreate, TickerCreate, OrderBookCreate, TradeCreate
 )
@@ -18,6 +20,13 @@ from app.cache.redis_cache import cache
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Row inserts built once and executed with a list of row dicts. Unlike
+# insert().values(rows), whose SQL grows with the row count, the statement
+# compiles once and stays a single prepared statement; SQLAlchemy batches
+# the rows into multi-row INSERTs itself.
+TICKER_INSERT = insert(Ticker)
+ORDERBOOK_INSERT = insert(OrderBook)
+
 
 class BinanceCollector(BaseCollector):
     """Collector for Binance exchange data."""
@@ -25,14 +34,30 @@ class BinanceCollector(BaseCollector):
     def __init__(self):
         super().__init__("BinanceCollector")
         
-        # Initialize Binance client
-        self.client = Client(
+        # Async REST client; only public market data endpoints are used,
+        # so requests are not signed with the API secret
+        self.client = BinanceClient(
             api_key=settings.BINANCE_API_KEY,
-            api_secret=settings.BINANCE_API_SECRET,
             testnet=settings.BINANCE_TESTNET
         )
+        self.stream = BinanceStream(testnet=settings.BINANCE_TESTNET)
         
         self.timeframes = ["1m", "5m", "15m", "1h", "4h", "1d"]
+        
+        # Symbols already stored since startup; a new one triggers a
+        # symbols_mv refresh so it is listed without waiting for the schedule
+        self.known_symbols: Set[str] = set()
+        
+        # Newest trade id and candle open time stored per symbol (and
+        # timeframe). Each poll overlaps the previous one, so rows at or
+        # before these marks are already in the database and are not
+        # re-sent for the staging flush to discard.
+        self.last_trade_ids: Dict[str, int] = {}
+        self.last_candle_times: Dict[Tuple[str, str], datetime] = {}
+        
+        # (lastPrice, volume, bidPrice, askPrice) of the last stored ticker
+        # per symbol; an identical ticker is not stored again
+        self.ticker_fingerprints: Dict[str, tuple] = {}
         logger.info("Binance client initialized")
     
     async def collect(self, db: AsyncSession, symbols: List[str]) -> int:
@@ -73,6 +98,35 @@ class BinanceCollector(BaseCollector):
         
         return total_records
     
+    async def start_collection_loop(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        symbols: List[str],
+        interval_seconds: Optional[int] = None
+    ) -> None:
+        """
+        Start the polling loop, streaming real-time data alongside it.
+        
+        Args:
+            session_factory: Factory for database sessions
+            symbols: List of trading symbols
+            interval_seconds: Collection interval
+        """
+        if self.is_running or not settings.BINANCE_STREAM_ENABLED:
+            return await super().start_collection_loop(session_factory, symbols, interval_seconds)
+        
+        self.stream.start(symbols)
+        try:
+            await super().start_collection_loop(session_factory, symbols, interval_seconds)
+        finally:
+            await self.stream.stop()
+    
+    async def stop_collection_loop(self) -> None:
+        """Stop data collection, the stream and the HTTP connection pool."""
+        await super().stop_collection_loop()
+        await self.stream.stop()
+        await self.client.close()
+    
     async def collect_historical(
         self,
         db: AsyncSession,
@@ -93,15 +147,21 @@ class BinanceCollector(BaseCollector):
         total_records = 0
         
         try:
-            for symbol in symbols:
-                for timeframe in self.timeframes:
-                    records = await self._collect_historical_ohlcv(
-                        db, symbol, timeframe, days
-                    )
-                    total_records += records
-                    
-                    # Small delay to avoid rate limits
-                    await asyncio.sleep(0.5)
+            # All pairs page through their klines concurrently; request pace is
+            # left to fetch's semaphore and the binance rate limiter, and the
+            # lock serializes writes on the shared session
+            db_lock = asyncio.Lock()
+            pairs = [(symbol, timeframe) for symbol in symbols for timeframe in self.timeframes]
+            results = await asyncio.gather(*(
+                self._collect_historical_ohlcv(db, db_lock, symbol, timeframe, days)
+                for symbol, timeframe in pairs
+            ), return_exceptions=True)
+            
+            for (symbol, timeframe), result in zip(pairs, results):
+                if isinstance(result, BaseException):
+                    logger.error(f"Error collecting historical OHLCV for {symbol} {timeframe}: {result}")
+                else:
+                    total_records += result
             
             logger.info(f"Binance historical collected {total_records} records")
             
@@ -116,116 +176,182 @@ class BinanceCollector(BaseCollector):
         db: AsyncSession,
         symbols: List[str]
     ) -> int:
-        """Collect ticker data."""
-        await self.acquire_rate_limit("binance")
-        
+        """Collect ticker data, preferring the latest streamed tickers."""
         try:
-            # Get 24h ticker data for all symbols
-            tickers = await asyncio.to_thread(self.client.get_ticker)
+            symbol_set = set(symbols)
+            streamed = self.stream.take_tickers()
+            filtered_tickers = [t for symbol, t in streamed.items() if symbol in symbol_set]
             
-            if not tickers:
-                return 0
+            # Get 24h ticker data for symbols the stream did not deliver
+            rest_symbols = symbol_set - streamed.keys()
+            if rest_symbols:
+                tickers = await self.fetch("binance", self.client.get_ticker)
+                filtered_tickers += [t for t in tickers or [] if t['symbol'] in rest_symbols]
             
-            # Filter for our symbols
-            symbol_set = set(symbols)
-            filtered_tickers = [t for t in tickers if t['symbol'] in symbol_set]
+            if not filtered_tickers:
+                return 0
             
-            # Store in database and cache
-            records_created = 0
+            # Rows are stored with one multi-row INSERT and cached in one
+            # pipeline after the loop
+            rows = []
+            snapshots = {}
+            unchanged = []
+            fingerprints = {}
+            now = datetime.utcnow()
+            now_iso = now.isoformat()
             for ticker_data in filtered_tickers:
                 try:
-                    ticker = Ticker(
-                        symbol=ticker_data['symbol'],
-                        exchange="binance",
-                        timestamp=datetime.utcnow(),
-                        last_price=float(ticker_data['lastPrice']),
-                        bid_price=float(ticker_data['bidPrice']) if ticker_data.get('bidPrice') else None,
-                        ask_price=float(ticker_data['askPrice']) if ticker_data.get('askPrice') else None,
-                        volume_24h=float(ticker_data['volume']) if ticker_data.get('volume') else None,
-                        quote_volume_24h=float(ticker_data['quoteVolume']) if ticker_data.get('quoteVolume') else None,
-                        price_change_24h=float(ticker_data['priceChange']) if ticker_data.get('priceChange') else None,
-                        price_change_percent_24h=float(ticker_data['priceChangePercent']) if ticker_data.get('priceChangePercent') else None,
-                        high_24h=float(ticker_data['highPrice']) if ticker_data.get('highPrice') else None,
-                        low_24h=float(ticker_data['lowPrice']) if ticker_data.get('lowPrice') else None,
+                    symbol = ticker_data['symbol']
+                    fingerprint = (
+                        ticker_data['lastPrice'], ticker_data.get('volume'),
+                        ticker_data.get('bidPrice'), ticker_data.get('askPrice'),
                     )
-                    db.add(ticker)
-                    records_created += 1
+                    if self.ticker_fingerprints.get(symbol) == fingerprint:
+                        unchanged.append(symbol)
+                        continue
+                    fingerprints[symbol] = fingerprint
                     
-                    # Cache ticker data
-                    cache_key = f"ticker:{ticker_data['symbol']}"
-                    await cache.set(cache_key, {
+                    rows.append({
+                        "symbol": ticker_data['symbol'],
+                        "exchange": "binance",
+                        "timestamp": now,
+                        "last_price": float(ticker_data['lastPrice']),
+                        "bid_price": float(ticker_data['bidPrice']) if ticker_data.get('bidPrice') else None,
+                        "ask_price": float(ticker_data['askPrice']) if ticker_data.get('askPrice') else None,
+                        "volume_24h": float(ticker_data['volume']) if ticker_data.get('volume') else None,
+                        "quote_volume_24h": (
+                            float(ticker_data['quoteVolume']) if ticker_data.get('quoteVolume') else None
+                        ),
+                        "price_change_24h": (
+                            float(ticker_data['priceChange']) if ticker_data.get('priceChange') else None
+                        ),
+                        "price_change_percent_24h": (
+                            float(ticker_data['priceChangePercent']) if ticker_data.get('priceChangePercent') else None
+                        ),
+                        "high_24h": float(ticker_data['highPrice']) if ticker_data.get('highPrice') else None,
+                        "low_24h": float(ticker_data['lowPrice']) if ticker_data.get('lowPrice') else None,
+                    })
+                    
+                    # Streamed tickers are already cached by the stream
+                    if ticker_data['symbol'] not in rest_symbols:
+                        continue
+                    snapshots[f"ticker:{ticker_data['symbol']}"] = {
                         "symbol": ticker_data['symbol'],
                         "price": float(ticker_data['lastPrice']),
-                        "timestamp": datetime.utcnow().isoformat(),
-                    }, ttl=60)
+                        "timestamp": now_iso,
+                    }
                     
                 except Exception as e:
                     logger.error(f"Error processing ticker {ticker_data.get('symbol')}: {e}")
                     continue
             
+            if rows:
+                await db.execute(TICKER_INSERT, rows)
             await db.commit()
-            logger.info(f"Stored {records_created} tickers")
+            self.ticker_fingerprints.update(fingerprints)
+            records_created = len(rows)
+            logger.info(f"Stored {records_created} tickers ({len(unchanged)} unchanged)")
+            
+            # Cache tickers and push them to WebSocket subscribers; unchanged
+            # polled tickers only have their cached copy kept alive
+            await cache.set_many(snapshots, ttl=60)
+            await cache.publish_many({f"pub:{key}": snapshot for key, snapshot in snapshots.items()})
+            await cache.expire_many(
+                [f"ticker:{symbol}" for symbol in unchanged if symbol in rest_symbols], ttl=60
+            )
+            
+            new_symbols = {t['symbol'] for t in filtered_tickers} - self.known_symbols
+            if new_symbols:
+                await self._publish_new_symbols(new_symbols)
+            
             return records_created
             
-        except BinanceAPIException as e:
+        except BinanceAPIError as e:
             logger.error(f"Binance API error collecting tickers: {e}")
             return 0
     
+    async def _publish_new_symbols(self, new_symbols: Set[str]) -> None:
+        """Refresh symbols_mv and drop the cached symbol list."""
+        try:
+            await refresh_symbols_view()
+            await cache.delete("api:symbols")
+            self.known_symbols |= new_symbols
+            logger.info(f"Listed new symbols: {sorted(new_symbols)}")
+        except Exception as e:
+            logger.error(f"Error refreshing symbols view: {e}")
+    
     async def _collect_orderbooks(
         self,
         db: AsyncSession,
         symbols: List[str]
     ) -> int:
-        """Collect order book data."""
-        records_created = 0
+        """Collect order book data, preferring the latest streamed books."""
+        rows = []
+        snapshots = {}
+        
+        # Fetch order books the stream did not deliver concurrently, then
+        # process all of them in order
+        orderbooks = self.stream.take_orderbooks()
+        rest_symbols = [symbol for symbol in symbols if symbol not in orderbooks]
+        results = await asyncio.gather(*(
+            self.fetch("binance", self.client.get_order_book, symbol=symbol, limit=100)
+            for symbol in rest_symbols
+        ), return_exceptions=True)
+        orderbooks.update(zip(rest_symbols, results))
         
+        now = datetime.utcnow()
+        now_iso = now.isoformat()
         for symbol in symbols:
+            orderbook_data = orderbooks[symbol]
             try:
-                await self.acquire_rate_limit("binance")
-                
-                # Get order book
-                orderbook_data = await asyncio.to_thread(
-                    self.client.get_order_book,
-                    symbol=symbol,
-                    limit=100
-                )
+                if isinstance(orderbook_data, BaseException):
+                    raise orderbook_data
                 
-                # Calculate metrics
-                bids = [[float(price), float(qty)] for price, qty in orderbook_data['bids']]
-                asks = [[float(price), float(qty)] for price, qty in orderbook_data['asks']]
+                # Parse levels into (n, 2) price/quantity arrays in one pass
+                bids = np.asarray(orderbook_data['bids'], dtype=np.float64).reshape(-1, 2)
+                asks = np.asarray(orderbook_data['asks'], dtype=np.float64).reshape(-1, 2)
                 
-                bid_ask_spread = asks[0][0] - bids[0][0] if bids and asks else None
-                total_bid_volume = sum(bid[1] for bid in bids)
-                total_ask_volume = sum(ask[1] for ask in asks)
+                bid_ask_spread = float(asks[0, 0] - bids[0, 0]) if len(bids) and len(asks) else None
+                total_bid_volume = float(bids[:, 1].sum())
+                total_ask_volume = float(asks[:, 1].sum())
                 
-                orderbook = OrderBook(
-                    symbol=symbol,
-                    exchange="binance",
-                    timestamp=datetime.utcnow(),
-                    bids=bids,
-                    asks=asks,
-                    bid_ask_spread=bid_ask_spread,
-                    total_bid_volume=total_bid_volume,
-                    total_ask_volume=total_ask_volume,
-                )
-                db.add(orderbook)
-                records_created += 1
+                rows.append({
+                    "symbol": symbol,
+                    "exchange": "binance",
+                    "timestamp": now,
+                    "bid_prices": bids[:, 0].tolist(),
+                    "bid_volumes": bids[:, 1].tolist(),
+                    "ask_prices": asks[:, 0].tolist(),
+                    "ask_volumes": asks[:, 1].tolist(),
+                    "bid_ask_spread": bid_ask_spread,
+                    "total_bid_volume": total_bid_volume,
+                    "total_ask_volume": total_ask_volume,
+                })
                 
-                # Cache order book
-                cache_key = f"orderbook:{symbol}"
-                await cache.set(cache_key, {
+                # Streamed books are already cached by the stream
+                if symbol not in rest_symbols:
+                    continue
+                snapshots[f"orderbook:{symbol}"] = {
                     "symbol": symbol,
-                    "bids": bids[:10],  # Top 10
-                    "asks": asks[:10],
+                    "bids": bids[:10].tolist(),  # Top 10
+                    "asks": asks[:10].tolist(),
                     "spread": bid_ask_spread,
-                    "timestamp": datetime.utcnow().isoformat(),
-                }, ttl=30)
+                    "timestamp": now_iso,
+                }
                 
             except Exception as e:
                 logger.error(f"Error collecting orderbook for {symbol}: {e}")
                 continue
         
+        # One multi-row INSERT for the cycle instead of a flush per snapshot
+        if rows:
+            await db.execute(ORDERBOOK_INSERT, rows)
         await db.commit()
+        records_created = len(rows)
+        
+        # Cache order books and push them to WebSocket subscribers
+        await cache.set_many(snapshots, ttl=30)
+        await cache.publish_many({f"pub:{key}": snapshot for key, snapshot in snapshots.items()})
         return records_created
     
     async def _collect_trades(
@@ -233,56 +359,58 @@ class BinanceCollector(BaseCollector):
         db: AsyncSession,
         symbols: List[str]
     ) -> int:
-        """Collect recent trades."""
-        records_created = 0
+        """Collect recent trades, preferring streamed trades."""
+        records = []
+        last_trade_ids = {}
+        
+        # Fetch recent trades for symbols without streamed trades concurrently
+        trades = self.stream.take_trades()
+        rest_symbols = [symbol for symbol in symbols if symbol not in trades]
+        results = await asyncio.gather(*(
+            self.fetch("binance", self.client.get_recent_trades, symbol=symbol, limit=100)
+            for symbol in rest_symbols
+        ), return_exceptions=True)
+        trades.update(zip(rest_symbols, results))
         
+        now = datetime.utcnow()
         for symbol in symbols:
+            trades_data = trades[symbol]
             try:
-                await self.acquire_rate_limit("binance")
-                
-                # Get recent trades
-                trades_data = await asyncio.to_thread(
-                    self.client.get_recent_trades,
-                    symbol=symbol,
-                    limit=100
-                )
+                if isinstance(trades_data, BaseException):
+                    raise trades_data
                 
+                last_id = self.last_trade_ids.get(symbol, -1)
                 for trade_data in trades_data:
+                    if trade_data['id'] <= last_id:
+                        continue
                     try:
-                        # Check if trade already exists
-                        trade_id = str(trade_data['id'])
-                        stmt = select(Trade).where(
-                            Trade.exchange == "binance",
-                            Trade.trade_id == trade_id
-                        )
-                        result = await db.execute(stmt)
-                        existing = result.scalar_one_or_none()
-                        
-                        if existing:
-                            continue
-                        
-                        trade = Trade(
-                            symbol=symbol,
-                            exchange="binance",
-                            trade_id=trade_id,
-                            timestamp=datetime.fromtimestamp(trade_data['time'] / 1000),
-                            price=float(trade_data['price']),
-                            volume=float(trade_data['qty']),
-                            quote_volume=float(trade_data['quoteQty']) if 'quoteQty' in trade_data else None,
-                            is_buyer_maker=trade_data.get('isBuyerMaker', False),
-                        )
-                        db.add(trade)
-                        records_created += 1
+                        records.append((
+                            symbol,
+                            "binance",
+                            str(trade_data['id']),
+                            datetime.utcfromtimestamp(trade_data['time'] / 1000),
+                            to_e8(trade_data['price']),
+                            float(trade_data['qty']),
+                            to_e8(trade_data['quoteQty']) if 'quoteQty' in trade_data else None,
+                            trade_data.get('isBuyerMaker', False),
+                            now,
+                        ))
                         
                     except Exception as e:
                         logger.error(f"Error processing trade {trade_data.get('id')}: {e}")
                         continue
                 
+                if trades_data:
+                    last_trade_ids[symbol] = max(last_id, max(t['id'] for t in trades_data))
+                
             except Exception as e:
                 logger.error(f"Error collecting trades for {symbol}: {e}")
                 continue
         
+        # Duplicates are skipped by the staging flush
+        records_created = await bulk_upsert(db, "trades", Trade.copy_columns, records)
         await db.commit()
+        self.last_trade_ids.update(last_trade_ids)
         return records_created
     
     async def _collect_ohlcv(
@@ -292,128 +420,151 @@ class BinanceCollector(BaseCollector):
         timeframes: List[str]
     ) -> int:
         """Collect OHLCV data for specified timeframes."""
-        records_created = 0
+        records: List[tuple] = []
+        latest_candles = {}
+        last_candle_times = {}
         
-        for symbol in symbols:
-            for timeframe in timeframes:
-                try:
-                    await self.acquire_rate_limit("binance")
-                    
-                    # Get klines (candlesticks)
-                    klines = await asyncio.to_thread(
-                        self.client.get_klines,
-                        symbol=symbol,
-                        interval=timeframe,
-                        limit=10
-                    )
-                    
-                    for kline in klines:
-                        try:
-                            timestamp = datetime.fromtimestamp(kline[0] / 1000)
-                            
-                            # Check if record exists
-                            stmt = select(OHLCV).where(
-                                OHLCV.symbol == symbol,
-                                OHLCV.timeframe == timeframe,
-                                OHLCV.timestamp == timestamp
-                            )
-                            result = await db.execute(stmt)
-                            existing = result.scalar_one_or_none()
-                            
-                            if existing:
-                                continue
-                            
-                            ohlcv = OHLCV(
-                                symbol=symbol,
-                                exchange="binance",
-                                timeframe=timeframe,
-                                timestamp=timestamp,
-                                open=float(kline[1]),
-                                high=float(kline[2]),
-                                low=float(kline[3]),
-                                close=float(kline[4]),
-                                volume=float(kline[5]),
-                                quote_volume=float(kline[7]),
-                                trades_count=int(kline[8]),
-                            )
-                            db.add(ohlcv)
-                            records_created += 1
-                            
-                        except Exception as e:
-                            logger.error(f"Error processing kline: {e}")
-                            continue
-                    
-                except Exception as e:
-                    logger.error(f"Error collecting OHLCV for {symbol} {timeframe}: {e}")
-                    continue
+        # Fetch klines (candlesticks) for every pair concurrently
+        pairs = [(symbol, timeframe) for symbol in symbols for timeframe in timeframes]
+        results = await asyncio.gather(*(
+            self.fetch("binance", self.client.get_klines, symbol=symbol, interval=timeframe, limit=10)
+            for symbol, timeframe in pairs
+        ), return_exceptions=True)
+        
+        for (symbol, timeframe), klines in zip(pairs, results):
+            try:
+                if isinstance(klines, BaseException):
+                    raise klines
+                
+                # Candles before the last stored one are final; the last
+                # stored one is upserted again as it may have been open
+                last_time = self.last_candle_times.get((symbol, timeframe))
+                kline_records = self._kline_records(symbol, timeframe, klines)
+                records.extend(
+                    record for record in kline_records
+                    if last_time is None or record[3] >= last_time
+                )
+                if kline_records:
+                    last_candle_times[(symbol, timeframe)] = kline_records[-1][3]
+                latest_candles[(symbol, timeframe)] = [
+                    {
+                        "timestamp": datetime.utcfromtimestamp(kline[0] // 1000).isoformat(),
+                        "open": float(kline[1]),
+                        "high": float(kline[2]),
+                        "low": float(kline[3]),
+                        "close": float(kline[4]),
+                        "volume": float(kline[5]),
+                    }
+                    for kline in klines
+                ]
+                
+            except Exception as e:
+                logger.error(f"Error collecting OHLCV for {symbol} {timeframe}: {e}")
+                continue
         
+        # Existing candles are updated in place by the staging flush
+        records_created = await bulk_upsert(db, "ohlcv", OHLCV.copy_columns, records)
         await db.commit()
+        self.last_candle_times.update(last_candle_times)
+        
+        # Cache the latest candles and push them to WebSocket subscribers
+        await cache.set_many({
+            f"ohlcv:{symbol}:{timeframe}:10": candles
+            for (symbol, timeframe), candles in latest_candles.items()
+        }, ttl=60)
+        await cache.publish_many({
+            f"pub:ohlcv:{symbol}:{timeframe}": candles
+            for (symbol, timeframe), candles in latest_candles.items()
+        })
+        
         return records_created
     
     async def _collect_historical_ohlcv(
         self,
         db: AsyncSession,
+        db_lock: asyncio.Lock,
         symbol: str,
         timeframe: str,
         days: int
     ) -> int:
-        """Collect historical OHLCV data."""
-        await self.acquire_rate_limit("binance")
-        
+        """Collect historical OHLCV data, storing each page as it arrives."""
         try:
             # Calculate start time
             start_time = datetime.utcnow() - timedelta(days=days)
             start_ms = int(start_time.timestamp() * 1000)
-            
-            # Get historical klines
-            klines = await asyncio.to_thread(
-                self.client.get_historical_klines,
-                symbol=symbol,
-                interval=timeframe,
-                start_str=start_ms
-            )
-            
             records_created = 0
-            for kline in klines:
-                try:
-                    timestamp = datetime.fromtimestamp(kline[0] / 1000)
-                    
-                    # Check if record exists
-                    stmt = select(OHLCV).where(
-                        OHLCV.symbol == symbol,
-                        OHLCV.timeframe == timeframe,
-                        OHLCV.timestamp == timestamp
-                    )
-                    result = await db.execute(stmt)
-                    existing = result.scalar_one_or_none()
-                    
-                    if existing:
-                        continue
-                    
-                    ohlcv = OHLCV(
-                        symbol=symbol,
-                        exchange="binance",
-                        timeframe=timeframe,
-                        timestamp=timestamp,
-                        open=float(kline[1]),
-                        high=float(kline[2]),
-                        low=float(kline[3]),
-                        close=float(kline[4]),
-                        volume=float(kline[5]),
-                        quote_volume=float(kline[7]),
-                        trades_count=int(kline[8]),
-                    )
-                    db.add(ohlcv)
-                    records_created += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error processing historical kline: {e}")
-                    continue
             
-            await db.commit()
+            while True:
+                klines = await self.fetch(
+                    "binance",
+                    self.client.get_klines,
+                    symbol=symbol,
+                    interval=timeframe,
+                    limit=KLINES_PAGE_LIMIT,
+                    start_time=start_ms
+                )
+                
+                records = self._kline_records(symbol, timeframe, klines)
+                async with db_lock:
+                    records_created += await bulk_upsert(db, "ohlcv", OHLCV.copy_columns, records)
+                    await db.commit()
+                
+                if len(klines) < KLINES_PAGE_LIMIT:
+                    break
+                start_ms = klines[-1][0] + 1
+            
             logger.info(f"Collected {records_created} historical records for {symbol} {timeframe}")
             return records_created
             
-        except BinanceAPIException as e:
+        except BinanceAPIError as e:
             logger.error(f"Binance API error collecting historical data: {e}")
-            return 0
\ No newline at end of file
+            return 0
+    
+    def _kline_records(
+        self,
+        symbol: str,
+        timeframe: str,
+        klines: List[list]
+    ) -> List[tuple]:
+        """
+        Convert Binance klines to OHLCV staging rows.
+        
+        Columns are converted as whole NumPy arrays rather than per kline.
+        Prices are scaled with float64, which is exact to 8 decimals for
+        prices below ~4.5e7.
+        """
+        if not klines:
+            return []
+        
+        try:
+            columns = list(zip(*klines))
+            count = len(klines)
+            timestamps = (
+                np.array(columns[0], dtype=np.int64)
+                .astype("datetime64[ms]")
+                .astype("datetime64[s]")
+                .tolist()
+            )
+            prices = [
+                np.rint(np.array(column, dtype=np.float64) * E8_SCALE).astype(np.int64).tolist()
+                for column in columns[1:5]
+            ]
+            volumes = np.array(columns[5], dtype=np.float64).tolist()
+            quote_volumes = np.array(columns[7], dtype=np.float64).tolist()
+            trades_counts = np.array(columns[8], dtype=np.int64).tolist()
+        except Exception as e:
+            logger.error(f"Error processing klines for {symbol} {timeframe}: {e}")
+            return []
+        
+        now = datetime.utcnow()
+        return list(zip(
+            [symbol] * count,
+            ["binance"] * count,
+            [timeframe] * count,
+            timestamps,
+            *prices,
+            volumes,
+            quote_volumes,
+            trades_counts,
+            [now] * count,
+        ))
@@ -0,0 +1,190 @@
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+from decimal import Decimal
+from typing import Deque, Dict, List
+
+import orjson
+import websockets
+
+from app.config import get_settings
+from app.cache.redis_cache import cache
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+BINANCE_STREAM_URL = "wss://stream.binance.com:9443"
+BINANCE_TESTNET_STREAM_URL = "wss://testnet.binance.vision"
+
+# Streamed trades kept per symbol until the collector stores them
+TRADE_BUFFER_SIZE = 10000
+
+
+class BinanceStream:
+    """
+    Real-time Binance market data over one combined WebSocket stream.
+    
+    Ticker, top-20 depth and trade events are held in per-symbol buffers.
+    Latest tickers and order books are pushed to the cache and to WebSocket
+    subscribers every BINANCE_STREAM_FLUSH_SECONDS. BinanceCollector drains
+    the buffers into the database on its polling interval and only falls
+    back to REST for symbols the stream has not delivered.
+    
+    Events are converted to the shape of the matching REST response, so
+    the collector parses both the same way.
+    """
+    
+    def __init__(self, testnet: bool = False):
+        """
+        Initialize stream.
+        
+        Args:
+            testnet: Use the Binance spot testnet
+        """
+        self.base_url = BINANCE_TESTNET_STREAM_URL if testnet else BINANCE_STREAM_URL
+        self.is_connected = False
+        self.tasks: List[asyncio.Task] = []
+        
+        self.tickers: Dict[str, dict] = {}
+        self.orderbooks: Dict[str, dict] = {}
+        self.trades: Dict[str, Deque[dict]] = {}
+        
+        # Cache snapshots changed since the last flush
+        self.pending_tickers: Dict[str, dict] = {}
+        self.pending_orderbooks: Dict[str, dict] = {}
+    
+    def start(self, symbols: List[str]) -> None:
+        """
+        Start streaming symbols in the background.
+        
+        Args:
+            symbols: List of trading symbols
+        """
+        if self.tasks:
+            return
+        self.tasks = [
+            asyncio.create_task(self._run(symbols)),
+            asyncio.create_task(self._flush_loop()),
+        ]
+        logger.info(f"Binance stream started for {len(symbols)} symbols")
+    
+    async def stop(self) -> None:
+        """Stop streaming and flushing."""
+        tasks, self.tasks = self.tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def take_tickers(self) -> Dict[str, dict]:
+        """Latest ticker per symbol since the last call, in REST 24hr ticker shape."""
+        tickers, self.tickers = self.tickers, {}
+        return tickers
+    
+    def take_orderbooks(self) -> Dict[str, dict]:
+        """Latest order book per symbol since the last call, in REST depth shape."""
+        orderbooks, self.orderbooks = self.orderbooks, {}
+        return orderbooks
+    
+    def take_trades(self) -> Dict[str, List[dict]]:
+        """Trades per symbol since the last call, in REST recent trades shape."""
+        trades, self.trades = self.trades, {}
+        return {symbol: list(buffer) for symbol, buffer in trades.items()}
+    
+    async def _run(self, symbols: List[str]) -> None:
+        """Keep the combined stream connected, reconnecting after failures."""
+        streams = "/".join(
+            f"{symbol.lower()}@ticker/{symbol.lower()}@depth20@100ms/{symbol.lower()}@trade"
+            for symbol in symbols
+        )
+        url = f"{self.base_url}/stream?streams={streams}"
+        
+        while True:
+            try:
+                async with websockets.connect(url, max_size=2 ** 22) as websocket:
+                    self.is_connected = True
+                    logger.info("Binance stream connected")
+                    async for message in websocket:
+                        self._handle(orjson.loads(message))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Binance stream error: {e}")
+            finally:
+                # Without a live stream the collector polls REST instead
+                self.is_connected = False
+                self.tickers.clear()
+                self.orderbooks.clear()
+            
+            await asyncio.sleep(settings.RETRY_DELAY_SECONDS)
+    
+    def _handle(self, message: dict) -> None:
+        """Buffer one combined-stream event."""
+        stream = message.get("stream", "")
+        data = message.get("data")
+        if not data or "@" not in stream:
+            return
+        symbol = stream.split("@", 1)[0].upper()
+        now = datetime.utcnow().isoformat()
+        
+        if stream.endswith("@ticker"):
+            self.tickers[symbol] = {
+                "symbol": symbol,
+                "lastPrice": data["c"],
+                "bidPrice": data["b"],
+                "bidQty": data["B"],
+                "askPrice": data["a"],
+                "askQty": data["A"],
+                "volume": data["v"],
+                "quoteVolume": data["q"],
+                "priceChange": data["p"],
+                "priceChangePercent": data["P"],
+                "highPrice": data["h"],
+                "lowPrice": data["l"],
+            }
+            self.pending_tickers[f"ticker:{symbol}"] = {
+                "symbol": symbol,
+                "price": float(data["c"]),
+                "timestamp": now,
+            }
+        
+        elif "@depth" in stream:
+            self.orderbooks[symbol] = {"bids": data["bids"], "asks": data["asks"]}
+            bids = [[float(price), float(qty)] for price, qty in data["bids"][:10]]
+            asks = [[float(price), float(qty)] for price, qty in data["asks"][:10]]
+            self.pending_orderbooks[f"orderbook:{symbol}"] = {
+                "symbol": symbol,
+                "bids": bids,
+                "asks": asks,
+                "spread": asks[0][0] - bids[0][0] if bids and asks else None,
+                "timestamp": now,
+            }
+        
+        elif stream.endswith("@trade"):
+            buffer = self.trades.get(symbol)
+            if buffer is None:
+                buffer = self.trades[symbol] = deque(maxlen=TRADE_BUFFER_SIZE)
+            buffer.append({
+                "id": data["t"],
+                "time": data["T"],
+                "price": data["p"],
+                "qty": data["q"],
+                "quoteQty": str(Decimal(data["p"]) * Decimal(data["q"])),
+                "isBuyerMaker": data["m"],
+            })
+    
+    async def _flush_loop(self) -> None:
+        """Push changed tickers and order books to the cache and subscribers."""
+        while True:
+            await asyncio.sleep(settings.BINANCE_STREAM_FLUSH_SECONDS)
+            tickers, self.pending_tickers = self.pending_tickers, {}
+            orderbooks, self.pending_orderbooks = self.pending_orderbooks, {}
+            if not tickers and not orderbooks:
+                continue
+            
+            await cache.set_many(tickers, ttl=60)
+            await cache.set_many(orderbooks, ttl=30)
+            await cache.publish_many({
+                f"pub:{key}": snapshot
+                for key, snapshot in {**tickers, **orderbooks}.items()
+            })
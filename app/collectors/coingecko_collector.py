@@ -1,7 +1,13 @@
+import asyncio
 import logging
+import time
 from datetime import datetime, timedelta
-from typing import List, Dict
+from types import MappingProxyType
+from typing import Any, List, Dict, Optional, Tuple
 import httpx
+import msgspec
+import orjson
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
@@ -13,6 +19,80 @@ from app.cache.redis_cache import cache
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Largest page /coins/markets returns
+MARKETS_PAGE_SIZE = 250
+
+# Symbol to CoinGecko ID mapping, and its inverse for assigning
+# /coins/markets rows to symbols. Read-only and shared by all instances.
+SYMBOL_TO_ID = MappingProxyType({
+    "BTCUSDT": "bitcoin",
+    "ETHUSDT": "ethereum",
+    "BNBUSDT": "binancecoin",
+    "ADAUSDT": "cardano",
+    "DOGEUSDT": "dogecoin",
+    "XRPUSDT": "ripple",
+    "DOTUSDT": "polkadot",
+    "UNIUSDT": "uniswap",
+    "LINKUSDT": "chainlink",
+    "LTCUSDT": "litecoin",
+    "SOLUSDT": "solana",
+    "MATICUSDT": "matic-network",
+    "AVAXUSDT": "avalanche-2",
+})
+ID_TO_SYMBOL = MappingProxyType({cid: sym for sym, cid in SYMBOL_TO_ID.items()})
+
+# Built once and executed with a list of row dicts, like BinanceCollector's
+# TICKER_INSERT: one executemany with no ORM unit of work or RETURNING.
+# Overlapping runs may store the same snapshot; the duplicate is skipped
+# instead of failing the batch.
+MARKET_METRICS_INSERT = insert(MarketMetrics).on_conflict_do_nothing(
+    index_elements=["symbol", "timestamp"]
+)
+
+
+# The /coins/markets fields stored, decoded the same way: a page is ~250
+# entries of ~25 fields each, most of which (image, roi, price changes, ...)
+# are not kept
+class _MarketEntry(msgspec.Struct):
+    id: Any = None
+    market_cap: Any = None
+    market_cap_rank: Any = None
+    fully_diluted_valuation: Any = None
+    circulating_supply: Any = None
+    total_supply: Any = None
+    max_supply: Any = None
+    ath: Any = None
+    ath_date: Any = None
+    atl: Any = None
+    atl_date: Any = None
+
+
+_decode_markets = msgspec.json.Decoder(List[_MarketEntry]).decode
+
+
+# The few /coins/{id} fields kept. Decoding into these skips everything else
+# (description, links, platforms, ...) without building Python objects for it.
+class _CommunityData(msgspec.Struct):
+    twitter_followers: Any = None
+    reddit_subscribers: Any = None
+
+
+class _DeveloperData(msgspec.Struct):
+    stars: Any = None
+    forks: Any = None
+
+
+class _CoinDetailsPayload(msgspec.Struct):
+    developer_score: Any = None
+    community_score: Any = None
+    liquidity_score: Any = None
+    public_interest_score: Any = None
+    community_data: Optional[_CommunityData] = None
+    developer_data: Optional[_DeveloperData] = None
+
+
+_decode_coin_details = msgspec.json.Decoder(_CoinDetailsPayload).decode
+
 
 class CoinGeckoCollector(BaseCollector):
     """Collector for CoinGecko market data."""
@@ -26,25 +106,53 @@ class CoinGeckoCollector(BaseCollector):
         if settings.COINGECKO_API_KEY:
             self.headers["x-cg-pro-api-key"] = settings.COINGECKO_API_KEY
         
-        # Symbol to CoinGecko ID mapping
-        self.symbol_to_id = {
-            "BTCUSDT": "bitcoin",
-            "ETHUSDT": "ethereum",
-            "BNBUSDT": "binancecoin",
-            "ADAUSDT": "cardano",
-            "DOGEUSDT": "dogecoin",
-            "XRPUSDT": "ripple",
-            "DOTUSDT": "polkadot",
-            "UNIUSDT": "uniswap",
-            "LINKUSDT": "chainlink",
-            "LTCUSDT": "litecoin",
-            "SOLUSDT": "solana",
-            "MATICUSDT": "matic-network",
-            "AVAXUSDT": "avalanche-2",
-        }
+        self._http: Optional[httpx.AsyncClient] = None
+        
+        self.symbol_to_id = SYMBOL_TO_ID
+        self.id_to_symbol = ID_TO_SYMBOL
+        
+        # Scores and community data per coin ID, as (epoch time fetched, details)
+        self.coin_details: Dict[str, Tuple[float, dict]] = {}
         
         logger.info("CoinGecko client initialized")
     
+    def _client(self) -> httpx.AsyncClient:
+        """Shared keep-alive HTTP client, opened on first use and reopened after aclose()."""
+        if self._http is None or self._http.is_closed:
+            # Concurrent requests share one multiplexed HTTP/2 connection
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                http2=True,
+                timeout=30.0,
+                limits=httpx.Limits(
+                    max_connections=64,
+                    max_keepalive_connections=32,
+                    keepalive_expiry=60.0,
+                ),
+            )
+        return self._http
+    
+    async def _get(
+        self,
+        path: str,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None
+    ) -> httpx.Response:
+        """GET a CoinGecko endpoint with retries (see BaseCollector.http_get)."""
+        return await self.http_get(self._client(), "coingecko", path, params=params, headers=headers)
+    
+    async def aclose(self) -> None:
+        """Close the HTTP connection pool."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+    
+    async def stop_collection_loop(self) -> None:
+        """Stop data collection and the HTTP connection pool."""
+        await super().stop_collection_loop()
+        await self.aclose()
+    
     async def collect(self, db: AsyncSession, symbols: List[str]) -> int:
         """
         Collect market metrics from CoinGecko.
@@ -60,23 +168,18 @@ class CoinGeckoCollector(BaseCollector):
         
         try:
             # Get coin IDs for symbols
-            coin_ids = [self.symbol_to_id.get(s) for s in symbols if s in self.symbol_to_id]
+            coin_ids = list(dict.fromkeys(
+                self.symbol_to_id[s] for s in symbols if s in self.symbol_to_id
+            ))
             
             if not coin_ids:
                 logger.warning("No valid CoinGecko coin IDs found for symbols")
                 return 0
             
-            # Collect market data for each coin
-            for coin_id in coin_ids:
-                try:
-                    metrics = await self._collect_coin_metrics(db, coin_id)
-                    if metrics:
-                        total_records += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error collecting metrics for {coin_id}: {e}")
-                    continue
+            await self._refresh_coin_details(coin_ids)
+            collected = await self._collect_markets_batch(db, coin_ids)
             
+            total_records = len(collected)
             logger.info(f"CoinGecko collected {total_records} records")
             
         except Exception as e:
@@ -106,135 +209,274 @@ class CoinGeckoCollector(BaseCollector):
         logger.info("CoinGecko historical collection not implemented for free tier")
         return 0
     
-    async def _collect_coin_metrics(
+    async def _collect_markets_batch(
         self,
         db: AsyncSession,
-        coin_id: str
-    ) -> bool:
-        """Collect detailed metrics for a coin."""
-        await self.acquire_rate_limit("coingecko")
+        coin_ids: List[str]
+    ) -> List[dict]:
+        """
+        Store and cache market metrics for coins from /coins/markets.
+        
+        Market data comes in one request per MARKETS_PAGE_SIZE coins; scores
+        and community data are taken from the last _refresh_coin_details.
+        """
+        pages = [
+            coin_ids[i:i + MARKETS_PAGE_SIZE]
+            for i in range(0, len(coin_ids), MARKETS_PAGE_SIZE)
+        ]
+        results = await asyncio.gather(*(
+            self.fetch_once(f"markets:{','.join(page)}", "coingecko", self._fetch_markets, page)
+            for page in pages
+        ), return_exceptions=True)
+        
+        collected = []
+        now = datetime.utcnow()
+        for page, markets in zip(pages, results):
+            if isinstance(markets, BaseException):
+                logger.error(f"Error collecting CoinGecko markets for {len(page)} coins: {markets}")
+                continue
+            
+            for market in markets:
+                try:
+                    row = self._build_coin_metrics(market, now)
+                    if row:
+                        collected.append(row)
+                    
+                except Exception as e:
+                    logger.error(f"Error collecting CoinGecko market entry: {e}")
+                    continue
+        
+        if not collected:
+            return []
+        
+        await db.execute(MARKET_METRICS_INSERT, collected)
+        await db.commit()
+        
+        # Cache metrics
+        await cache.set_many({
+            f"market_metrics:{row['symbol']}": {
+                "symbol": row["symbol"],
+                "market_cap": row["market_cap"],
+                "market_cap_rank": row["market_cap_rank"],
+                "timestamp": now.isoformat(),
+            }
+            for row in collected
+        }, ttl=300)
+        
+        return collected
+    
+    async def _fetch_markets(self, coin_ids: List[str]) -> List[_MarketEntry]:
+        """Fetch market data for up to MARKETS_PAGE_SIZE coins in one request."""
+        try:
+            response = await self._get(
+                "/coins/markets",
+                params={
+                    "vs_currency": "usd",
+                    "ids": ",".join(coin_ids),
+                    "per_page": MARKETS_PAGE_SIZE,
+                    "sparkline": "false",
+                }
+            )
+            
+            if response.status_code != 200:
+                logger.error(f"CoinGecko markets API error: {response.status_code}")
+                return []
+            
+            return _decode_markets(response.content)
+            
+        except msgspec.DecodeError as e:
+            logger.error(f"Unexpected CoinGecko markets payload: {e}")
+            return []
+        except httpx.HTTPError as e:
+            logger.error(f"HTTP error collecting CoinGecko markets: {e}")
+            return []
+    
+    async def _refresh_coin_details(self, coin_ids: List[str]) -> None:
+        """
+        Refetch scores and community data for coins whose copy is too old.
+        
+        These come only from the heavyweight /coins/{id} endpoint, one
+        request per coin, so they are refreshed every
+        COINGECKO_DETAIL_REFRESH_SECONDS rather than every collection.
+        Copies are shared through Redis, so a restarted or second worker
+        reuses a fresh one instead of refetching it, and refreshes send
+        the stored ETag so an unchanged coin costs a 304.
+        """
+        now = time.time()
+        refresh = settings.COINGECKO_DETAIL_REFRESH_SECONDS
+        stale = [
+            coin_id for coin_id in coin_ids
+            if now - self.coin_details.get(coin_id, (0.0, None))[0] >= refresh
+        ]
+        if not stale:
+            return
+        
+        stored = await cache.get_many([f"coingecko_details:{coin_id}" for coin_id in stale])
+        to_fetch = []
+        for coin_id in stale:
+            entry = stored.get(f"coingecko_details:{coin_id}")
+            if entry and now - entry["ts"] < refresh:
+                self.coin_details[coin_id] = (entry["ts"], entry["details"])
+            else:
+                to_fetch.append((coin_id, entry))
+        if not to_fetch:
+            return
+        
+        results = await asyncio.gather(*(
+            self.fetch_once(
+                f"details:{coin_id}", "coingecko", self._fetch_coin_data,
+                coin_id, entry["etag"] if entry else None
+            )
+            for coin_id, entry in to_fetch
+        ), return_exceptions=True)
+        
+        updates = {}
+        for (coin_id, entry), response in zip(to_fetch, results):
+            if isinstance(response, BaseException):
+                logger.error(f"Error collecting details for {coin_id}: {response}")
+                continue
+            if response is None:
+                continue
+            
+            if response.status_code == 304 and entry:
+                details, etag = entry["details"], entry["etag"]
+            elif response.status_code == 200:
+                details = self._extract_coin_details(response.content)
+                etag = response.headers.get("etag")
+            else:
+                continue
+            if details is None:
+                continue
+            
+            self.coin_details[coin_id] = (now, details)
+            updates[f"coingecko_details:{coin_id}"] = {"details": details, "etag": etag, "ts": now}
         
+        await cache.set_many(updates, ttl=settings.COINGECKO_DETAIL_CACHE_TTL)
+    
+    async def _fetch_coin_data(self, coin_id: str, etag: Optional[str] = None) -> Optional[httpx.Response]:
+        """
+        Fetch detailed data for a coin.
+        
+        Returns:
+            The 200 response, a 304 if etag is still current, or None if
+            the request failed
+        """
         try:
-            async with httpx.AsyncClient() as client:
-                # Get coin data
-                response = await client.get(
-                    f"{self.base_url}/coins/{coin_id}",
-                    headers=self.headers,
-                    params={
-                        "localization": "false",
-                        "tickers": "false",
-                        "market_data": "true",
-                        "community_data": "true",
-                        "developer_data": "true",
-                    },
-                    timeout=30.0
-                )
-                
-                if response.status_code != 200:
-                    logger.error(f"CoinGecko API error: {response.status_code}")
-                    return False
-                
-                data = response.json()
-                
-                # Extract market data
-                market_data = data.get("market_data", {})
-                community_data = data.get("community_data", {})
-                developer_data = data.get("developer_data", {})
-                
-                # Find symbol for this coin
-                symbol = None
-                for sym, cid in self.symbol_to_id.items():
-                    if cid == coin_id:
-                        symbol = sym
-                        break
-                
-                if not symbol:
-                    logger.warning(f"No symbol found for coin_id {coin_id}")
-                    return False
-                
-                # Create metrics record
-                metrics = MarketMetrics(
-                    symbol=symbol,
-                    timestamp=datetime.utcnow(),
-                    market_cap=market_data.get("market_cap", {}).get("usd"),
-                    market_cap_rank=data.get("market_cap_rank"),
-                    fully_diluted_valuation=market_data.get("fully_diluted_valuation", {}).get("usd"),
-                    circulating_supply=market_data.get("circulating_supply"),
-                    total_supply=market_data.get("total_supply"),
-                    max_supply=market_data.get("max_supply"),
-                    developer_score=data.get("developer_score"),
-                    community_score=data.get("community_score"),
-                    liquidity_score=data.get("liquidity_score"),
-                    public_interest_score=data.get("public_interest_score"),
-                    metadata={
-                        "ath": market_data.get("ath", {}).get("usd"),
-                        "ath_date": market_data.get("ath_date", {}).get("usd"),
-                        "atl": market_data.get("atl", {}).get("usd"),
-                        "atl_date": market_data.get("atl_date", {}).get("usd"),
-                        "twitter_followers": community_data.get("twitter_followers"),
-                        "reddit_subscribers": community_data.get("reddit_subscribers"),
-                        "github_stars": developer_data.get("stars"),
-                        "github_forks": developer_data.get("forks"),
-                    }
-                )
-                
-                db.add(metrics)
-                await db.commit()
-                
-                # Cache metrics
-                cache_key = f"market_metrics:{symbol}"
-                await cache.set(cache_key, {
-                    "symbol": symbol,
-                    "market_cap": metrics.market_cap,
-                    "market_cap_rank": metrics.market_cap_rank,
-                    "timestamp": datetime.utcnow().isoformat(),
-                }, ttl=300)
-                
-                logger.info(f"Collected CoinGecko metrics for {symbol}")
-                return True
-                
+            response = await self._get(
+                f"/coins/{coin_id}",
+                params={
+                    "localization": "false",
+                    "tickers": "false",
+                    "market_data": "false",
+                    "community_data": "true",
+                    "developer_data": "true",
+                },
+                headers={"If-None-Match": etag} if etag else None
+            )
+            
+            if response.status_code not in (200, 304):
+                logger.error(f"CoinGecko API error: {response.status_code}")
+                return None
+            
+            return response
+            
         except httpx.HTTPError as e:
             logger.error(f"HTTP error collecting CoinGecko data for {coin_id}: {e}")
-            return False
-        except Exception as e:
-            logger.error(f"Error collecting CoinGecko data for {coin_id}: {e}")
-            return False
+            return None
+    
+    def _extract_coin_details(self, body: bytes) -> Optional[dict]:
+        """
+        Pick the scores and community data kept from a /coins/{id} body.
+        
+        Args:
+            body: Raw JSON response body
+        
+        Returns:
+            Coin details, or None if the body is not a coin object
+        """
+        try:
+            data = _decode_coin_details(body)
+        except msgspec.DecodeError as e:
+            logger.error(f"Unexpected CoinGecko coin payload: {e}")
+            return None
+        
+        community_data = data.community_data or _CommunityData()
+        developer_data = data.developer_data or _DeveloperData()
+        return {
+            "developer_score": data.developer_score,
+            "community_score": data.community_score,
+            "liquidity_score": data.liquidity_score,
+            "public_interest_score": data.public_interest_score,
+            "metadata": {
+                "twitter_followers": community_data.twitter_followers,
+                "reddit_subscribers": community_data.reddit_subscribers,
+                "github_stars": developer_data.stars,
+                "github_forks": developer_data.forks,
+            },
+        }
+    
+    def _build_coin_metrics(self, market: _MarketEntry, timestamp: datetime) -> Optional[dict]:
+        """Build a market_metrics row from a /coins/markets entry and the coin's details."""
+        coin_id = market.id
+        symbol = self.id_to_symbol.get(coin_id)
+        if not symbol:
+            logger.warning(f"No symbol found for coin_id {coin_id}")
+            return None
+        
+        details = self.coin_details.get(coin_id, (None, {}))[1]
+        
+        return {
+            "symbol": symbol,
+            "timestamp": timestamp,
+            "market_cap": market.market_cap,
+            "market_cap_rank": market.market_cap_rank,
+            "fully_diluted_valuation": market.fully_diluted_valuation,
+            "circulating_supply": market.circulating_supply,
+            "total_supply": market.total_supply,
+            "max_supply": market.max_supply,
+            "developer_score": details.get("developer_score"),
+            "community_score": details.get("community_score"),
+            "liquidity_score": details.get("liquidity_score"),
+            "public_interest_score": details.get("public_interest_score"),
+            "ath": market.ath,
+            "atl": market.atl,
+            "market_metadata": {
+                "ath_date": market.ath_date,
+                "atl_date": market.atl_date,
+                **details.get("metadata", {}),
+            },
+        }
     
     async def get_trending_coins(self) -> List[Dict]:
         """Get trending coins from CoinGecko."""
         await self.acquire_rate_limit("coingecko")
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/search/trending",
-                    headers=self.headers,
-                    timeout=30.0
-                )
-                
-                if response.status_code != 200:
-                    logger.error(f"CoinGecko trending API error: {response.status_code}")
-                    return []
-                
-                data = response.json()
-                coins = data.get("coins", [])
-                
-                trending = []
-                for item in coins:
-                    coin = item.get("item", {})
-                    trending.append({
-                        "id": coin.get("id"),
-                        "name": coin.get("name"),
-                        "symbol": coin.get("symbol"),
-                        "market_cap_rank": coin.get("market_cap_rank"),
-                        "price_btc": coin.get("price_btc"),
-                    })
-                
-                # Cache trending
-                await cache.set("trending_coins", trending, ttl=3600)
-                
-                return trending
-                
+            response = await self._get("/search/trending")
+            
+            if response.status_code != 200:
+                logger.error(f"CoinGecko trending API error: {response.status_code}")
+                return []
+            
+            data = orjson.loads(response.content)
+            coins = data.get("coins", [])
+            
+            trending = []
+            for item in coins:
+                coin = item.get("item", {})
+                trending.append({
+                    "id": coin.get("id"),
+                    "name": coin.get("name"),
+                    "symbol": coin.get("symbol"),
+                    "market_cap_rank": coin.get("market_cap_rank"),
+                    "price_btc": coin.get("price_btc"),
+                })
+            
+            # Cache trending
+            await cache.set("trending_coins", trending, ttl=3600)
+            
+            return trending
+            
         except Exception as e:
             logger.error(f"Error getting trending coins: {e}")
             return []
@@ -244,34 +486,29 @@ class CoinGeckoCollector(BaseCollector):
         await self.acquire_rate_limit("coingecko")
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/global",
-                    headers=self.headers,
-                    timeout=30.0
-                )
-                
-                if response.status_code != 200:
-                    logger.error(f"CoinGecko global API error: {response.status_code}")
-                    return {}
-                
-                data = response.json()
-                global_data = data.get("data", {})
-                
-                result = {
-                    "total_market_cap": global_data.get("total_market_cap", {}).get("usd"),
-                    "total_volume": global_data.get("total_volume", {}).get("usd"),
-                    "market_cap_percentage": global_data.get("market_cap_percentage", {}),
-                    "active_cryptocurrencies": global_data.get("active_cryptocurrencies"),
-                    "markets": global_data.get("markets"),
-                    "market_cap_change_percentage_24h": global_data.get("market_cap_change_percentage_24h_usd"),
-                }
-                
-                # Cache global data
-                await cache.set("global_market_data", result, ttl=300)
-                
-                return result
-                
+            response = await self._get("/global")
+            
+            if response.status_code != 200:
+                logger.error(f"CoinGecko global API error: {response.status_code}")
+                return {}
+            
+            data = orjson.loads(response.content)
+            global_data = data.get("data", {})
+            
+            result = {
+                "total_market_cap": global_data.get("total_market_cap", {}).get("usd"),
+                "total_volume": global_data.get("total_volume", {}).get("usd"),
+                "market_cap_percentage": global_data.get("market_cap_percentage", {}),
+                "active_cryptocurrencies": global_data.get("active_cryptocurrencies"),
+                "markets": global_data.get("markets"),
+                "market_cap_change_percentage_24h": global_data.get("market_cap_change_percentage_24h_usd"),
+            }
+            
+            # Cache global data
+            await cache.set("global_market_data", result, ttl=300)
+            
+            return result
+            
         except Exception as e:
             logger.error(f"Error getting global market data: {e}")
             return {}
\ No newline at end of file
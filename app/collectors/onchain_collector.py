@@ -1,7 +1,11 @@
+import asyncio
 import logging
 from datetime import datetime
+from types import MappingProxyType
 from typing import List, Optional
 import httpx
+import orjson
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.collectors.base import BaseCollector
@@ -12,6 +16,27 @@ from app.cache.redis_cache import cache
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Built once and executed with a list of row dicts, like BinanceCollector's
+# TICKER_INSERT: one executemany with no ORM unit of work or RETURNING.
+# Overlapping runs may store the same snapshot; the duplicate is skipped
+# instead of failing the batch.
+ONCHAIN_METRICS_INSERT = insert(OnChainMetrics).on_conflict_do_nothing(
+    index_elements=["symbol", "timestamp"]
+)
+
+# Symbol to blockchain mapping. Read-only and shared by all instances.
+SYMBOL_TO_BLOCKCHAIN = MappingProxyType({
+    "BTCUSDT": "bitcoin",
+    "ETHUSDT": "ethereum",
+    "BNBUSDT": "binance-smart-chain",
+    "ADAUSDT": "cardano",
+    "DOGEUSDT": "dogecoin",
+    "DOTUSDT": "polkadot",
+    "SOLUSDT": "solana",
+    "MATICUSDT": "polygon",
+    "AVAXUSDT": "avalanche",
+})
+
 
 class OnChainCollector(BaseCollector):
     """
@@ -29,21 +54,34 @@ class OnChainCollector(BaseCollector):
     def __init__(self):
         super().__init__("OnChainCollector")
         
-        # Symbol to blockchain mapping
-        self.symbol_to_blockchain = {
-            "BTCUSDT": "bitcoin",
-            "ETHUSDT": "ethereum",
-            "BNBUSDT": "binance-smart-chain",
-            "ADAUSDT": "cardano",
-            "DOGEUSDT": "dogecoin",
-            "DOTUSDT": "polkadot",
-            "SOLUSDT": "solana",
-            "MATICUSDT": "polygon",
-            "AVAXUSDT": "avalanche",
-        }
+        self.symbol_to_blockchain = SYMBOL_TO_BLOCKCHAIN
+        
+        self._http: Optional[httpx.AsyncClient] = None
         
         logger.info("OnChain collector initialized")
     
+    def _client(self) -> httpx.AsyncClient:
+        """Shared keep-alive client for blockchain.info, opened on first use and reopened after aclose()."""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                base_url="https://blockchain.info",
+                http2=True,
+                timeout=30.0,
+                limits=httpx.Limits(keepalive_expiry=60.0),
+            )
+        return self._http
+    
+    async def aclose(self) -> None:
+        """Close the HTTP connection pool."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+    
+    async def stop_collection_loop(self) -> None:
+        """Stop data collection and the HTTP connection pool."""
+        await super().stop_collection_loop()
+        await self.aclose()
+    
     async def collect(self, db: AsyncSession, symbols: List[str]) -> int:
         """
         Collect on-chain metrics.
@@ -58,22 +96,47 @@ class OnChainCollector(BaseCollector):
         total_records = 0
         
         try:
-            for symbol in symbols:
-                blockchain = self.symbol_to_blockchain.get(symbol)
-                if not blockchain:
+            pairs = [
+                (symbol, self.symbol_to_blockchain[symbol])
+                for symbol in symbols
+                if symbol in self.symbol_to_blockchain
+            ]
+            
+            # Requests run concurrently under fetch's semaphore and the
+            # onchain rate limit; rows are written by this task alone since
+            # the session is not safe for concurrent use
+            results = await asyncio.gather(*(
+                self.fetch_once(blockchain, "onchain", self._get_blockchain_metrics, blockchain)
+                for _, blockchain in pairs
+            ), return_exceptions=True)
+            
+            collected = []
+            now = datetime.utcnow()
+            for (symbol, blockchain), metrics_data in zip(pairs, results):
+                if isinstance(metrics_data, BaseException):
+                    logger.error(f"Error collecting on-chain metrics for {symbol}: {metrics_data}")
                     continue
                 
-                try:
-                    metrics = await self._collect_blockchain_metrics(
-                        db, symbol, blockchain
-                    )
-                    if metrics:
-                        total_records += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error collecting on-chain metrics for {symbol}: {e}")
-                    continue
+                if metrics_data:
+                    collected.append(self._build_onchain_metrics(symbol, blockchain, metrics_data, now))
             
+            if collected:
+                await db.execute(ONCHAIN_METRICS_INSERT, collected)
+                await db.commit()
+                
+                # Cache metrics
+                await cache.set_many({
+                    f"onchain_metrics:{row['symbol']}": {
+                        "symbol": row["symbol"],
+                        "blockchain": row["blockchain"],
+                        "active_addresses": row["active_addresses"],
+                        "transaction_count": row["transaction_count"],
+                        "timestamp": now.isoformat(),
+                    }
+                    for row in collected
+                }, ttl=600)
+            
+            total_records = len(collected)
             logger.info(f"OnChain collected {total_records} records")
             
         except Exception as e:
@@ -102,72 +165,49 @@ class OnChainCollector(BaseCollector):
         logger.info("OnChain historical collection not implemented in this demo")
         return 0
     
-    async def _collect_blockchain_metrics(
-        self,
-        db: AsyncSession,
-        symbol: str,
-        blockchain: str
-    ) -> bool:
+    async def _get_blockchain_metrics(self, blockchain: str) -> Optional[dict]:
         """
-        Collect metrics for a specific blockchain.
+        Get metrics for a specific blockchain.
         
         This is a placeholder that demonstrates the structure.
         In production, you would make actual API calls to blockchain data providers.
         """
-        await self.acquire_rate_limit("onchain")
-        
-        try:
-            # Example: Collect Bitcoin on-chain data
-            if blockchain == "bitcoin":
-                metrics_data = await self._get_bitcoin_metrics()
-            # Example: Collect Ethereum on-chain data
-            elif blockchain == "ethereum":
-                metrics_data = await self._get_ethereum_metrics()
-            else:
-                # For other blockchains, return placeholder data
-                # In production, implement actual data collection
-                metrics_data = self._get_placeholder_metrics()
-            
-            if not metrics_data:
-                return False
-            
-            # Create on-chain metrics record
-            metrics = OnChainMetrics(
-                symbol=symbol,
-                blockchain=blockchain,
-                timestamp=datetime.utcnow(),
-                active_addresses=metrics_data.get("active_addresses"),
-                transaction_count=metrics_data.get("transaction_count"),
-                transaction_volume=metrics_data.get("transaction_volume"),
-                average_transaction_value=metrics_data.get("average_transaction_value"),
-                hash_rate=metrics_data.get("hash_rate"),
-                difficulty=metrics_data.get("difficulty"),
-                block_height=metrics_data.get("block_height"),
-                fees_total=metrics_data.get("fees_total"),
-                fees_mean=metrics_data.get("fees_mean"),
-                fees_median=metrics_data.get("fees_median"),
-                metadata=metrics_data.get("metadata", {}),
-            )
-            
-            db.add(metrics)
-            await db.commit()
-            
-            # Cache metrics
-            cache_key = f"onchain_metrics:{symbol}"
-            await cache.set(cache_key, {
-                "symbol": symbol,
-                "blockchain": blockchain,
-                "active_addresses": metrics.active_addresses,
-                "transaction_count": metrics.transaction_count,
-                "timestamp": datetime.utcnow().isoformat(),
-            }, ttl=600)
-            
-            logger.info(f"Collected on-chain metrics for {symbol}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error collecting blockchain metrics for {symbol}: {e}")
-            return False
+        # Example: Collect Bitcoin on-chain data
+        if blockchain == "bitcoin":
+            return await self._get_bitcoin_metrics()
+        # Example: Collect Ethereum on-chain data
+        if blockchain == "ethereum":
+            return await self._get_ethereum_metrics()
+        # For other blockchains, return placeholder data
+        # In production, implement actual data collection
+        return self._get_placeholder_metrics()
+    
+    def _build_onchain_metrics(
+        self,
+        symbol: str,
+        blockchain: str,
+        metrics_data: dict,
+        timestamp: datetime
+    ) -> dict:
+        """Build an onchain_metrics row."""
+        return {
+            "symbol": symbol,
+            "blockchain": blockchain,
+            "timestamp": timestamp,
+            "active_addresses": metrics_data.get("active_addresses"),
+            "transaction_count": metrics_data.get("transaction_count"),
+            "transaction_volume": metrics_data.get("transaction_volume"),
+            "average_transaction_value": metrics_data.get("average_transaction_value"),
+            "hash_rate": metrics_data.get("hash_rate"),
+            "difficulty": metrics_data.get("difficulty"),
+            "block_height": metrics_data.get("block_height"),
+            "fees_total": metrics_data.get("fees_total"),
+            "fees_mean": metrics_data.get("fees_mean"),
+            "fees_median": metrics_data.get("fees_median"),
+            "market_price_usd": metrics_data.get("market_price_usd"),
+            "miners_revenue_usd": metrics_data.get("miners_revenue_usd"),
+            "chain_metadata": metrics_data.get("metadata", {}),
+        }
     
     async def _get_bitcoin_metrics(self) -> Optional[dict]:
         """
@@ -180,37 +220,32 @@ class OnChainCollector(BaseCollector):
         """
         try:
             # Example: Using blockchain.com stats API (free, no key required)
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    "https://blockchain.info/stats",
-                    params={"format": "json"},
-                    timeout=30.0
-                )
-                
-                if response.status_code != 200:
-                    logger.warning(f"Bitcoin API returned status {response.status_code}")
-                    return self._get_placeholder_metrics()
-                
-                data = response.json()
-                
-                return {
-                    "active_addresses": None,  # Not provided by this API
-                    "transaction_count": data.get("n_tx"),
-                    "transaction_volume": data.get("total_btc_sent"),
-                    "average_transaction_value": None,
-                    "hash_rate": data.get("hash_rate"),
-                    "difficulty": data.get("difficulty"),
-                    "block_height": data.get("n_blocks_total"),
-                    "fees_total": None,
-                    "fees_mean": None,
-                    "fees_median": None,
-                    "metadata": {
-                        "total_btc": data.get("totalbc"),
-                        "market_price_usd": data.get("market_price_usd"),
-                        "miners_revenue_usd": data.get("miners_revenue_usd"),
-                    }
+            response = await self.http_get(self._client(), "onchain", "/stats", params={"format": "json"})
+            
+            if response.status_code != 200:
+                logger.warning(f"Bitcoin API returned status {response.status_code}")
+                return self._get_placeholder_metrics()
+            
+            data = orjson.loads(response.content)
+            
+            return {
+                "active_addresses": None,  # Not provided by this API
+                "transaction_count": data.get("n_tx"),
+                "transaction_volume": data.get("total_btc_sent"),
+                "average_transaction_value": None,
+                "hash_rate": data.get("hash_rate"),
+                "difficulty": data.get("difficulty"),
+                "block_height": data.get("n_blocks_total"),
+                "fees_total": None,
+                "fees_mean": None,
+                "fees_median": None,
+                "market_price_usd": data.get("market_price_usd"),
+                "miners_revenue_usd": data.get("miners_revenue_usd"),
+                "metadata": {
+                    "total_btc": data.get("totalbc"),
                 }
-                
+            }
+            
         except Exception as e:
             logger.error(f"Error fetching Bitcoin metrics: {e}")
             return self._get_placeholder_metrics()
@@ -1,6 +1,7 @@
+import os
 from pydantic_settings import BaseSettings
 from typing import Optional, List
-from functools import lru_cache
+from functools import cached_property, lru_cache
 
 
 class Settings(BaseSettings):
@@ -23,21 +24,49 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str = "localhost"
     POSTGRES_PORT: int = 5432
     POSTGRES_DB: str = "crypto_data"
+    DB_STATEMENT_CACHE_SIZE: int = 500  # prepared statements cached per connection
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 40
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a pooled connection
+    DB_POOL_RECYCLE: int = 3600
+    DB_POOL_PRE_PING: bool = False  # SELECT 1 per checkout, for proxies that drop idle connections
+    PARTITION_MONTHS_AHEAD: int = 3
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS: int = 86400  # daily
+    SYMBOLS_VIEW_REFRESH_SECONDS: int = 300  # 5 minutes
+    SUMMARY_REFRESH_SECONDS: int = 30  # precomputed analytics summaries
+    SUMMARY_PRECOMPUTE_HOURS: int = 24
     
     # Redis
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: Optional[str] = None
     REDIS_DB: int = 0
+    REDIS_POOL_SIZE: int = min(2 * (os.cpu_count() or 1), 16)  # Redis is single-threaded
+    REDIS_POOL_TIMEOUT: float = 5.0  # seconds to wait for a free pooled connection
+    REDIS_SOCKET_TIMEOUT: float = 2.0
     REDIS_CACHE_TTL: int = 300  # 5 minutes
+    CACHE_NEGATIVE_TTL: int = 10  # seconds to remember a 404
+    CACHE_STALE_TTL: int = 300  # seconds an expired API body may still be served while refreshing
+    CACHE_LOCK_TTL: int = 5  # seconds a cache-fill lock is held at most
+    CACHE_COMPRESS_MIN_BYTES: int = 1024  # cached values from this size are zlib-compressed
+    CACHE_COMPRESS_LEVEL: int = 1
+    CACHE_OFFLOAD_MIN_BYTES: int = 131072  # bodies from this size are compressed off the event loop
+    CACHE_SERIALIZER: str = "msgpack"  # or "json" for values readable by other Redis clients
+    CACHE_LOCAL_MAXSIZE: int = 10000  # values kept in each process in front of Redis
+    CACHE_LOCAL_TTL: float = 1.0  # seconds a local copy is served; 0 disables the local tier
     
     # Binance API
     BINANCE_API_KEY: Optional[str] = None
     BINANCE_API_SECRET: Optional[str] = None
     BINANCE_TESTNET: bool = False
+    BINANCE_STREAM_ENABLED: bool = True  # stream tickers, depth and trades over WebSocket
+    BINANCE_STREAM_FLUSH_SECONDS: float = 0.5  # how often streamed updates reach the cache
     
     # CoinGecko API
     COINGECKO_API_KEY: Optional[str] = None
+    COINGECKO_RATE_LIMIT_PER_MINUTE: int = 30  # free tier; 500 for Pro keys
+    COINGECKO_DETAIL_REFRESH_SECONDS: int = 3600  # how often scores and community data are refetched
+    COINGECKO_DETAIL_CACHE_TTL: int = 86400  # how long a copy and its ETag are kept in Redis
     
     # Crypto Symbols to Track
     SYMBOLS: str = "BTCUSDT,ETHUSDT,BNBUSDT,ADAUSDT,SOLUSDT"
@@ -47,10 +76,16 @@ class Settings(BaseSettings):
     HISTORICAL_DAYS: int = 365
     MAX_RETRIES: int = 3
     RETRY_DELAY_SECONDS: int = 5
+    COLLECTOR_CONCURRENCY: int = 10  # exchange API requests in flight per collector
+    
+    # API access keys accepted by verify_api_key (comma-separated)
+    API_KEYS: str = ""
     
     # WebSocket
     WS_HEARTBEAT_INTERVAL: int = 30
     WS_MAX_CONNECTIONS: int = 1000
+    WS_SEND_TIMEOUT: float = 5.0
+    WS_QUEUE_SIZE: int = 16  # pending messages per client before dropping the oldest
     
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 100
@@ -58,16 +93,22 @@ class Settings(BaseSettings):
     # Monitoring
     ENABLE_METRICS: bool = True
     METRICS_PORT: int = 9090
+    HEALTH_CACHE_TTL: float = 2.0  # seconds a /health result is reused across probes
     
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "json"
     
-    @property
+    @cached_property
     def symbols_list(self) -> List[str]:
-        """Get list of symbols from comma-separated string."""
+        """Get list of symbols from comma-separated string, parsed once."""
         return [s.strip().upper() for s in self.SYMBOLS.split(",") if s.strip()]
     
+    @cached_property
+    def api_keys_list(self) -> List[str]:
+        """Get list of accepted API keys, parsed once."""
+        return [k.strip() for k in self.API_KEYS.split(",") if k.strip()]
+    
     @property
     def database_url(self) -> str:
         """Construct database URL."""
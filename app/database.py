@@ -1,7 +1,10 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import declarative_base
-from sqlalchemy.pool import NullPool
-from typing import AsyncGenerator
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import QueuePool
+from sqlalchemy import text
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List, Sequence, Tuple, cast
+from datetime import date, datetime, timedelta
+import asyncio
 import logging
 
 from app.config import get_settings
@@ -9,15 +12,36 @@ from app.config import get_settings
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# pool_pre_ping is off by default: it costs a SELECT 1 round trip per
+# checkout. Connections are replaced after pool_recycle, and one found
+# dead fails its operation and invalidates the pool, so later checkouts
+# reconnect; collectors take a fresh session per collection and retry a
+# failed one. Enable it where a proxy or load balancer silently drops
+# idle connections. LIFO keeps reusing the few most recent connections
+# under light load.
+pool_options = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    "pool_use_lifo": True,
+}
+
 # Create async engine
 engine = create_async_engine(
     settings.database_url,
     echo=settings.DEBUG,
-    pool_pre_ping=True,
-    pool_size=20,
-    max_overflow=40,
-    pool_recycle=3600,
-    poolclass=NullPool if settings.ENVIRONMENT == "test" else None,
+    **pool_options,
+    connect_args={
+        # SQLAlchemy's asyncpg prepared statement cache and asyncpg's own
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        # asyncpg otherwise re-prepares statements idle for 5 minutes (e.g.
+        # COPY's type introspection between slow collection cycles); the
+        # cache is already bounded by size
+        "max_cached_statement_lifetime": 0,
+    },
 )
 
 # Create session factory
@@ -29,8 +53,10 @@ async_session_factory = async_sessionmaker(
     autoflush=False,
 )
 
+
 # Base class for models
-Base = declarative_base()
+class Base(DeclarativeBase):
+    pass
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -52,14 +78,147 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def bulk_upsert(
+    db: AsyncSession,
+    table: str,
+    columns: Sequence[str],
+    records: Sequence[Tuple[Any, ...]]
+) -> int:
+    """
+    Bulk load rows with COPY through the table's UNLOGGED staging table.
+    
+    Records are streamed into ``<table>_staging`` on the session's own
+    connection and merged by ``flush_<table>_staging()``, all inside the
+    session's transaction. Values bypass ORM type conversion, so they must
+    already be in column representation (e.g. scaled ``*_e8`` integers).
+    
+    Args:
+        db: Database session
+        table: Target table name (must have a staging table)
+        columns: Staging column names, in record order
+        records: Row tuples to load
+        
+    Returns:
+        Number of rows inserted or updated
+    """
+    if not records:
+        return 0
+    
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = raw_connection.driver_connection
+    if driver_connection is None:
+        raise RuntimeError(f"No asyncpg connection to COPY {table} rows into")
+    await driver_connection.copy_records_to_table(
+        f"{table}_staging",
+        records=records,
+        columns=columns,
+    )
+    
+    result = await db.execute(text(f"SELECT flush_{table}_staging()"))
+    return result.scalar() or 0
+
+
 async def init_db() -> None:
     """Initialize database tables."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    await maintain_partitions()
     logger.info("Database initialized")
 
 
+def _month_bounds(first: date, last: date) -> List[Tuple[date, date]]:
+    """Get [lower, upper) bounds of every calendar month from first to last."""
+    bounds = []
+    current = first.replace(day=1)
+    while current <= last:
+        upper = date(current.year + current.month // 12, current.month % 12 + 1, 1)
+        bounds.append((current, upper))
+        current = upper
+    return bounds
+
+
+async def maintain_partitions() -> None:
+    """
+    Create monthly partitions for all RANGE-partitioned tables.
+    
+    Covers the historical backfill window up to PARTITION_MONTHS_AHEAD months
+    in the future. Existing partitions are left alone; a month whose rows have
+    already landed in the DEFAULT partition cannot be split out and is skipped.
+    """
+    today = datetime.utcnow().date()
+    first = today - timedelta(days=settings.HISTORICAL_DAYS)
+    last = today + timedelta(days=31 * settings.PARTITION_MONTHS_AHEAD)
+    
+    declared = [
+        table.name for table in Base.metadata.sorted_tables
+        if table.dialect_options["postgresql"].get("partition_by")
+    ]
+    
+    async with engine.begin() as conn:
+        # Skip tables that are not natively partitioned in this database,
+        # e.g. after migration 009 turned them into TimescaleDB hypertables
+        result = await conn.execute(text(
+            "SELECT relname FROM pg_class WHERE relkind = 'p' AND relname = ANY(:names)"
+        ), {"names": declared})
+        partitioned = {row[0] for row in result}
+        tables = [table for table in declared if table in partitioned]
+        
+        for table in tables:
+            for lower, upper in _month_bounds(first, last):
+                partition = f"{table}_p{lower:%Y_%m}"
+                try:
+                    async with conn.begin_nested():
+                        await conn.execute(text(
+                            f"CREATE TABLE IF NOT EXISTS {partition} PARTITION OF {table} "
+                            f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+                        ))
+                except Exception as e:
+                    logger.warning(f"Could not create partition {partition}: {e}")
+    
+    logger.info(f"Partitions ensured for {len(tables)} tables through {last:%Y-%m}")
+
+
+async def refresh_symbols_view() -> None:
+    """Refresh the symbols_mv materialized view without blocking readers."""
+    async with engine.begin() as conn:
+        await conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY symbols_mv"))
+
+
+async def run_periodically(job: Callable[[], Awaitable[None]], interval_seconds: int) -> None:
+    """
+    Run a database maintenance job every interval_seconds until cancelled.
+    
+    Args:
+        job: Coroutine function to run
+        interval_seconds: Delay between runs
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await job()
+        except Exception as e:
+            logger.error(f"Database maintenance job {job.__name__} failed: {e}")
+
+
 async def close_db() -> None:
     """Close database connections."""
     await engine.dispose()
-    logger.info("Database connections closed")
\ No newline at end of file
+    logger.info("Database connections closed")
+
+
+def pool_status() -> Dict[str, int]:
+    """
+    Connection pool utilization, read from the pool's counters.
+    
+    Returns:
+        Configured size, connections checked out and overflow connections
+        open. The engine is always built with pool_options, so its pool is
+        a QueuePool in every environment.
+    """
+    pool = cast(QueuePool, engine.pool)
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+    }
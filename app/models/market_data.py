@@ -1,36 +1,199 @@
 # See artifact: crypto_models
-from sqlalchemy import Column, String, Float, DateTime, Integer, Index, BigInteger, Boolean, Text
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import String, Float, DateTime, Integer, Index, BigInteger, Boolean, Text, DDL, case, event, text
+from sqlalchemy.orm import Mapped, column_property, mapped_column
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.sql import table, column
+from sqlalchemy.dialects.postgresql import JSONB, ARRAY, DOUBLE_PRECISION
 from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
 from app.database import Base
 
 
+E8_SCALE = 10 ** 8
+
+# Audit timestamps are filled in by PostgreSQL, as naive UTC like the rest of
+# the schema, rather than by a datetime.utcnow() call per inserted row
+UTC_NOW = text("timezone('utc', now())")
+
+
+def to_e8(value) -> Optional[int]:
+    """Scale a price to the int64 representation used by FixedPoint8 columns."""
+    if value is None:
+        return None
+    return int((Decimal(str(value)) * E8_SCALE).to_integral_value())
+
+
+class FixedPoint8(TypeDecorator):
+    """
+    Float stored as a BIGINT scaled by 1e8 (satoshi-style fixed point).
+    
+    Half the width of NUMERIC(20, 8) and exact to 8 decimals. Values must stay
+    below ~9.2e10, so it is only used for prices and quote amounts, not for
+    base-asset volumes which can exceed that for low-priced coins. Note that
+    SQL aggregates such as func.avg() come back in raw scaled units.
+    """
+    
+    impl = BigInteger
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect) -> Optional[int]:
+        return to_e8(value)
+    
+    def process_result_value(self, value, dialect) -> Optional[float]:
+        if value is None:
+            return None
+        return int(value) / E8_SCALE
+
+
+# Time-series tables are RANGE partitioned by month on timestamp. Postgres
+# requires the partition key in every unique constraint, so timestamp is part
+# of the primary key. Monthly partitions are created by the migrations and by
+# app.database.maintain_partitions; the DEFAULT partition catches anything
+# outside the provisioned range (and is all a bare create_all gives you).
+#
+# Reads filter on symbol and order by timestamp DESC, so each table has a single
+# (symbol, timestamp DESC) composite instead of separate symbol/timestamp
+# indexes, with the columns the API returns most often INCLUDEd. Pure time-range
+# scans on the largest tables (ohlcv, trades) use a BRIN index on timestamp,
+# which stays tiny because rows arrive in time order.
+PARTITION_BY_TIMESTAMP = {"postgresql_partition_by": "RANGE (timestamp)"}
+
+_default_partition = DDL("CREATE TABLE %(table)s_default PARTITION OF %(table)s DEFAULT")
+
+# Bulk ingest goes through UNLOGGED <table>_staging tables: collectors COPY rows
+# in and flush_<table>_staging() moves them into the real table with a single
+# INSERT ... ON CONFLICT (see app.database.bulk_upsert). Rows are removed with
+# DELETE ... RETURNING rather than TRUNCATE so concurrent loaders never lose
+# each other's rows.
+_staging_table = [
+    DDL("CREATE UNLOGGED TABLE %(table)s_staging (LIKE %(table)s)"),
+    DDL("ALTER TABLE %(table)s_staging DROP COLUMN id"),
+]
+_drop_staging = [
+    DDL("DROP TABLE IF EXISTS %(table)s_staging"),
+    DDL("DROP FUNCTION IF EXISTS flush_%(table)s_staging()"),
+    DDL("DROP FUNCTION IF EXISTS upsert_%(table)s_batch(jsonb)"),
+]
+
+# One-round-trip alternative for clients that cannot COPY: pass a JSON array
+# of rows keyed by staging column names (open_e8, price_e8, ...) and they go
+# through the same flush as COPY-loaded rows.
+_upsert_batch = DDL("""
+CREATE OR REPLACE FUNCTION upsert_%(table)s_batch(rows jsonb) RETURNS integer AS $$
+BEGIN
+    INSERT INTO %(table)s_staging
+    SELECT * FROM jsonb_populate_recordset(NULL::%(table)s_staging, rows);
+    RETURN flush_%(table)s_staging();
+END;
+$$ LANGUAGE plpgsql
+""")
+
+_flush_ohlcv_staging = DDL("""
+CREATE OR REPLACE FUNCTION flush_ohlcv_staging() RETURNS integer AS $$
+DECLARE
+    merged integer;
+BEGIN
+    WITH moved AS (
+        DELETE FROM ohlcv_staging RETURNING *
+    )
+    INSERT INTO ohlcv (
+        symbol, exchange, timeframe, timestamp, open_e8, high_e8, low_e8, close_e8,
+        volume, quote_volume, trades_count, created_at, updated_at
+    )
+    SELECT DISTINCT ON (symbol, timeframe, timestamp)
+        symbol, exchange, timeframe, timestamp, open_e8, high_e8, low_e8, close_e8,
+        volume, quote_volume, trades_count, created_at, created_at
+    FROM moved
+    ORDER BY symbol, timeframe, timestamp, created_at DESC
+    ON CONFLICT (symbol, timeframe, timestamp) DO UPDATE SET
+        open_e8 = EXCLUDED.open_e8,
+        high_e8 = EXCLUDED.high_e8,
+        low_e8 = EXCLUDED.low_e8,
+        close_e8 = EXCLUDED.close_e8,
+        volume = EXCLUDED.volume,
+        quote_volume = EXCLUDED.quote_volume,
+        trades_count = EXCLUDED.trades_count,
+        updated_at = EXCLUDED.updated_at;
+    GET DIAGNOSTICS merged = ROW_COUNT;
+    RETURN merged;
+END;
+$$ LANGUAGE plpgsql
+""")
+
+_flush_trades_staging = DDL("""
+CREATE OR REPLACE FUNCTION flush_trades_staging() RETURNS integer AS $$
+DECLARE
+    merged integer;
+BEGIN
+    WITH moved AS (
+        DELETE FROM trades_staging RETURNING *
+    )
+    INSERT INTO trades (
+        symbol, exchange, trade_id, timestamp, price_e8, volume, quote_volume_e8,
+        is_buyer_maker, created_at
+    )
+    SELECT
+        symbol, exchange, trade_id, timestamp, price_e8, volume, quote_volume_e8,
+        is_buyer_maker, created_at
+    FROM moved
+    ON CONFLICT (exchange, trade_id, timestamp) DO NOTHING;
+    GET DIAGNOSTICS merged = ROW_COUNT;
+    RETURN merged;
+END;
+$$ LANGUAGE plpgsql
+""")
+
+
 class OHLCV(Base):
-    """OHLCV (Open, High, Low, Close, Volume) candlestick data."""
+    """
+    OHLCV (Open, High, Low, Close, Volume) candlestick data.
+    
+    Candles are written in batches, never with session.add(): COPY into
+    ohlcv_staging via app.database.bulk_upsert, as tuples laid out in
+    copy_columns, merged into this table by one flush call per batch.
+    """
     
     __tablename__ = "ohlcv"
     
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
-    symbol = Column(String(20), nullable=False, index=True)
-    exchange = Column(String(50), nullable=False, default="binance")
-    timeframe = Column(String(10), nullable=False)  # 1m, 5m, 15m, 1h, 4h, 1d
+    # ohlcv_staging column order for bulk_upsert records
+    copy_columns = (
+        "symbol", "exchange", "timeframe", "timestamp",
+        "open_e8", "high_e8", "low_e8", "close_e8",
+        "volume", "quote_volume", "trades_count", "created_at",
+    )
+    
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    symbol: Mapped[str] = mapped_column(String(20), nullable=False)
+    exchange: Mapped[str] = mapped_column(String(50), nullable=False, default="binance")
+    timeframe: Mapped[str] = mapped_column(String(10), nullable=False)  # 1m, 5m, 15m, 1h, 4h, 1d
     
-    timestamp = Column(DateTime, nullable=False, index=True)
-    open = Column(Float, nullable=False)
-    high = Column(Float, nullable=False)
-    low = Column(Float, nullable=False)
-    close = Column(Float, nullable=False)
-    volume = Column(Float, nullable=False)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, primary_key=True, nullable=False)
+    open: Mapped[float] = mapped_column('open_e8', FixedPoint8, nullable=False)
+    high: Mapped[float] = mapped_column('high_e8', FixedPoint8, nullable=False)
+    low: Mapped[float] = mapped_column('low_e8', FixedPoint8, nullable=False)
+    close: Mapped[float] = mapped_column('close_e8', FixedPoint8, nullable=False)
+    volume: Mapped[float] = mapped_column(Float, nullable=False)
     
-    quote_volume = Column(Float)
-    trades_count = Column(Integer)
+    quote_volume: Mapped[Optional[float]] = mapped_column(Float)
+    trades_count: Mapped[Optional[int]] = mapped_column(Integer)
     
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=UTC_NOW, nullable=False)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=UTC_NOW, onupdate=UTC_NOW)
     
     __table_args__ = (
-        Index('idx_symbol_timeframe_timestamp', 'symbol', 'timeframe', 'timestamp', unique=True),
-        Index('idx_timestamp_symbol', 'timestamp', 'symbol'),
+        Index(
+            'idx_symbol_timeframe_timestamp', 'symbol', 'timeframe', text('timestamp DESC'),
+            unique=True,
+            postgresql_include=[
+                'open_e8', 'high_e8', 'low_e8', 'close_e8', 'volume', 'quote_volume', 'trades_count',
+            ],
+        ),
+        Index(
+            'ix_ohlcv_timestamp_brin', 'timestamp',
+            postgresql_using='brin', postgresql_with={'pages_per_range': 32, 'autosummarize': 'on'},
+        ),
+        PARTITION_BY_TIMESTAMP,
     )
 
 
@@ -39,29 +202,33 @@ class Ticker(Base):
     
     __tablename__ = "tickers"
     
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
-    symbol = Column(String(20), nullable=False, index=True)
-    exchange = Column(String(50), nullable=False, default="binance")
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    symbol: Mapped[str] = mapped_column(String(20), nullable=False)
+    exchange: Mapped[str] = mapped_column(String(50), nullable=False, default="binance")
     
-    timestamp = Column(DateTime, nullable=False, index=True)
-    last_price = Column(Float, nullable=False)
-    bid_price = Column(Float)
-    ask_price = Column(Float)
-    bid_volume = Column(Float)
-    ask_volume = Column(Float)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, primary_key=True, nullable=False)
+    last_price: Mapped[float] = mapped_column(Float, nullable=False)
+    bid_price: Mapped[Optional[float]] = mapped_column(Float)
+    ask_price: Mapped[Optional[float]] = mapped_column(Float)
+    bid_volume: Mapped[Optional[float]] = mapped_column(Float)
+    ask_volume: Mapped[Optional[float]] = mapped_column(Float)
     
-    volume_24h = Column(Float)
-    quote_volume_24h = Column(Float)
-    price_change_24h = Column(Float)
-    price_change_percent_24h = Column(Float)
+    volume_24h: Mapped[Optional[float]] = mapped_column(Float)
+    quote_volume_24h: Mapped[Optional[float]] = mapped_column(Float)
+    price_change_24h: Mapped[Optional[float]] = mapped_column(Float)
+    price_change_percent_24h: Mapped[Optional[float]] = mapped_column(Float)
     
-    high_24h = Column(Float)
-    low_24h = Column(Float)
+    high_24h: Mapped[Optional[float]] = mapped_column(Float)
+    low_24h: Mapped[Optional[float]] = mapped_column(Float)
     
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=UTC_NOW, nullable=False)
     
     __table_args__ = (
-        Index('idx_symbol_timestamp', 'symbol', 'timestamp'),
+        Index(
+            'idx_symbol_timestamp', 'symbol', text('timestamp DESC'),
+            postgresql_include=['last_price', 'bid_price', 'ask_price'],
+        ),
+        PARTITION_BY_TIMESTAMP,
     )
 
 
@@ -70,52 +237,99 @@ class OrderBook(Base):
     
     __tablename__ = "order_books"
     
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
-    symbol = Column(String(20), nullable=False, index=True)
-    exchange = Column(String(50), nullable=False, default="binance")
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    symbol: Mapped[str] = mapped_column(String(20), nullable=False)
+    exchange: Mapped[str] = mapped_column(String(50), nullable=False, default="binance")
     
-    timestamp = Column(DateTime, nullable=False, index=True)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, primary_key=True, nullable=False)
     
-    # Store bids/asks as JSON
-    bids = Column(JSONB, nullable=False)  # [[price, volume], ...]
-    asks = Column(JSONB, nullable=False)  # [[price, volume], ...]
+    # Price levels as parallel arrays, best level first; exposed as
+    # [[price, volume], ...] through the bids/asks properties
+    bid_prices: Mapped[List[float]] = mapped_column(ARRAY(DOUBLE_PRECISION), nullable=False)
+    bid_volumes: Mapped[List[float]] = mapped_column(ARRAY(DOUBLE_PRECISION), nullable=False)
+    ask_prices: Mapped[List[float]] = mapped_column(ARRAY(DOUBLE_PRECISION), nullable=False)
+    ask_volumes: Mapped[List[float]] = mapped_column(ARRAY(DOUBLE_PRECISION), nullable=False)
     
     # Aggregated metrics
-    bid_ask_spread = Column(Float)
-    total_bid_volume = Column(Float)
-    total_ask_volume = Column(Float)
+    bid_ask_spread: Mapped[Optional[float]] = mapped_column(Float)
+    total_bid_volume: Mapped[Optional[float]] = mapped_column(Float)
+    total_ask_volume: Mapped[Optional[float]] = mapped_column(Float)
     
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=UTC_NOW, nullable=False)
     
     __table_args__ = (
-        Index('idx_orderbook_symbol_timestamp', 'symbol', 'timestamp'),
+        Index('idx_orderbook_symbol_timestamp', 'symbol', text('timestamp DESC')),
+        PARTITION_BY_TIMESTAMP,
     )
+    
+    @property
+    def bids(self) -> List[List[float]]:
+        """Bid levels as [[price, volume], ...]."""
+        return [[price, volume] for price, volume in zip(self.bid_prices or [], self.bid_volumes or [])]
+    
+    @bids.setter
+    def bids(self, levels: List[List[float]]) -> None:
+        self.bid_prices = [price for price, _ in levels]
+        self.bid_volumes = [volume for _, volume in levels]
+    
+    @property
+    def asks(self) -> List[List[float]]:
+        """Ask levels as [[price, volume], ...]."""
+        return [[price, volume] for price, volume in zip(self.ask_prices or [], self.ask_volumes or [])]
+    
+    @asks.setter
+    def asks(self, levels: List[List[float]]) -> None:
+        self.ask_prices = [price for price, _ in levels]
+        self.ask_volumes = [volume for _, volume in levels]
 
 
 class Trade(Base):
-    """Individual trades."""
+    """
+    Individual trades.
+    
+    Written like OHLCV: COPY into trades_staging via bulk_upsert, as tuples
+    laid out in copy_columns; duplicates are dropped by the flush.
+    """
     
     __tablename__ = "trades"
     
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
-    symbol = Column(String(20), nullable=False, index=True)
-    exchange = Column(String(50), nullable=False, default="binance")
+    # trades_staging column order for bulk_upsert records
+    copy_columns = (
+        "symbol", "exchange", "trade_id", "timestamp",
+        "price_e8", "volume", "quote_volume_e8", "is_buyer_maker", "created_at",
+    )
+    
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    symbol: Mapped[str] = mapped_column(String(20), nullable=False)
+    exchange: Mapped[str] = mapped_column(String(50), nullable=False, default="binance")
     
-    trade_id = Column(String(100), nullable=False)
-    timestamp = Column(DateTime, nullable=False, index=True)
+    trade_id: Mapped[str] = mapped_column(String(100), nullable=False)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, primary_key=True, nullable=False)
     
-    price = Column(Float, nullable=False)
-    volume = Column(Float, nullable=False)
-    quote_volume = Column(Float)
+    price: Mapped[float] = mapped_column('price_e8', FixedPoint8, nullable=False)
+    volume: Mapped[float] = mapped_column(Float, nullable=False)
+    quote_volume: Mapped[Optional[float]] = mapped_column('quote_volume_e8', FixedPoint8)
     
-    side = Column(String(10))  # buy/sell
-    is_buyer_maker = Column(Boolean)
+    is_buyer_maker: Mapped[Optional[bool]] = mapped_column(Boolean)
+    # Taker side (buy/sell), derived in SQL instead of stored alongside the
+    # flag it duplicates: a buyer maker means the seller took the trade
+    side: Mapped[Optional[str]] = column_property(
+        case((is_buyer_maker.is_(True), "sell"), (is_buyer_maker.is_(False), "buy"))
+    )
     
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=UTC_NOW, nullable=False)
     
     __table_args__ = (
-        Index('idx_trade_symbol_timestamp', 'symbol', 'timestamp'),
-        Index('idx_trade_id', 'exchange', 'trade_id', unique=True),
+        Index(
+            'idx_trade_symbol_timestamp', 'symbol', text('timestamp DESC'),
+            postgresql_include=['price_e8', 'volume', 'is_buyer_maker'],
+        ),
+        Index(
+            'ix_trades_timestamp_brin', 'timestamp',
+            postgresql_using='brin', postgresql_with={'pages_per_range': 32, 'autosummarize': 'on'},
+        ),
+        Index('idx_trade_id', 'exchange', 'trade_id', 'timestamp', unique=True),
+        PARTITION_BY_TIMESTAMP,
     )
 
 
@@ -124,33 +338,42 @@ class MarketMetrics(Base):
     
     __tablename__ = "market_metrics"
     
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
-    symbol = Column(String(20), nullable=False, index=True)
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    symbol: Mapped[str] = mapped_column(String(20), nullable=False)
     
-    timestamp = Column(DateTime, nullable=False, index=True)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, primary_key=True, nullable=False)
     
     # CoinGecko data
-    market_cap = Column(Float)
-    market_cap_rank = Column(Integer)
-    fully_diluted_valuation = Column(Float)
-    circulating_supply = Column(Float)
-    total_supply = Column(Float)
-    max_supply = Column(Float)
+    market_cap: Mapped[Optional[float]] = mapped_column(Float)
+    market_cap_rank: Mapped[Optional[int]] = mapped_column(Integer)
+    fully_diluted_valuation: Mapped[Optional[float]] = mapped_column(Float)
+    circulating_supply: Mapped[Optional[float]] = mapped_column(Float)
+    total_supply: Mapped[Optional[float]] = mapped_column(Float)
+    max_supply: Mapped[Optional[float]] = mapped_column(Float)
     
     # Social metrics
-    developer_score = Column(Float)
-    community_score = Column(Float)
-    liquidity_score = Column(Float)
-    public_interest_score = Column(Float)
+    developer_score: Mapped[Optional[float]] = mapped_column(Float)
+    community_score: Mapped[Optional[float]] = mapped_column(Float)
+    liquidity_score: Mapped[Optional[float]] = mapped_column(Float)
+    public_interest_score: Mapped[Optional[float]] = mapped_column(Float)
+    
+    # Price extremes, promoted out of market_metadata for filtering
+    ath: Mapped[Optional[float]] = mapped_column(Float)
+    atl: Mapped[Optional[float]] = mapped_column(Float)
     
     # Additional metadata - RENAMED from 'metadata' to 'market_metadata'
-    market_metadata = Column(JSONB)
+    market_metadata: Mapped[Optional[dict]] = mapped_column(JSONB)
     
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=UTC_NOW, nullable=False)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=UTC_NOW, onupdate=UTC_NOW)
     
     __table_args__ = (
-        Index('idx_metrics_symbol_timestamp', 'symbol', 'timestamp'),
+        Index('idx_metrics_symbol_timestamp', 'symbol', text('timestamp DESC'), unique=True),
+        Index(
+            'idx_market_metrics_metadata_gin', 'market_metadata',
+            postgresql_using='gin', postgresql_ops={'market_metadata': 'jsonb_path_ops'},
+        ),
+        PARTITION_BY_TIMESTAMP,
     )
 
 
@@ -159,35 +382,44 @@ class OnChainMetrics(Base):
     
     __tablename__ = "onchain_metrics"
     
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
-    symbol = Column(String(20), nullable=False, index=True)
-    blockchain = Column(String(50), nullable=False)
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    symbol: Mapped[str] = mapped_column(String(20), nullable=False)
+    blockchain: Mapped[str] = mapped_column(String(50), nullable=False)
     
-    timestamp = Column(DateTime, nullable=False, index=True)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, primary_key=True, nullable=False)
     
     # Network metrics
-    active_addresses = Column(Integer)
-    transaction_count = Column(Integer)
-    transaction_volume = Column(Float)
-    average_transaction_value = Column(Float)
+    active_addresses: Mapped[Optional[int]] = mapped_column(Integer)
+    transaction_count: Mapped[Optional[int]] = mapped_column(Integer)
+    transaction_volume: Mapped[Optional[float]] = mapped_column(Float)
+    average_transaction_value: Mapped[Optional[float]] = mapped_column(Float)
     
     # Mining/Staking metrics
-    hash_rate = Column(Float)
-    difficulty = Column(Float)
-    block_height = Column(Integer)
+    hash_rate: Mapped[Optional[float]] = mapped_column(Float)
+    difficulty: Mapped[Optional[float]] = mapped_column(Float)
+    block_height: Mapped[Optional[int]] = mapped_column(Integer)
     
     # Economic metrics
-    fees_total = Column(Float)
-    fees_mean = Column(Float)
-    fees_median = Column(Float)
+    fees_total: Mapped[Optional[float]] = mapped_column(Float)
+    fees_mean: Mapped[Optional[float]] = mapped_column(Float)
+    fees_median: Mapped[Optional[float]] = mapped_column(Float)
+    
+    # Network economics, promoted out of chain_metadata for filtering
+    market_price_usd: Mapped[Optional[float]] = mapped_column(Float)
+    miners_revenue_usd: Mapped[Optional[float]] = mapped_column(Float)
     
     # Additional data - RENAMED from 'metadata' to 'chain_metadata'
-    chain_metadata = Column(JSONB)
+    chain_metadata: Mapped[Optional[dict]] = mapped_column(JSONB)
     
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=UTC_NOW, nullable=False)
     
     __table_args__ = (
-        Index('idx_onchain_symbol_timestamp', 'symbol', 'timestamp'),
+        Index('idx_onchain_symbol_timestamp', 'symbol', text('timestamp DESC'), unique=True),
+        Index(
+            'idx_onchain_metrics_metadata_gin', 'chain_metadata',
+            postgresql_using='gin', postgresql_ops={'chain_metadata': 'jsonb_path_ops'},
+        ),
+        PARTITION_BY_TIMESTAMP,
     )
 
 
@@ -196,20 +428,48 @@ class DataCollectionStatus(Base):
     
     __tablename__ = "data_collection_status"
     
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
-    collector_name = Column(String(100), nullable=False, index=True)
-    symbol = Column(String(20), index=True)
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    collector_name: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
+    symbol: Mapped[Optional[str]] = mapped_column(String(20), index=True)
     
-    status = Column(String(20), nullable=False)  # running, completed, failed
-    started_at = Column(DateTime, nullable=False)
-    completed_at = Column(DateTime)
+    status: Mapped[str] = mapped_column(String(20), nullable=False)  # running, completed, failed
+    started_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
     
-    records_collected = Column(Integer, default=0)
-    error_message = Column(Text)
+    records_collected: Mapped[Optional[int]] = mapped_column(Integer, default=0)
+    error_message: Mapped[Optional[str]] = mapped_column(Text)
     
     # Additional data - RENAMED from 'metadata' to 'collection_metadata'
-    collection_metadata = Column(JSONB)
+    collection_metadata: Mapped[Optional[dict]] = mapped_column(JSONB)
     
     __table_args__ = (
         Index('idx_collection_status', 'collector_name', 'status', 'started_at'),
-    )
\ No newline at end of file
+        # Monitoring lookups of unfinished/failed jobs; completed rows are excluded
+        Index(
+            'idx_status_active', 'status', text('started_at DESC'),
+            postgresql_include=['collector_name', 'symbol', 'error_message'],
+            postgresql_where=text("status IN ('failed', 'running', 'pending')"),
+        ),
+    )
+
+
+for _model in (OHLCV, Ticker, OrderBook, Trade, MarketMetrics, OnChainMetrics):
+    event.listen(_model.__table__, "after_create", _default_partition)
+
+for _model, _flush in ((OHLCV, _flush_ohlcv_staging), (Trade, _flush_trades_staging)):
+    for _ddl in (*_staging_table, _flush, _upsert_batch):
+        event.listen(_model.__table__, "after_create", _ddl)
+    for _ddl in _drop_staging:
+        event.listen(_model.__table__, "before_drop", _ddl)
+
+
+# Distinct symbols seen in tickers, refreshed by app.database.refresh_symbols_view.
+# The unique index is required for REFRESH ... CONCURRENTLY.
+symbols_view = table("symbols_mv", column("symbol", String))
+
+for _ddl in (
+    DDL("CREATE MATERIALIZED VIEW IF NOT EXISTS symbols_mv AS SELECT DISTINCT symbol FROM tickers"),
+    DDL("CREATE UNIQUE INDEX IF NOT EXISTS idx_symbols_mv_symbol ON symbols_mv (symbol)"),
+):
+    event.listen(Ticker.__table__, "after_create", _ddl)
+event.listen(Ticker.__table__, "before_drop", DDL("DROP MATERIALIZED VIEW IF EXISTS symbols_mv"))
@@ -5,12 +5,15 @@
 from app.schemas.market_data import (
     OHLCVCreate,
     OHLCVResponse,
+    OHLCVRow,
     TickerCreate,
     TickerResponse,
+    TickerRow,
     OrderBookCreate,
     OrderBookResponse,
     TradeCreate,
     TradeResponse,
+    TradeRow,
     MarketMetricsCreate,
     MarketMetricsResponse,
     OnChainMetricsCreate,
@@ -24,12 +27,15 @@ from app.schemas.market_data import (
 __all__ = [
     "OHLCVCreate",
     "OHLCVResponse",
+    "OHLCVRow",
     "TickerCreate",
     "TickerResponse",
+    "TickerRow",
     "OrderBookCreate",
     "OrderBookResponse",
     "TradeCreate",
     "TradeResponse",
+    "TradeRow",
     "MarketMetricsCreate",
     "MarketMetricsResponse",
     "OnChainMetricsCreate",
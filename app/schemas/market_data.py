@@ -1,7 +1,14 @@
 # See artifact: crypto_schemas
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import AliasChoices, BaseModel, Field, ConfigDict
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Annotated, Optional, List, Dict, Any, TypedDict
+
+# Reusable field types. Pydantic builds the constraint metadata of each alias
+# once and shares it across every schema field below that uses it.
+Price = Annotated[float, Field(ge=0)]
+Volume = Annotated[float, Field(ge=0)]
+OptPrice = Annotated[Optional[float], Field(ge=0)]
+OptVolume = Annotated[Optional[float], Field(ge=0)]
 
 
 class OHLCVBase(BaseModel):
@@ -10,12 +17,12 @@ class OHLCVBase(BaseModel):
     exchange: str = "binance"
     timeframe: str
     timestamp: datetime
-    open: float
-    high: float
-    low: float
-    close: float
-    volume: float
-    quote_volume: Optional[float] = None
+    open: Price
+    high: Price
+    low: Price
+    close: Price
+    volume: Volume
+    quote_volume: OptVolume = None
     trades_count: Optional[int] = None
 
 
@@ -33,22 +40,46 @@ class OHLCVResponse(OHLCVBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class OHLCVRow(TypedDict):
+    """
+    Plain-dict shape of an OHLCVResponse.
+    
+    Hot read endpoints serialize DB rows of exactly these columns straight
+    to JSON instead of building a response model per row. Values were
+    validated on ingest and the column types already match the schema.
+    """
+    id: int
+    symbol: str
+    exchange: str
+    timeframe: str
+    timestamp: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    quote_volume: Optional[float]
+    trades_count: Optional[int]
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+
 class TickerBase(BaseModel):
     """Base ticker schema."""
     symbol: str
     exchange: str = "binance"
     timestamp: datetime
-    last_price: float
-    bid_price: Optional[float] = None
-    ask_price: Optional[float] = None
-    bid_volume: Optional[float] = None
-    ask_volume: Optional[float] = None
-    volume_24h: Optional[float] = None
-    quote_volume_24h: Optional[float] = None
+    last_price: Price
+    bid_price: OptPrice = None
+    ask_price: OptPrice = None
+    bid_volume: OptVolume = None
+    ask_volume: OptVolume = None
+    volume_24h: OptVolume = None
+    quote_volume_24h: OptVolume = None
     price_change_24h: Optional[float] = None
     price_change_percent_24h: Optional[float] = None
-    high_24h: Optional[float] = None
-    low_24h: Optional[float] = None
+    high_24h: OptPrice = None
+    low_24h: OptPrice = None
 
 
 class TickerCreate(TickerBase):
@@ -64,6 +95,26 @@ class TickerResponse(TickerBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class TickerRow(TypedDict):
+    """Plain-dict shape of a TickerResponse (see OHLCVRow)."""
+    id: int
+    symbol: str
+    exchange: str
+    timestamp: datetime
+    last_price: float
+    bid_price: Optional[float]
+    ask_price: Optional[float]
+    bid_volume: Optional[float]
+    ask_volume: Optional[float]
+    volume_24h: Optional[float]
+    quote_volume_24h: Optional[float]
+    price_change_24h: Optional[float]
+    price_change_percent_24h: Optional[float]
+    high_24h: Optional[float]
+    low_24h: Optional[float]
+    created_at: datetime
+
+
 class OrderBookBase(BaseModel):
     """Base order book schema."""
     symbol: str
@@ -72,8 +123,8 @@ class OrderBookBase(BaseModel):
     bids: List[List[float]]  # [[price, volume], ...]
     asks: List[List[float]]  # [[price, volume], ...]
     bid_ask_spread: Optional[float] = None
-    total_bid_volume: Optional[float] = None
-    total_ask_volume: Optional[float] = None
+    total_bid_volume: OptVolume = None
+    total_ask_volume: OptVolume = None
 
 
 class OrderBookCreate(OrderBookBase):
@@ -95,9 +146,9 @@ class TradeBase(BaseModel):
     exchange: str = "binance"
     trade_id: str
     timestamp: datetime
-    price: float
-    volume: float
-    quote_volume: Optional[float] = None
+    price: Price
+    volume: Volume
+    quote_volume: OptVolume = None
     side: Optional[str] = None
     is_buyer_maker: Optional[bool] = None
 
@@ -115,6 +166,21 @@ class TradeResponse(TradeBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class TradeRow(TypedDict):
+    """Plain-dict shape of a TradeResponse (see OHLCVRow)."""
+    id: int
+    symbol: str
+    exchange: str
+    trade_id: str
+    timestamp: datetime
+    price: float
+    volume: float
+    quote_volume: Optional[float]
+    side: Optional[str]
+    is_buyer_maker: Optional[bool]
+    created_at: datetime
+
+
 class MarketMetricsBase(BaseModel):
     """Base market metrics schema."""
     symbol: str
@@ -129,7 +195,11 @@ class MarketMetricsBase(BaseModel):
     community_score: Optional[float] = None
     liquidity_score: Optional[float] = None
     public_interest_score: Optional[float] = None
-    metadata: Optional[Dict[str, Any]] = None
+    ath: Optional[float] = None
+    atl: Optional[float] = None
+    metadata: Optional[Dict[str, Any]] = Field(
+        default=None, validation_alias=AliasChoices("market_metadata", "metadata")
+    )
 
 
 class MarketMetricsCreate(MarketMetricsBase):
@@ -161,7 +231,11 @@ class OnChainMetricsBase(BaseModel):
     fees_total: Optional[float] = None
     fees_mean: Optional[float] = None
     fees_median: Optional[float] = None
-    metadata: Optional[Dict[str, Any]] = None
+    market_price_usd: Optional[float] = None
+    miners_revenue_usd: Optional[float] = None
+    metadata: Optional[Dict[str, Any]] = Field(
+        default=None, validation_alias=AliasChoices("chain_metadata", "metadata")
+    )
 
 
 class OnChainMetricsCreate(OnChainMetricsBase):
@@ -179,8 +253,8 @@ class OnChainMetricsResponse(OnChainMetricsBase):
 
 class PaginationParams(BaseModel):
     """Pagination parameters."""
-    skip: int = Field(0, ge=0)
-    limit: int = Field(100, ge=1, le=1000)
+    skip: Annotated[int, Field(ge=0)] = 0
+    limit: Annotated[int, Field(ge=1, le=1000)] = 100
 
 
 class MarketDataQuery(BaseModel):
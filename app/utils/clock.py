@@ -0,0 +1,23 @@
+import time
+from datetime import datetime, timezone
+
+_cached_second = 0
+_cached_iso = ""
+
+
+def utcnow_iso() -> str:
+    """
+    Current UTC time as an RFC 3339 string, to the second.
+    
+    The string is formatted once per second and reused by every call in
+    that second, for response timestamps on frequently polled endpoints.
+    
+    Returns:
+        Timestamp such as "2024-01-01T12:00:00+00:00"
+    """
+    global _cached_second, _cached_iso
+    now = int(time.time())
+    if now != _cached_second:
+        _cached_iso = datetime.fromtimestamp(now, tz=timezone.utc).isoformat()
+        _cached_second = now
+    return _cached_iso
@@ -1,14 +1,24 @@
+import array
 import asyncio
 import time
-from typing import Dict
-from collections import deque
+from typing import Dict, Optional
 import logging
 
+from app.config import get_settings
+
 logger = logging.getLogger(__name__)
 
 
 class RateLimiter:
-    """Token bucket rate limiter for API calls."""
+    """
+    Token bucket rate limiter for API calls.
+    
+    Callers take their token up front, letting the allowance go negative,
+    and sleep until it would have refilled. Concurrent waiters are thus
+    released one token interval apart without a lock: the take is a plain
+    read-modify-write with no await in between, which the event loop never
+    interleaves.
+    """
     
     def __init__(self, rate: int, per: int = 60):
         """
@@ -20,34 +30,65 @@ class RateLimiter:
         """
         self.rate = rate
         self.per = per
-        self.allowance = rate
-        self.last_check = time.time()
-        self.lock = asyncio.Lock()
+        self.allowance: float = rate
+        self.last_check = time.monotonic()
+    
+    def _refill(self) -> None:
+        """Add the tokens earned since the last check."""
+        current = time.monotonic()
+        time_passed = current - self.last_check
+        self.last_check = current
+        
+        self.allowance += time_passed * (self.rate / self.per)
+        if self.allowance > self.rate:
+            self.allowance = self.rate
     
     async def acquire(self) -> None:
-        """Acquire permission to make a request."""
-        async with self.lock:
-            current = time.time()
-            time_passed = current - self.last_check
-            self.last_check = current
-            
-            # Refill tokens
-            self.allowance += time_passed * (self.rate / self.per)
-            if self.allowance > self.rate:
-                self.allowance = self.rate
-            
-            # Check if we have tokens
-            if self.allowance < 1.0:
-                sleep_time = (1.0 - self.allowance) * (self.per / self.rate)
-                logger.warning(f"Rate limit reached, sleeping for {sleep_time:.2f}s")
-                await asyncio.sleep(sleep_time)
-                self.allowance = 0.0
-            else:
-                self.allowance -= 1.0
+        """Acquire permission to make a request, waiting if the bucket is empty."""
+        self._refill()
+        self.allowance -= 1.0
+        if self.allowance >= 0.0:
+            return
+        
+        # Sleep off the deficit; later callers queue behind it. Waiting is
+        # routine whenever collectors saturate the bucket, so it is logged
+        # at debug with deferred formatting: a filtered record costs a level
+        # check rather than a formatted JSON line per queued request.
+        sleep_time = -self.allowance * (self.per / self.rate)
+        logger.debug("Rate limit reached, sleeping for %.2fs", sleep_time)
+        try:
+            await asyncio.sleep(sleep_time)
+        except asyncio.CancelledError:
+            # Hand the unused token back
+            self.allowance += 1.0
+            raise
+    
+    def sync(self, remaining: Optional[int] = None, retry_after: Optional[float] = None) -> None:
+        """
+        Align the bucket with the budget the server reports.
+        
+        Args:
+            remaining: Requests the server still allows in its current window;
+                the bucket never holds more tokens than this
+            retry_after: Seconds the server asked to wait; the next acquire
+                sleeps at least this long
+        """
+        self._refill()
+        if remaining is not None:
+            self.allowance = min(self.allowance, float(remaining))
+        if retry_after is not None:
+            # acquire() sleeps (1 - allowance) token intervals
+            self.allowance = min(self.allowance, 1.0 - retry_after * self.rate / self.per)
 
 
 class SlidingWindowRateLimiter:
-    """Sliding window rate limiter."""
+    """
+    Sliding window rate limiter.
+    
+    Request times are kept as monotonic nanoseconds in a fixed ring buffer
+    of max_requests slots, oldest at head, so recording a request allocates
+    nothing.
+    """
     
     def __init__(self, max_requests: int, window_seconds: int = 60):
         """
@@ -59,33 +100,38 @@ class SlidingWindowRateLimiter:
         """
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests: deque = deque()
+        self.window_ns = int(window_seconds * 1_000_000_000)
+        self.requests = array.array("q", bytes(8 * max_requests))
+        self.head = 0
+        self.count = 0
         self.lock = asyncio.Lock()
     
+    def _evict(self, now_ns: int) -> None:
+        """Drop requests that have left the window."""
+        cutoff = now_ns - self.window_ns
+        while self.count and self.requests[self.head] < cutoff:
+            self.head = (self.head + 1) % self.max_requests
+            self.count -= 1
+    
     async def acquire(self) -> None:
         """Acquire permission to make a request."""
         async with self.lock:
-            now = time.time()
+            now_ns = time.monotonic_ns()
+            self._evict(now_ns)
             
-            # Remove old requests outside window
-            while self.requests and self.requests[0] < now - self.window_seconds:
-                self.requests.popleft()
-            
-            # Check if we can make request
-            if len(self.requests) >= self.max_requests:
-                # Calculate wait time
-                oldest = self.requests[0]
-                wait_time = (oldest + self.window_seconds) - now
-                logger.warning(f"Rate limit reached, sleeping for {wait_time:.2f}s")
+            # Wait for the oldest request to leave the window (re-checked,
+            # as the sleep can end a timer tick early)
+            while self.count >= self.max_requests:
+                wait_time = (self.requests[self.head] + self.window_ns - now_ns) / 1e9
+                logger.debug("Rate limit reached, sleeping for %.2fs", wait_time)
                 await asyncio.sleep(wait_time)
                 
-                # Clean up again after sleep
-                now = time.time()
-                while self.requests and self.requests[0] < now - self.window_seconds:
-                    self.requests.popleft()
+                now_ns = time.monotonic_ns()
+                self._evict(now_ns)
             
             # Add current request
-            self.requests.append(now)
+            self.requests[(self.head + self.count) % self.max_requests] = now_ns
+            self.count += 1
 
 
 class MultiRateLimiter:
@@ -113,23 +159,23 @@ class MultiRateLimiter:
         Args:
             name: Limiter name
         """
-        if name not in self.limiters:
-            logger.warning(f"Rate limiter '{name}' not found, creating default")
-            self.add_limiter(name, 100, 60)
-        
-        await self.limiters[name].acquire()
+        await self.get_limiter(name).acquire()
     
     def get_limiter(self, name: str) -> RateLimiter:
-        """Get limiter by name."""
-        if name not in self.limiters:
+        """Get limiter by name, creating a default one for unknown names."""
+        limiter = self.limiters.get(name)
+        if limiter is None:
+            logger.warning(f"Rate limiter '{name}' not found, creating default")
             self.add_limiter(name, 100, 60)
-        return self.limiters[name]
+            limiter = self.limiters[name]
+        return limiter
 
 
 # Global rate limiter instance
 rate_limiter = MultiRateLimiter()
 
 # Add default limiters
+settings = get_settings()
 rate_limiter.add_limiter("binance", 1200, 60)  # 1200 req/min
-rate_limiter.add_limiter("coingecko", 50, 60)  # 50 req/min (free tier)
+rate_limiter.add_limiter("coingecko", settings.COINGECKO_RATE_LIMIT_PER_MINUTE, 60)
 rate_limiter.add_limiter("onchain", 100, 60)  # 100 req/min
\ No newline at end of file
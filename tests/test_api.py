@@ -1,8 +1,28 @@
+import asyncio
+import time
 import pytest
+import redis
+import redis.asyncio
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
 from httpx import AsyncClient
+from pydantic import ValidationError
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.market_data import OHLCV, Ticker
+from app.api.deps import get_cache
+from app.api.v1 import websocket
+from app.api.v1.market_data import (
+    ORDERBOOK_FIELDS, MARKET_METRICS_FIELDS, _cached_body, _encode_entity, _row_columns, warm_queries
+)
+from app.cache.redis_cache import NULL_SENTINEL, RedisCache
+from app.config import get_settings
+from app.main import app
+from app.models.market_data import OHLCV, Ticker, OrderBook, Trade, MarketMetrics, OnChainMetrics
+from app.schemas.market_data import (
+    OHLCVResponse, OHLCVRow, TickerResponse, TickerRow, TradeResponse, TradeRow,
+    OrderBookResponse, MarketMetricsResponse, OnChainMetricsResponse, TickerCreate
+)
 
 
 @pytest.mark.asyncio
@@ -16,6 +36,28 @@ async def test_health_check(client: AsyncClient):
     assert "database" in data
 
 
+@pytest.mark.asyncio
+async def test_health_check_reuses_recent_result(client: AsyncClient, monkeypatch):
+    """Test probes within HEALTH_CACHE_TTL reuse one check."""
+    from app import main
+    
+    checks = 0
+    
+    async def check_health():
+        nonlocal checks
+        checks += 1
+        return {"status": "healthy", "check": checks}
+    
+    monkeypatch.setattr(main, "_check_health", check_health)
+    monkeypatch.setattr(main, "_health_result", (0.0, None))
+    
+    assert (await client.get("/health")).json()["check"] == 1
+    assert (await client.get("/health")).json()["check"] == 1
+    
+    monkeypatch.setattr(main.settings, "HEALTH_CACHE_TTL", 0)
+    assert (await client.get("/health")).json()["check"] == 2
+
+
 @pytest.mark.asyncio
 async def test_root_endpoint(client: AsyncClient):
     """Test root endpoint."""
@@ -24,15 +66,18 @@ async def test_root_endpoint(client: AsyncClient):
     data = response.json()
     assert data["status"] == "running"
     assert "version" in data
+    
+    # Timezone-aware UTC, to the second
+    timestamp = datetime.fromisoformat(data["timestamp"])
+    assert timestamp.utcoffset() == timedelta(0)
+    assert abs((datetime.now(timezone.utc) - timestamp).total_seconds()) < 5
 
 
 @pytest.mark.asyncio
-async def test_get_ohlcv(client: AsyncClient, test_session: AsyncSession, sample_ohlcv_data):
+async def test_get_ohlcv(client: AsyncClient, insert_rows, sample_ohlcv_data):
     """Test GET OHLCV endpoint."""
     # Create test data
-    ohlcv = OHLCV(**sample_ohlcv_data)
-    test_session.add(ohlcv)
-    await test_session.commit()
+    await insert_rows(OHLCV, [sample_ohlcv_data])
     
     # Test endpoint
     response = await client.get(f"/api/v1/market/ohlcv/{sample_ohlcv_data['symbol']}")
@@ -43,6 +88,115 @@ async def test_get_ohlcv(client: AsyncClient, test_session: AsyncSession, sample
     assert data[0]["symbol"] == sample_ohlcv_data["symbol"]
 
 
+@pytest.mark.asyncio
+async def test_ohlcv_etag_follows_rows(client: AsyncClient, insert_rows, sample_ohlcv_data):
+    """Test OHLCV revalidates to 304 until its rows change; only settled closed ranges are immutable."""
+    timestamp = sample_ohlcv_data["timestamp"]
+    path = f"/api/v1/market/ohlcv/{sample_ohlcv_data['symbol']}"
+    params = {"timeframe": "1h", "end_time": (timestamp + timedelta(hours=2)).isoformat()}
+    
+    # Stored after the candle closed
+    await insert_rows(OHLCV, [{**sample_ohlcv_data, "created_at": timestamp + timedelta(hours=2)}])
+    response = await client.get(path, params=params)
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, max-age=86400, immutable"
+    etag = response.headers["etag"]
+    
+    response = await client.get(path, params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    
+    # A backfilled candle, stored while it was still open
+    later = timestamp + timedelta(hours=1)
+    await insert_rows(OHLCV, [{**sample_ohlcv_data, "timestamp": later, "created_at": later}])
+    response = await client.get(path, params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.headers["cache-control"] == "public, max-age=60"
+    assert len(response.json()) == 2
+
+
+@pytest.mark.asyncio
+async def test_trade_rows_derive_side(test_session: AsyncSession, insert_rows):
+    """Test the taker side served with trade rows is derived from is_buyer_maker."""
+    timestamp = datetime(2024, 1, 1, 12, 0)
+    await insert_rows(Trade, [
+        {
+            "symbol": "BTCUSDT", "trade_id": trade_id, "timestamp": timestamp,
+            "price": 45000.0, "volume": 0.5, "is_buyer_maker": is_buyer_maker,
+        }
+        for trade_id, is_buyer_maker in (("1", True), ("2", False), ("3", None))
+    ])
+    
+    result = await test_session.execute(select(*_row_columns(Trade, TradeRow)))
+    sides = {row["trade_id"]: row["side"] for row in result.mappings()}
+    assert sides == {"1": "sell", "2": "buy", "3": None}
+
+
+@pytest.mark.asyncio
+async def test_get_trades_streams_list(client: AsyncClient, insert_rows):
+    """Test GET trades streams the newest trades as one JSON list."""
+    timestamp = datetime(2024, 1, 1, 12, 0)
+    await insert_rows(Trade, [
+        {
+            "symbol": "BTCUSDT", "trade_id": str(i), "timestamp": timestamp + timedelta(seconds=i),
+            "price": 45000.0 + i, "volume": 0.5, "is_buyer_maker": bool(i % 2),
+        }
+        for i in range(3)
+    ])
+    
+    response = await client.get("/api/v1/market/trades/BTCUSDT", params={"limit": 2})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    data = response.json()
+    assert [trade["trade_id"] for trade in data] == ["2", "1"]
+    assert data[0]["price"] == 45002.0
+    assert data[0]["side"] == "buy"
+
+
+@pytest.mark.asyncio
+async def test_get_trades_not_found(client: AsyncClient):
+    """Test GET trades endpoint with non-existent symbol."""
+    response = await client.get("/api/v1/market/trades/NONEXISTENT")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_warm_queries_run_hot_query_shapes(test_session: AsyncSession, caplog):
+    """Test the startup query warm-up executes every hot query without errors."""
+    await warm_queries()
+    assert not [record for record in caplog.records if record.levelname == "ERROR"]
+
+
+@pytest.mark.asyncio
+async def test_coalesced_fill_survives_first_caller_cancelling(test_cache: RedisCache):
+    """Test a waiter still gets the body when the caller that started the fill goes away."""
+    started = asyncio.Event()
+    release = asyncio.Event()
+    sessions = []
+    
+    async def load(session: AsyncSession):
+        sessions.append(session)
+        started.set()
+        await release.wait()
+        return b"[1]"
+    
+    first = asyncio.create_task(_cached_body(test_cache, "api:fill", load, fresh_ttl=30))
+    await started.wait()
+    second = asyncio.create_task(_cached_body(test_cache, "api:fill", load, fresh_ttl=30))
+    # Let the second caller miss and join the in-flight fill
+    await asyncio.sleep(0.05)
+    
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    release.set()
+    
+    assert await second == b"[1]"
+    assert len(sessions) == 1
+    assert await test_cache.get_bytes("api:fill") == b"[1]"
+
+
 @pytest.mark.asyncio
 async def test_get_ohlcv_not_found(client: AsyncClient):
     """Test GET OHLCV endpoint with non-existent symbol."""
@@ -51,19 +205,21 @@ async def test_get_ohlcv_not_found(client: AsyncClient):
 
 
 @pytest.mark.asyncio
-async def test_get_ticker(client: AsyncClient, test_session: AsyncSession, sample_ticker_data):
-    """Test GET ticker endpoint."""
+@pytest.mark.parametrize("path,check", [
+    ("/api/v1/market/ticker/BTCUSDT",
+     lambda data, ticker: data["symbol"] == ticker["symbol"] and data["last_price"] == ticker["last_price"]),
+    ("/api/v1/market/tickers", lambda data, ticker: isinstance(data, list)),
+    ("/api/v1/market/symbols", lambda data, ticker: isinstance(data, list) and ticker["symbol"] in data),
+], ids=["ticker", "tickers", "symbols"])
+async def test_ticker_reads(client: AsyncClient, insert_rows, sample_ticker_data, path, check):
+    """Test the ticker read endpoints serve a stored ticker."""
     # Create test data
-    ticker = Ticker(**sample_ticker_data)
-    test_session.add(ticker)
-    await test_session.commit()
+    await insert_rows(Ticker, [sample_ticker_data])
     
     # Test endpoint
-    response = await client.get(f"/api/v1/market/ticker/{sample_ticker_data['symbol']}")
+    response = await client.get(path)
     assert response.status_code == 200
-    data = response.json()
-    assert data["symbol"] == sample_ticker_data["symbol"]
-    assert data["last_price"] == sample_ticker_data["last_price"]
+    assert check(response.json(), sample_ticker_data)
 
 
 @pytest.mark.asyncio
@@ -74,34 +230,59 @@ async def test_get_ticker_not_found(client: AsyncClient):
 
 
 @pytest.mark.asyncio
-async def test_get_all_tickers(client: AsyncClient, test_session: AsyncSession, sample_ticker_data):
-    """Test GET all tickers endpoint."""
-    # Create test data
-    ticker = Ticker(**sample_ticker_data)
-    test_session.add(ticker)
-    await test_session.commit()
+async def test_not_found_is_cached_as_sentinel(client: AsyncClient, test_cache: RedisCache, monkeypatch):
+    """Test a 404 stores NULL_SENTINEL and the next miss is answered from it without a query."""
+    app.dependency_overrides[get_cache] = lambda: test_cache
+    path = "/api/v1/market/ticker/NONEXISTENT"
     
-    # Test endpoint
-    response = await client.get("/api/v1/market/tickers")
-    assert response.status_code == 200
-    data = response.json()
-    assert isinstance(data, list)
+    response = await client.get(path)
+    assert response.status_code == 404
+    redis_client = test_cache.redis_client
+    assert await redis_client.get("api:ticker:NONEXISTENT") == NULL_SENTINEL
+    negative_ttl = get_settings().CACHE_NEGATIVE_TTL
+    assert 0 < await redis_client.ttl("api:ticker:NONEXISTENT") <= negative_ttl
+    assert 0 < await redis_client.ttl("fresh:api:ticker:NONEXISTENT") <= negative_ttl
+    
+    def no_session():
+        raise AssertionError("negative cache hit should not open a session")
+    
+    monkeypatch.setattr("app.api.v1.market_data.async_session_factory", no_session)
+    response = await client.get(path)
+    assert response.status_code == 404
 
 
 @pytest.mark.asyncio
-async def test_get_available_symbols(client: AsyncClient, test_session: AsyncSession, sample_ticker_data):
-    """Test GET available symbols endpoint."""
+async def test_cache_miss_waits_for_lock_holder(test_cache: RedisCache):
+    """Test a miss while another worker holds the fill lock waits for its body instead of loading."""
+    cache_key = "api:ticker:LOCKEDUSDT"
+    assert await test_cache.acquire_lock(cache_key)
+    
+    async def load(session: AsyncSession):
+        raise AssertionError("only the lock holder should load")
+    
+    async def fill_elsewhere():
+        await asyncio.sleep(0.1)
+        await test_cache.set_bytes(cache_key, b"{}", ttl=60, fresh_ttl=30)
+    
+    filler = asyncio.create_task(fill_elsewhere())
+    assert await _cached_body(test_cache, cache_key, load, fresh_ttl=30) == b"{}"
+    await filler
+
+
+@pytest.mark.asyncio
+async def test_get_tickers_batch(client: AsyncClient, insert_rows, sample_ticker_data):
+    """Test GET batch tickers endpoint."""
     # Create test data
-    ticker = Ticker(**sample_ticker_data)
-    test_session.add(ticker)
-    await test_session.commit()
+    await insert_rows(Ticker, [sample_ticker_data])
     
-    # Test endpoint
-    response = await client.get("/api/v1/market/symbols")
+    # Test endpoint with one known and one unknown symbol
+    response = await client.get(
+        f"/api/v1/market/tickers/batch?symbols={sample_ticker_data['symbol']},NONEXISTENT"
+    )
     assert response.status_code == 200
     data = response.json()
-    assert isinstance(data, list)
-    assert sample_ticker_data["symbol"] in data
+    assert len(data) == 1
+    assert data[0]["symbol"] == sample_ticker_data["symbol"]
 
 
 @pytest.mark.asyncio
@@ -116,13 +297,131 @@ async def test_collectors_status(client: AsyncClient):
 
 
 @pytest.mark.asyncio
-async def test_ohlcv_pagination(client: AsyncClient, test_session: AsyncSession, sample_ohlcv_data):
+async def test_collectors_start_once(client: AsyncClient, monkeypatch):
+    """Test a repeated start reuses the running loops and stop cancels them."""
+    from app import main
+    
+    collectors = [main.binance_collector, main.coingecko_collector, main.onchain_collector]
+    loops = []
+    
+    for collector in collectors:
+        async def run_forever(session_factory, symbols, interval_seconds=None, collector=collector):
+            loops.append(collector.name)
+            collector.is_running = True
+            await asyncio.Event().wait()
+        
+        monkeypatch.setattr(collector, "start_collection_loop", run_forever)
+    
+    response = await client.post("/api/v1/collectors/start", json=["BTCUSDT"])
+    assert response.json()["started"] == ["binance", "coingecko", "onchain"]
+    tasks = [collector.collection_task for collector in collectors]
+    
+    response = await client.post("/api/v1/collectors/start", json=["BTCUSDT"])
+    assert response.json()["status"] == "already_running"
+    await asyncio.sleep(0)
+    assert len(loops) == 3
+    
+    response = await client.post("/api/v1/collectors/stop")
+    assert response.json()["status"] == "success"
+    assert all(task.cancelled() for task in tasks)
+    assert not any(collector.is_running for collector in collectors)
+
+
+@pytest.mark.asyncio
+async def test_cors_skips_probe_endpoints(client: AsyncClient):
+    """Test CORS headers are added to API routes but not to probe endpoints."""
+    headers = {"Origin": "http://example.com"}
+    
+    response = await client.get("/api/v1/collectors/status", headers=headers)
+    assert response.headers["access-control-allow-origin"] == "*"
+    
+    response = await client.get("/health", headers=headers)
+    assert response.status_code == 200
+    assert "access-control-allow-origin" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_metrics_count_requests(client: AsyncClient):
+    """Test requests are counted by method, route template and status."""
+    await client.get("/api/v1/collectors/status")
+    await client.get("/api/v1/market/ticker/NONEXISTENT")
+    await client.get("/no-such-page")
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert (
+        'http_requests_total{endpoint="/api/v1/collectors/status",method="GET",status="200"}'
+        in response.text
+    )
+    assert (
+        'http_requests_total{endpoint="/api/v1/market/ticker/{symbol}",method="GET",status="404"}'
+        in response.text
+    )
+    assert 'http_requests_total{endpoint="unmatched",method="GET",status="404"}' in response.text
+    assert "NONEXISTENT" not in response.text
+
+
+@pytest.fixture
+def ws_publisher(monkeypatch):
+    """
+    Serve the WebSocket handlers from Redis and publish to them.
+    
+    TestClient runs the app on its own event loop, so the handlers get a
+    RedisCache whose clients connect lazily on that loop. Messages are
+    published from the test with a blocking client.
+    """
+    redis_url = get_settings().redis_url
+    publisher = redis.Redis.from_url(redis_url)
+    try:
+        publisher.ping()
+    except redis.ConnectionError as e:
+        pytest.skip(f"Redis unavailable: {e}")
+    
+    ws_cache = RedisCache()
+    ws_cache.redis_client = redis.asyncio.Redis.from_url(redis_url)
+    ws_cache.pubsub_client = redis.asyncio.Redis.from_url(redis_url)
+    monkeypatch.setattr(websocket, "cache", ws_cache)
+    
+    yield lambda channel, value: publisher.publish(channel, ws_cache._dumps(value))
+    
+    publisher.close()
+
+
+def test_websocket_relays_published_updates(ws_publisher):
+    """Test a ticker client gets published updates and pongs, and its relay stops on disconnect."""
+    client = TestClient(app)
+    channel = "ticker:WSTESTUSDT"
+    update = {"symbol": "WSTESTUSDT", "last_price": 1.5}
+    
+    with client.websocket_connect("/api/v1/ws/ticker/WSTESTUSDT") as ws:
+        # The relay subscribes in the background; publish once it listens
+        deadline = time.monotonic() + 5
+        while not ws_publisher(f"pub:{channel}", update):
+            assert time.monotonic() < deadline, "relay never subscribed"
+            time.sleep(0.01)
+        
+        message = ws.receive_json()
+        assert message["type"] == "ticker"
+        assert message["data"] == update
+        
+        ws.send_text("ping")
+        assert ws.receive_text() == "pong"
+        relay = websocket.manager.relays[channel]
+    
+    assert client.get("/api/v1/ws/status").json() == {"total_connections": 0, "channels": {}}
+    assert channel not in websocket.manager.relays
+    assert relay.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_ohlcv_pagination(client: AsyncClient, insert_rows, sample_ohlcv_data):
     """Test OHLCV pagination."""
-    # Create multiple test records
-    for i in range(10):
-        ohlcv = OHLCV(**{**sample_ohlcv_data, "close": 50000.0 + i})
-        test_session.add(ohlcv)
-    await test_session.commit()
+    # Create multiple test records, one hourly candle each, in one INSERT
+    latest = sample_ohlcv_data["timestamp"]
+    rows = [
+        {**sample_ohlcv_data, "timestamp": latest - timedelta(hours=i), "close": 50000.0 + i}
+        for i in range(10)
+    ]
+    await insert_rows(OHLCV, rows)
     
     # Test with limit
     response = await client.get(
@@ -130,4 +429,58 @@ async def test_ohlcv_pagination(client: AsyncClient, test_session: AsyncSession,
     )
     assert response.status_code == 200
     data = response.json()
-    assert len(data) <= 5
\ No newline at end of file
+    assert len(data) == 5
+
+
+@pytest.mark.parametrize("row_type,response_model", [
+    (OHLCVRow, OHLCVResponse),
+    (TickerRow, TickerResponse),
+    (TradeRow, TradeResponse),
+])
+def test_row_types_match_response_models(row_type, response_model):
+    """Test raw row shapes served by hot endpoints match their response models."""
+    assert set(row_type.__annotations__) == set(response_model.model_fields)
+
+
+def test_entity_encoding_matches_response_models():
+    """Test entities encoded without validation serialize like their response models."""
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    orderbook = OrderBook(
+        id=1, symbol="BTCUSDT", exchange="binance", timestamp=now, created_at=now,
+        bid_prices=[43000.5, 42999.0], bid_volumes=[1.25, 3.0],
+        ask_prices=[43001.0], ask_volumes=[0.5], bid_ask_spread=0.5,
+    )
+    metrics = MarketMetrics(
+        id=2, symbol="BTCUSDT", timestamp=now, created_at=now,
+        market_cap=850000000000.0, market_cap_rank=1, market_metadata={"name": "Bitcoin"},
+    )
+    
+    for entity, fields, response_model in [
+        (orderbook, ORDERBOOK_FIELDS, OrderBookResponse),
+        (metrics, MARKET_METRICS_FIELDS, MarketMetricsResponse),
+    ]:
+        expected = response_model.model_validate(entity).model_dump_json().encode()
+        assert _encode_entity(entity, fields) == expected
+
+
+def test_metrics_schemas_read_renamed_metadata_columns():
+    """Test metadata is read from the renamed ORM columns and served as metadata."""
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    market = MarketMetrics(id=1, symbol="BTCUSDT", timestamp=now, created_at=now, market_metadata={"a": 1})
+    chain = OnChainMetrics(
+        id=2, symbol="BTCUSDT", blockchain="bitcoin", timestamp=now, created_at=now, chain_metadata={"b": 2}
+    )
+    
+    assert MarketMetricsResponse.model_validate(market).model_dump()["metadata"] == {"a": 1}
+    assert OnChainMetricsResponse.model_validate(chain).model_dump()["metadata"] == {"b": 2}
+    assert MARKET_METRICS_FIELDS["metadata"] == "market_metadata"
+
+
+def test_price_and_volume_fields_reject_negatives():
+    """Test shared price/volume field types reject negative values but allow None."""
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    ticker = TickerCreate(symbol="BTCUSDT", timestamp=now, last_price=45000.0, price_change_24h=-120.5)
+    assert ticker.bid_price is None
+    
+    with pytest.raises(ValidationError):
+        TickerCreate(symbol="BTCUSDT", timestamp=now, last_price=45000.0, bid_volume=-1.0)
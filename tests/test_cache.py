@@ -0,0 +1,163 @@
+import pytest
+import asyncio
+import time
+from decimal import Decimal
+
+from app.cache.local_cache import LocalCache
+from app.cache.redis_cache import RedisCache, _index_key
+from app.cache.singleflight import Singleflight
+
+
+@pytest.mark.asyncio
+async def test_singleflight_coalesces_concurrent_calls():
+    """Test concurrent calls for one key share a single execution."""
+    singleflight = Singleflight()
+    calls = 0
+    
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+    
+    results = await asyncio.gather(*(singleflight.do("key", fetch) for _ in range(10)))
+    assert results == [1] * 10
+    assert calls == 1
+    
+    # Finished calls are forgotten, so the next one runs again
+    assert await singleflight.do("key", fetch) == 2
+
+
+@pytest.mark.asyncio
+async def test_singleflight_shares_exceptions():
+    """Test an error is raised to every waiting caller."""
+    singleflight = Singleflight()
+    
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+    
+    results = await asyncio.gather(
+        *(singleflight.do("key", fail) for _ in range(3)),
+        return_exceptions=True
+    )
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+@pytest.mark.parametrize("serializer", ["msgpack", "json"])
+def test_cache_serializer_round_trip(serializer):
+    """Test cached values round-trip, with unknown types stored as strings."""
+    cache = RedisCache(serializer)
+    value = {"symbol": "BTCUSDT", "price": 50000.5, "bids": [[1.0, 2.0]], "volume": Decimal("1.5")}
+    
+    decoded = cache._loads(cache._dumps(value))
+    assert decoded == {**value, "volume": "1.5"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("serializer", ["msgpack", "json"])
+async def test_cache_compresses_large_values(serializer):
+    """Test large values are stored compressed and small ones as serialized."""
+    cache = RedisCache(serializer)
+    large = [{"id": f"coin-{i}", "symbol": "BTC", "market_cap_rank": i} for i in range(200)]
+    
+    encoded = await cache._encode(large)
+    assert encoded.startswith(b"\xc1")
+    assert len(encoded) < len(cache._dumps(large)) / 3
+    assert cache._decode(encoded) == large
+    
+    # msgpack encodes 0 as a NUL byte, which must not read as compressed
+    for small in (0, {"symbol": "BTCUSDT"}):
+        assert await cache._encode(small) == cache._dumps(small)
+        assert cache._decode(await cache._encode(small)) == small
+
+
+@pytest.mark.asyncio
+async def test_set_many_writes_batch_with_script(test_cache: RedisCache):
+    """Test set_many stores every value and its TTL in one EVALSHA call."""
+    mapping = {"coin:bitcoin": {"rank": 1}, "coin:ethereum": {"rank": 2}}
+    assert await test_cache.set_many(mapping, ttl=60)
+    
+    client = test_cache.redis_client
+    assert await client.script_exists(test_cache._msetex.sha) == [True]
+    for key, value in mapping.items():
+        assert test_cache._decode(await client.get(key)) == value
+        assert 0 < await client.ttl(key) <= 60
+        # No fresh_ttl, so no freshness markers
+        assert not await client.exists(f"fresh:{key}")
+
+
+@pytest.mark.asyncio
+async def test_set_many_bytes_marks_values_fresh(test_cache: RedisCache):
+    """Test set_many_bytes writes fresh:{key} markers only when given a fresh_ttl."""
+    assert await test_cache.set_many_bytes({"api:a": b"[1]", "api:b": b"[2]"}, ttl=60, fresh_ttl=5)
+    assert await test_cache.set_many_bytes({"api:c": b"[3]"}, ttl=60)
+    
+    client = test_cache.redis_client
+    assert 0 < await client.ttl("fresh:api:a") <= 5
+    assert 5 < await client.ttl("api:a") <= 60
+    assert await test_cache.get_many_bytes_swr(["api:a", "api:b", "api:c"]) == [
+        (b"[1]", True), (b"[2]", True), (b"[3]", False)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_bytes_swr_serves_stale_values(test_cache: RedisCache):
+    """Test a value outliving its fresh marker is still served, as stale."""
+    assert await test_cache.set_bytes("api:symbols", b'["BTCUSDT"]', ttl=60, fresh_ttl=5)
+    assert await test_cache.get_bytes_swr("api:symbols") == (b'["BTCUSDT"]', True)
+    
+    # As if fresh_ttl had elapsed
+    await test_cache.redis_client.delete("fresh:api:symbols")
+    assert await test_cache.get_bytes_swr("api:symbols") == (b'["BTCUSDT"]', False)
+    assert await test_cache.get_bytes_swr("api:missing") == (None, False)
+
+
+@pytest.mark.asyncio
+async def test_flush_pattern_removes_indexed_keys(test_cache: RedisCache):
+    """Test flushing an indexed prefix deletes its indexed keys and index SET only."""
+    await test_cache.set_many({"ticker:BTCUSDT": {"price": 1.0}, "ticker:ETHUSDT": {"price": 2.0}})
+    await test_cache.set("orderbook:BTCUSDT", {"bids": []})
+    await test_cache.set_bytes("api:ticker:BTCUSDT", b"{}")
+    
+    client = test_cache.redis_client
+    assert await client.smembers("idx:ticker") == {b"ticker:BTCUSDT", b"ticker:ETHUSDT"}
+    
+    # An indexed key that already expired is dropped without being counted
+    await client.delete("ticker:ETHUSDT")
+    assert await test_cache.flush_pattern("ticker:*") == 1
+    
+    assert not await client.exists("ticker:BTCUSDT", "idx:ticker")
+    assert await client.smembers("idx:orderbook") == {b"orderbook:BTCUSDT"}
+    assert await client.exists("orderbook:BTCUSDT", "api:ticker:BTCUSDT") == 2
+    
+    # Other patterns are SCANned
+    assert await test_cache.flush_pattern("api:*") == 1
+    assert not await client.exists("api:ticker:BTCUSDT")
+
+
+def test_index_key_only_tracks_indexed_prefixes():
+    """Test keys are indexed by prefix, and only for indexed prefixes."""
+    assert _index_key("ticker:BTCUSDT") == "idx:ticker"
+    assert _index_key("orderbook:ETHUSDT") == "idx:orderbook"
+    assert _index_key("api:/api/v1/symbols") is None
+    assert _index_key("ticker") is None
+
+
+def test_local_cache_expires_and_evicts_least_recently_used():
+    """Test local entries expire after the TTL and the oldest is evicted when full."""
+    local = LocalCache(maxsize=2, ttl=60)
+    local.set("a", 1)
+    local.set("b", 2)
+    assert local.get("a") == 1
+    
+    # "b" is now least recently used
+    local.set("c", 3)
+    assert local.get("b") is None
+    assert local.get("a") == 1
+    assert local.get("c") == 3
+    
+    local.ttl = 0.01
+    local.set("d", 4)
+    time.sleep(0.02)
+    assert local.get("d") is None
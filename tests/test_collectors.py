@@ -1,10 +1,19 @@
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+import time
+import httpx
+import orjson
+from contextlib import asynccontextmanager
+from datetime import datetime
+from unittest.mock import AsyncMock
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.collectors.binance_collector import BinanceCollector
-from app.collectors.coingecko_collector import CoinGeckoCollector
+from app.collectors.binance_stream import BinanceStream
+from app.collectors.coingecko_collector import CoinGeckoCollector, _decode_markets
 from app.collectors.onchain_collector import OnChainCollector
+from app.models.market_data import OHLCV, Trade
+from app.utils.rate_limiter import RateLimiter, SlidingWindowRateLimiter
 
 
 @pytest.mark.asyncio
@@ -66,9 +75,47 @@ async def test_binance_collector_collect_mock(test_session: AsyncSession):
         'lowPrice': '49500.0'
     }
     
-    with patch.object(collector.client, 'get_ticker', return_value=[mock_ticker]):
-        records = await collector._collect_tickers(test_session, ["BTCUSDT"])
-        assert records >= 0
+    collector.client.get_ticker = AsyncMock(return_value=[mock_ticker])
+    
+    records = await collector._collect_tickers(test_session, ["BTCUSDT"])
+    assert records == 1
+    collector.client.get_ticker.assert_awaited_once()
+
+
+@pytest.mark.parametrize("model", [OHLCV, Trade])
+def test_copy_columns_name_table_columns(model):
+    """Test COPY column layouts only name columns of the target table."""
+    assert set(model.copy_columns) <= set(model.__table__.c.keys())
+    assert "copy_columns" not in model.__mapper__.attrs
+
+
+def test_binance_stream_buffers_events_in_rest_shape():
+    """Test streamed events are buffered like the matching REST responses."""
+    stream = BinanceStream()
+    
+    stream._handle({"stream": "btcusdt@ticker", "data": {
+        "c": "50000.0", "b": "49999.0", "B": "1.0", "a": "50001.0", "A": "2.0",
+        "v": "1000.0", "q": "50000000.0", "p": "500.0", "P": "1.0",
+        "h": "51000.0", "l": "49500.0",
+    }})
+    stream._handle({"stream": "btcusdt@depth20@100ms", "data": {
+        "bids": [["49999.0", "1.0"]], "asks": [["50001.0", "2.0"]],
+    }})
+    stream._handle({"stream": "btcusdt@trade", "data": {
+        "t": 42, "T": 1700000000000, "p": "50000.0", "q": "0.5", "m": True,
+    }})
+    
+    assert stream.take_tickers()["BTCUSDT"]["lastPrice"] == "50000.0"
+    assert stream.take_orderbooks()["BTCUSDT"]["bids"] == [["49999.0", "1.0"]]
+    assert stream.pending_orderbooks["orderbook:BTCUSDT"]["spread"] == 2.0
+    
+    trade = stream.take_trades()["BTCUSDT"][0]
+    assert trade["id"] == 42
+    assert trade["isBuyerMaker"] is True
+    
+    # Buffers are drained by each take
+    assert stream.take_tickers() == {}
+    assert stream.take_trades() == {}
 
 
 @pytest.mark.asyncio
@@ -79,6 +126,64 @@ async def test_coingecko_symbol_mapping():
     assert collector.symbol_to_id.get("BTCUSDT") == "bitcoin"
     assert collector.symbol_to_id.get("ETHUSDT") == "ethereum"
     assert collector.symbol_to_id.get("NONEXISTENT") is None
+    
+    # Reverse lookup used when assigning /coins/markets rows to symbols
+    assert collector.id_to_symbol.get("bitcoin") == "BTCUSDT"
+    assert all(collector.id_to_symbol[cid] == sym for sym, cid in collector.symbol_to_id.items())
+    
+    # Shared read-only constants, not rebuilt per instance
+    assert CoinGeckoCollector().symbol_to_id is collector.symbol_to_id
+    with pytest.raises(TypeError):
+        collector.symbol_to_id["NEWUSDT"] = "new-coin"
+
+
+def test_coingecko_extracts_coin_details():
+    """Test only the kept /coins/{id} fields are decoded, tolerating nulls."""
+    collector = CoinGeckoCollector()
+    body = orjson.dumps({
+        "id": "bitcoin",
+        "description": {"en": "x" * 10000},
+        "links": {"homepage": ["https://bitcoin.org"]},
+        "developer_score": 99.2,
+        "community_score": None,
+        "community_data": {"twitter_followers": 6000000, "reddit_subscribers": None},
+        "developer_data": None,
+    })
+    
+    details = collector._extract_coin_details(body)
+    assert details["developer_score"] == 99.2
+    assert details["community_score"] is None
+    assert details["metadata"] == {
+        "twitter_followers": 6000000,
+        "reddit_subscribers": None,
+        "github_stars": None,
+        "github_forks": None,
+    }
+    
+    assert collector._extract_coin_details(b'{"error": "coin not found"}')["developer_score"] is None
+    assert collector._extract_coin_details(b"[]") is None
+
+
+def test_coingecko_builds_rows_from_markets_page():
+    """Test /coins/markets entries decode to rows, skipping unmapped coins."""
+    collector = CoinGeckoCollector()
+    collector.coin_details["bitcoin"] = (0.0, {"developer_score": 99.2, "metadata": {"github_stars": 1}})
+    page = _decode_markets(orjson.dumps([
+        {
+            "id": "bitcoin", "image": "https://example.com/btc.png",
+            "market_cap": 1.3e12, "ath": 73738, "atl_date": "2013-07-06",
+        },
+        {"id": "unknown-coin", "market_cap": 1.0},
+    ]))
+    
+    now = datetime.utcnow()
+    row = collector._build_coin_metrics(page[0], now)
+    assert row["symbol"] == "BTCUSDT"
+    assert row["market_cap"] == 1.3e12
+    assert row["ath"] == 73738
+    assert row["developer_score"] == 99.2
+    assert row["market_metadata"] == {"ath_date": None, "atl_date": "2013-07-06", "github_stars": 1}
+    assert collector._build_coin_metrics(page[1], now) is None
 
 
 @pytest.mark.asyncio
@@ -100,6 +205,131 @@ async def test_collector_rate_limiting():
     await collector.acquire_rate_limit("binance")
 
 
+@pytest.mark.asyncio
+async def test_rate_limiter_does_not_credit_sleep_twice():
+    """Test callers past the burst are spaced one token interval apart."""
+    limiter = RateLimiter(rate=2, per=0.2)
+    start = time.monotonic()
+    
+    # Two tokens of burst, then three waits of 0.1s each
+    for _ in range(5):
+        await limiter.acquire()
+    
+    assert time.monotonic() - start >= 0.28
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_spaces_concurrent_waiters():
+    """Test gathered callers past the burst are released one interval apart, not together."""
+    limiter = RateLimiter(rate=10, per=1)
+    start = time.monotonic()
+    released = []
+    
+    async def call():
+        await limiter.acquire()
+        released.append(time.monotonic() - start)
+    
+    await asyncio.gather(*(call() for _ in range(13)))
+    waits = sorted(released)[10:]
+    assert waits[0] >= 0.09
+    assert waits[1] - waits[0] >= 0.08
+    assert waits[2] - waits[1] >= 0.08
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_limiter_wraps_its_ring_buffer():
+    """Test at most max_requests pass per window across several wraps of the buffer."""
+    limiter = SlidingWindowRateLimiter(max_requests=3, window_seconds=0.1)
+    start = time.monotonic()
+    
+    for _ in range(9):
+        await limiter.acquire()
+    
+    # Three windows' worth: the 4th and 7th requests each wait out a window
+    assert time.monotonic() - start >= 0.19
+    assert limiter.count == 3
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_sync_follows_server_budget():
+    """Test a reported Retry-After delays the next request and remaining caps the burst."""
+    limiter = RateLimiter(rate=100, per=1)
+    limiter.sync(remaining=3)
+    assert limiter.allowance <= 3.1
+    
+    limiter.sync(retry_after=0.1)
+    start = time.monotonic()
+    await limiter.acquire()
+    assert time.monotonic() - start >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_http_get_retries_transient_failures():
+    """Test transport errors and 5xx are retried, and other statuses returned as is."""
+    collector = OnChainCollector()
+    collector.retry_delay = 0
+    responses = [httpx.ConnectError("refused"), httpx.Response(503), httpx.Response(200, json={"n_tx": 1})]
+    
+    def handler(request):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+    
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="https://test") as client:
+        response = await collector.http_get(client, "onchain", "/stats")
+        assert response.status_code == 200
+        assert not responses
+        
+        responses.append(httpx.Response(404))
+        assert (await collector.http_get(client, "onchain", "/stats")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_fetch_once_coalesces_overlapping_requests():
+    """Test concurrent fetches for one key make a single upstream call."""
+    collector = OnChainCollector()
+    calls = []
+    
+    async def get_metrics(blockchain):
+        calls.append(blockchain)
+        await asyncio.sleep(0.01)
+        return {"blockchain": blockchain}
+    
+    results = await asyncio.gather(
+        *(collector.fetch_once("bitcoin", "onchain", get_metrics, "bitcoin") for _ in range(3)),
+        collector.fetch_once("ethereum", "onchain", get_metrics, "ethereum"),
+    )
+    assert [r["blockchain"] for r in results] == ["bitcoin"] * 3 + ["ethereum"]
+    assert calls == ["bitcoin", "ethereum"]
+
+
+@pytest.mark.asyncio
+async def test_collection_loop_takes_a_session_per_collection():
+    """Test each collection runs in its own session, closed before the next."""
+    collector = OnChainCollector()
+    events = []
+    
+    @asynccontextmanager
+    async def session_factory():
+        session = object()
+        events.append(("open", session))
+        yield session
+        events.append(("close", session))
+    
+    async def collect(db, symbols):
+        events.append(("collect", db))
+        if sum(event == "collect" for event, _ in events) == 2:
+            collector.is_running = False
+        return 0
+    
+    collector.collect = collect
+    await collector.start_collection_loop(session_factory, ["BTCUSDT"], interval_seconds=0.01)
+    
+    assert [event for event, _ in events] == ["open", "collect", "close"] * 2
+    assert events[0][1] is events[2][1] and events[0][1] is not events[3][1]
+
+
 @pytest.mark.asyncio
 async def test_binance_collector_stop():
     """Test stopping Binance collector."""